@@ -0,0 +1,234 @@
+"""Admission control and load shedding for the agent's blocking tools.
+
+``admitted`` turns a sync tool into an async one for ADK. Each call must get
+a slot from the tool's gate (``admission_concurrency``) before it runs on the
+shared bounded executor (``admission_workers`` threads). While it waits it
+holds no thread, only a place in the tool's queue. A call is shed instead
+of queued when:
+
+* the queue already holds ``admission_queue_depth`` calls ("queue_full"),
+* the estimated wait (queue position x recent service time / concurrency)
+  is longer than ``admission_max_wait_seconds`` ("overloaded"), or
+* it did not get a slot within that time ("deadline").
+
+A shed call returns immediately with the last successful result for the same
+arguments (and the same user, for tools that take a ``tool_context``),
+marked ``degraded``, when this replica has one, and otherwise with a
+structured ``busy`` error. Tools that change state (``stateful=True``, the
+watch tools) never get a cached result: replaying an earlier "saved" or
+"deleted" would claim a change that did not happen, so they get the busy
+error with ``not_applied`` set. Metrics: ``admission.<tool>.wait`` (queue wait),
+``admission.<tool>.shed.<reason>``, ``admission.<tool>.served_from_cache``
+and the ``admission.<tool>.in_flight`` / ``.queued`` gauges.
+
+Wrap the tools in ``agent.py``; the modules keep their plain sync functions
+for the batch runner and scripts. Stacks on top of ``@profiled``.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from . import metrics
+from .settings import settings
+from .tools.cache import make_key
+from .tools.cache_backends import MemoryBackend
+
+_executor = ThreadPoolExecutor(max_workers=settings.admission_workers, thread_name_prefix="tool")
+# Last good result per tool call, served when the call is shed.
+_fallback = MemoryBackend(settings.admission_fallback_entries)
+
+
+def _per_tool(values: dict, tool: str):
+    return values.get(tool, values.get("default"))
+
+
+class Shed(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionGate:
+    """FIFO concurrency gate usable from any event loop (and thread).
+
+    ADK may drive requests from several event loops, so waiters are loop
+    futures woken with ``call_soon_threadsafe`` rather than an asyncio
+    semaphore bound to one loop.
+    """
+
+    def __init__(self, name: str, concurrency: int, queue_depth: int, max_wait: float):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.queue_depth = queue_depth
+        self.max_wait = max_wait
+        self._running = 0
+        self._waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        # Moving average of how long one call holds a slot; seeded optimistically.
+        self._service_seconds = 1.0
+        self._lock = threading.Lock()
+
+    def _estimated_wait(self, position: int) -> float:
+        return position * self._service_seconds / self.concurrency
+
+    def _gauges(self) -> None:
+        metrics.set_gauge(f"admission.{self.name}.in_flight", self._running)
+        metrics.set_gauge(f"admission.{self.name}.queued", len(self._waiters))
+
+    async def acquire(self) -> None:
+        """Waits for a slot or raises ``Shed``."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._running < self.concurrency and not self._waiters:
+                self._running += 1
+                self._gauges()
+                return
+            position = len(self._waiters) + 1
+            estimate = self._estimated_wait(position)
+            if position > self.queue_depth:
+                raise Shed("queue_full", estimate)
+            if estimate > self.max_wait:
+                raise Shed("overloaded", estimate)
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+            self._gauges()
+
+        future = waiter[1]
+        try:
+            await asyncio.wait({future}, timeout=self.max_wait)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        if future.done():
+            return
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                self._gauges()
+                raise Shed("deadline", self._estimated_wait(len(self._waiters) + 1))
+        # A slot was handed over just as the wait timed out; take it.
+        await future
+
+    def _abandon(self, waiter) -> None:
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                self._gauges()
+                return
+        # The slot is already on its way to us: give it back once it lands.
+        if not waiter[1].cancel():
+            self.release()
+
+    def _grant(self, future: asyncio.Future) -> None:
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    def release(self, service_seconds: float | None = None) -> None:
+        with self._lock:
+            if service_seconds is not None:
+                self._service_seconds += 0.2 * (service_seconds - self._service_seconds)
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                if future.cancelled() or loop.is_closed():
+                    continue
+                # The slot passes straight to the next waiter; _running is unchanged.
+                loop.call_soon_threadsafe(self._grant, future)
+                self._gauges()
+                return
+            self._running -= 1
+            self._gauges()
+
+
+_gates: dict[str, AdmissionGate] = {}
+
+
+def gate_for(name: str) -> AdmissionGate:
+    gate = _gates.get(name)
+    if gate is None:
+        gate = _gates[name] = AdmissionGate(
+            name,
+            concurrency=_per_tool(settings.admission_concurrency, name),
+            queue_depth=_per_tool(settings.admission_queue_depth, name),
+            max_wait=_per_tool(settings.admission_max_wait_seconds, name),
+        )
+    return gate
+
+
+def _shed_response(name: str, key: Optional[str], shed: Shed) -> dict:
+    metrics.incr(f"admission.{name}.shed.{shed.reason}")
+    retry_after = round(max(1.0, float(shed.retry_after)), 1)
+    if key is None:
+        return {
+            "error": f"{name} was not run because it is busy right now ({shed.reason}); nothing was changed. "
+            f"Try again in {retry_after} seconds.",
+            "busy": True,
+            "not_applied": True,
+            "retry_after_seconds": retry_after,
+        }
+    entry = _fallback.get(key)
+    if entry is not None:
+        value, stored_at = entry
+        metrics.incr(f"admission.{name}.served_from_cache")
+        return {
+            **value,
+            "degraded": {
+                "reason": "busy",
+                "served_from": "cache",
+                "age_seconds": round(time.time() - stored_at),
+            },
+        }
+    return {
+        "error": f"{name} is busy right now ({shed.reason}). Try again shortly or answer with the results you have.",
+        "busy": True,
+        "retry_after_seconds": retry_after,
+    }
+
+
+def _fallback_key(name: str, args: tuple, kwargs: dict) -> str:
+    significant = {k: v for k, v in kwargs.items() if k != "tool_context"}
+    tool_context = kwargs.get("tool_context")
+    if tool_context is not None:
+        # Per-user tools: one user's result is never served to another.
+        significant["user_id"] = getattr(tool_context, "user_id", None)
+    return make_key(f"admission:{name}", {"args": args, **significant})
+
+
+def admitted(func: Callable[..., Any], stateful: bool = False) -> Callable[..., Any]:
+    """Runs a sync tool under its admission gate on the bounded tool executor.
+
+    ``stateful`` tools change or consume state, so a shed call is rejected
+    with a retry error and never answered from the fallback cache.
+    """
+    name = func.__name__
+    gate = gate_for(name)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        key = None if stateful else _fallback_key(name, args, kwargs)
+        queued_at = time.perf_counter()
+        try:
+            await gate.acquire()
+        except Shed as shed:
+            return _shed_response(name, key, shed)
+        metrics.observe(f"admission.{name}.wait", time.perf_counter() - queued_at)
+
+        started = time.perf_counter()
+        context = contextvars.copy_context()
+        job = _executor.submit(context.run, func, *args, **kwargs)
+        # Released when the thread is done, not when this coroutine is: a
+        # cancelled caller must not free the slot while the tool still runs.
+        job.add_done_callback(lambda _: gate.release(time.perf_counter() - started))
+        result = await asyncio.wrap_future(job)
+        if key is not None and isinstance(result, dict) and "error" not in result:
+            _fallback.set(key, result, time.time())
+        return result
+
+    return wrapper
@@ -14,8 +14,13 @@ from google.adk.tools import agent_tool
 from . import prompt
 from .tools.find_papers import find_papers_tool
 from .tools.find_news import find_news_tool
-from .tools.find_author import find_author_tool
+from .tools.resolve_author import resolve_author_tool
 from .tools.find_author_details import find_author_details_tool
+from .tools.author_metrics import author_metrics_tool
+from .tools.coauthors import coauthor_network_tool
+from .tools.watches import delete_watch_tool, get_watch_updates_tool, save_watch_tool
+from .admission import admitted
+from .guard import tool_call_guard
 from .settings import Settings
 
 MODEL = "gemini-2.5-pro"
@@ -54,12 +59,23 @@ root_agent = LlmAgent(
           "英語で質問された場合のみ英語で返答する。"
     ),
     tools=[
-        find_papers_tool,
-        find_news_tool,
-        find_author_tool,
-        find_author_details_tool,
+        # Bounded, queue-limited execution with load shedding (admission.py).
+        admitted(find_papers_tool),
+        admitted(find_news_tool),
+        admitted(resolve_author_tool),
+        admitted(find_author_details_tool),
+        admitted(author_metrics_tool),
+        admitted(coauthor_network_tool),
+        # Watch tools change state (get_watch_updates_tool marks items delivered):
+        # a shed call is rejected, never answered from another call's result.
+        admitted(save_watch_tool, stateful=True),
+        admitted(get_watch_updates_tool, stateful=True),
+        admitted(delete_watch_tool, stateful=True),
         agent_tool.AgentTool(agent=google_search_agent),
     ],
+    # 同一ターン内の重複ツール呼び出しを抑止し、呼び出し回数と時間に上限を設ける
+    before_tool_callback=tool_call_guard.before_tool,
+    after_tool_callback=tool_call_guard.after_tool,
 )
 
 
@@ -0,0 +1,240 @@
+# batch.py - Offline batch runner for paper / author / news queries (GrantAI reports)
+#
+# Runs the tools directly, without the chat agent, and streams one result per
+# query into JSONL or Parquet. Completed keys are checkpointed so an
+# interrupted run can be restarted with the same command.
+#
+#   python -m google_scholar_02.batch --input=queries.tsv --output=reports.jsonl
+#   cat queries.jsonl | python -m google_scholar_02.batch --input=- --output=reports --format=parquet
+#
+# Input lines are either JSON ({"kind": "papers", "query": "gluten"}) or
+# "<kind>\t<value>", where kind is papers, author (value = author_id) or news.
+
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Iterator, Optional
+
+from absl import app, flags
+
+from .settings import settings
+from .tools.find_author_details import find_author_details_tool
+from .tools.find_news import find_news_tool
+from .tools.find_papers import find_papers_tool
+from .tools.serpapi import key_pool, rate_limiter
+
+FLAGS = flags.FLAGS
+flags.DEFINE_string("input", "-", "Query file, or '-' for stdin.")
+flags.DEFINE_string("output", None, "JSONL file, or a directory of Parquet parts.")
+flags.DEFINE_enum("format", "jsonl", ["jsonl", "parquet"], "Output format.")
+flags.DEFINE_string("checkpoint", None, "Completed-keys file (default: <output>.done).")
+flags.DEFINE_integer("workers", 8, "Queries running at the same time.")
+flags.DEFINE_float("rate", None, "SerpApi requests per second (default: settings).")
+flags.DEFINE_integer("parquet_rows", 500, "Rows per Parquet part file.")
+
+TOOLS = {
+    "papers": lambda value: find_papers_tool(value),
+    "author": lambda value: find_author_details_tool(value),
+    "news": lambda value: find_news_tool(value),
+}
+
+
+def parse_line(line: str) -> Optional[tuple[str, str]]:
+    """Returns (kind, value) for one input line, or None for blank/comment lines."""
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        item = json.loads(line)
+        kind = item["kind"]
+        value = item.get("query") or item.get("author_id") or item.get("value")
+    else:
+        kind, _, value = line.partition("\t")
+    kind, value = kind.strip(), (value or "").strip()
+    if kind not in TOOLS or not value:
+        raise ValueError(f"Unsupported input line: {line!r}")
+    return kind, value
+
+
+def read_queries(path: str) -> Iterator[tuple[str, str]]:
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for number, line in enumerate(stream, 1):
+            try:
+                parsed = parse_line(line)
+            except (ValueError, KeyError, json.JSONDecodeError) as e:
+                print(f"Skipping line {number}: {e}")
+                continue
+            if parsed:
+                yield parsed
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+class Checkpoint:
+    """Append-only file of completed query keys."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: set[str] = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.done = {line.rstrip("\n") for line in f if line.strip()}
+        self._file = open(path, "a", encoding="utf-8")
+
+    def mark(self, key: str) -> None:
+        self._file.write(key + "\n")
+        self._file.flush()
+        self.done.add(key)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class JsonlSink:
+    def __init__(self, path: str):
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, row: dict) -> None:
+        self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetSink:
+    """Writes every ``batch_rows`` rows as a separate, closed Parquet part file.
+
+    A Parquet file is only readable once its footer is written, so each flush
+    writes a complete part (to a temporary name, then renamed). Rows are only
+    checkpointed after their part is in place, so a crash never marks rows
+    as done that cannot be read back.
+    """
+
+    def __init__(self, directory: str, batch_rows: int):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("--format=parquet requires the 'pyarrow' package") from e
+        self._pa, self._pq = pa, pq
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._prefix = f"part-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self._parts = 0
+        self._schema = pa.schema([
+            ("key", pa.string()), ("kind", pa.string()), ("input", pa.string()),
+            ("result", pa.string()), ("error", pa.string()), ("fetched_at", pa.float64()),
+        ])
+        self._rows: list[dict] = []
+        self._batch_rows = batch_rows
+        self.flushed_keys: list[str] = []
+
+    def write(self, row: dict) -> None:
+        self._rows.append({**row, "result": json.dumps(row["result"], ensure_ascii=False)})
+        if len(self._rows) >= self._batch_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+        path = os.path.join(self._directory, f"{self._prefix}-{self._parts:05d}.parquet")
+        table = self._pa.Table.from_pylist(self._rows, schema=self._schema)
+        # Readers skip the hidden temporary name until the part is complete.
+        tmp_path = os.path.join(self._directory, f".{os.path.basename(path)}.tmp")
+        self._pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+        self._parts += 1
+        self.flushed_keys.extend(row["key"] for row in self._rows if not row["error"])
+        self._rows = []
+
+    def close(self) -> None:
+        self.flush()
+
+
+def _run_one(kind: str, value: str) -> dict:
+    result = TOOLS[kind](value)
+    return {
+        "key": f"{kind}:{value}",
+        "kind": kind,
+        "input": value,
+        "result": result,
+        "error": result.get("error") if isinstance(result, dict) else None,
+        "fetched_at": time.time(),
+    }
+
+
+def run_batch(queries, sink, checkpoint: Checkpoint, workers: int) -> dict:
+    """Runs ``queries`` on ``workers`` threads (at most 2x that many in flight), streaming into ``sink``."""
+    stats = {"done": 0, "skipped": 0, "errors": 0}
+    in_flight: set[Future] = set()
+
+    def drain(block_until: int) -> None:
+        nonlocal in_flight
+        while len(in_flight) > block_until:
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                row = future.result()
+                sink.write(row)
+                if row["error"]:
+                    # Errored queries are not checkpointed, so a rerun retries them.
+                    stats["errors"] += 1
+                elif isinstance(sink, JsonlSink):
+                    checkpoint.mark(row["key"])
+                stats["done"] += 1
+            if isinstance(sink, ParquetSink):
+                for key in sink.flushed_keys:
+                    checkpoint.mark(key)
+                sink.flushed_keys.clear()
+
+    seen: set[str] = set()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+        for kind, value in queries:
+            key = f"{kind}:{value}"
+            if key in checkpoint.done or key in seen:
+                stats["skipped"] += 1
+                continue
+            seen.add(key)
+            in_flight.add(pool.submit(_run_one, kind, value))
+            # Bounded window: memory stays flat however long the input is.
+            drain(block_until=workers * 2)
+        drain(block_until=0)
+    return stats
+
+
+def main(argv: list[str]) -> None:
+    del argv  # 未使用引数の破棄
+    if not FLAGS.output:
+        print("--output is required")
+        return
+    if FLAGS.rate is not None:
+        rate_limiter.rate = FLAGS.rate
+    print(f"SerpApi rate limit: {rate_limiter.rate or 'unlimited'} req/s (settings: {settings.serpapi_requests_per_second}), "
+          f"{len(key_pool)} API key(s)")
+
+    checkpoint = Checkpoint(FLAGS.checkpoint or FLAGS.output.rstrip("/") + ".done")
+    if FLAGS.format == "parquet":
+        sink = ParquetSink(FLAGS.output, FLAGS.parquet_rows)
+    else:
+        sink = JsonlSink(FLAGS.output)
+    start = time.perf_counter()
+    try:
+        stats = run_batch(read_queries(FLAGS.input), sink, checkpoint, FLAGS.workers)
+    finally:
+        sink.close()
+        if isinstance(sink, ParquetSink):
+            for key in sink.flushed_keys:
+                checkpoint.mark(key)
+        checkpoint.close()
+    stats["seconds"] = round(time.perf_counter() - start, 2)
+    stats["serpapi_keys"] = key_pool.usage()
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    app.run(main)
@@ -0,0 +1,292 @@
+# bench.py - Micro-benchmarks for memory and CPU hot spots
+#
+#   python -m google_scholar_02.bench --benchmark=sessions --sessions=10000
+#   python -m google_scholar_02.bench --benchmark=decode --payload_dir=recorded/
+#   python -m google_scholar_02.bench --benchmark=records --records=20000
+
+import asyncio
+import gc
+import glob
+import io
+import json
+import os
+import time
+import tracemalloc
+import zlib
+
+from absl import app, flags
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from .sessions import BoundedSessionService
+from .tools import payloads, records
+from .tools.cache_backends import decode_entry, encode_entry
+
+FLAGS = flags.FLAGS
+flags.DEFINE_multi_enum("benchmark", ["sessions"], ["sessions", "decode", "records"], "Benchmarks to run.")
+flags.DEFINE_integer("sessions", 10000, "Sessions to create for the sessions benchmark.")
+flags.DEFINE_integer("events_per_session", 8, "Events appended to each session.")
+flags.DEFINE_string("payload_dir", None, "Recorded SerpApi responses (*.json); synthetic ones if unset.")
+flags.DEFINE_integer("decode_repeat", 200, "Decodes per payload and method.")
+flags.DEFINE_integer("records", 20000, "Records per type for the records benchmark.")
+
+
+def _measure(fn) -> dict:
+    """Runs ``fn`` under tracemalloc and reports retained/peak bytes and wall time."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"retained_mb": round(retained / 2**20, 4), "peak_mb": round(peak / 2**20, 4),
+            "seconds": round(elapsed, 3)}
+
+
+# --- sessions ---
+
+def _tool_event(i: int) -> Event:
+    articles = [
+        {"title": f"Paper {i}-{j}", "link": f"https://example.org/{i}/{j}", "snippet": "lorem ipsum " * 20,
+         "author_names": ["A Author", "B Author"], "author_ids": ["AAAA", "BBBB"]}
+        for j in range(5)
+    ]
+    return Event(
+        author="root_agent",
+        invocation_id=f"inv-{i}",
+        content=types.Content(role="user", parts=[types.Part(
+            function_response=types.FunctionResponse(name="find_papers_tool", response={"articles": articles}))]),
+    )
+
+
+def _fill_sessions(service, sessions: int, events_per_session: int):
+    async def fill():
+        for n in range(sessions):
+            session = await service.create_session(app_name="bench", user_id=f"u{n % 100}", session_id=f"s{n}")
+            for i in range(events_per_session):
+                await service.append_event(session, _tool_event(i))
+        return service
+    return asyncio.run(fill())
+
+
+def bench_sessions(sessions: int, events_per_session: int) -> dict:
+    return {
+        "in_memory": _measure(lambda: _fill_sessions(InMemorySessionService(), sessions, events_per_session)),
+        "bounded": _measure(lambda: _fill_sessions(
+            BoundedSessionService.from_settings(), sessions, events_per_session)),
+    }
+
+
+# --- decode ---
+
+def _synthetic_payloads() -> dict[str, bytes]:
+    """SerpApi-shaped documents with the metadata, pagination and HTML the tools never read."""
+    metadata = {
+        "search_metadata": {"id": "x" * 24, "status": "Success", "json_endpoint": "https://serpapi.com/x" * 3,
+                            "raw_html_file": "https://serpapi.com/x.html" * 3, "total_time_taken": 1.2,
+                            "google_scholar_author_url": "https://scholar.google.com/citations?user=AAAA"},
+        "search_parameters": {"engine": "", "q": "gluten", "hl": "en", "num": "100"},
+        "serpapi_pagination": {"next": "https://serpapi.com/search.json?start=20", "other_pages": {
+            str(i): f"https://serpapi.com/search.json?start={i * 10}" for i in range(2, 11)}},
+        "related_searches": [{"query": f"gluten {i}", "link": "https://scholar.google.com/scholar?q=x" * 2}
+                             for i in range(8)],
+    }
+
+    def document(engine: str, body: dict) -> bytes:
+        doc = {**metadata, "search_parameters": {**metadata["search_parameters"], "engine": engine}, **body}
+        return json.dumps(doc).encode()
+
+    articles = [{
+        "position": i, "title": f"Gluten sensitivity study {i}", "result_id": f"r{i}",
+        "link": f"https://example.org/paper/{i}", "snippet": "Coeliac disease and gluten. " * 8,
+        "publication_info": {"summary": "A Author, B Author - Journal, 2021 - example.org",
+                             "authors": [{"name": "A Author", "author_id": "AAAA", "link": "https://x/AAAA"}]},
+        "resources": [{"title": "example.org", "file_format": "PDF", "link": f"https://example.org/{i}.pdf"}],
+        "inline_links": {"serpapi_cite_link": "https://serpapi.com/cite?q=x", "html_version": "https://x",
+                         "cited_by": {"total": i, "link": "https://x", "cites_id": "1", "serpapi_scholar_link": "https://x"},
+                         "related_pages_link": "https://x", "versions": {"total": 3, "link": "https://x"}},
+    } for i in range(20)]
+    author_articles = [{
+        "title": f"Paper {i}", "link": f"https://scholar.google.com/citations?view_op=view_citation&c={i}",
+        "citation_id": f"AAAA:{i}", "authors": "A Author, B Author, C Author", "publication": "Journal 12 (3)",
+        "cited_by": {"value": 1000 - i, "link": "https://scholar.google.com/scholar?cites=1" * 2,
+                     "serpapi_link": "https://serpapi.com/search.json?cites=1" * 2, "cites_id": "1"},
+        "year": str(2000 + i % 25),
+    } for i in range(100)]
+    author = {
+        "author": {"name": "A Author", "affiliations": "Example University", "email": "Verified email at x.org",
+                   "thumbnail": "https://x/photo.jpg", "interests": [
+                       {"title": t, "link": "https://x", "serpapi_link": "https://serpapi.com/x"} for t in "abcde"]},
+        "articles": author_articles,
+        "cited_by": {"table": [{"citations": {"all": 1, "since_2019": 1}}],
+                     "graph": [{"year": 2000 + y, "citations": y * 10} for y in range(25)]},
+        "co_authors": [{"name": f"Co {i}", "link": "https://x", "author_id": f"C{i}", "affiliations": "Uni"}
+                       for i in range(20)],
+    }
+    news = [{"position": i, "title": f"News {i}", "link": f"https://news.example/{i}", "date": "01/01/2025",
+             "source": {"name": "Example", "icon": "https://x/icon.png" * 3}, "thumbnail": "https://x/t.jpg" * 3}
+            for i in range(100)]
+    return {
+        "google_scholar": document("google_scholar", {"organic_results": articles}),
+        "google_scholar_author": document("google_scholar_author", author),
+        "google_news": document("google_news", {"news_results": news}),
+    }
+
+
+def _recorded_payloads(directory: str) -> dict[str, bytes]:
+    found = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        with open(path, "rb") as f:
+            body = f.read()
+        engine = json.loads(body).get("search_parameters", {}).get("engine", "unknown")
+        found[f"{engine}:{os.path.basename(path)}"] = body
+    return found
+
+
+def _decode_methods(engine: str) -> dict:
+    spec = payloads.FIELDS.get(engine)
+    methods = {"json": json.loads}
+    if payloads.orjson is not None:
+        methods["orjson"] = payloads.orjson.loads
+    methods["decode+project"] = lambda body: payloads.decode(body, engine)
+    if spec is not None and payloads.can_stream():
+        methods["stream+project"] = lambda body: payloads.stream_project(io.BytesIO(body), spec)
+    return methods
+
+
+def bench_decode(payload_dir: str | None, repeat: int) -> dict:
+    documents = _recorded_payloads(payload_dir) if payload_dir else _synthetic_payloads()
+    report = {}
+    for name, body in documents.items():
+        engine = name.split(":", 1)[0]
+        row = {"bytes": len(body)}
+        for method, decode in _decode_methods(engine).items():
+            start = time.process_time()
+            for _ in range(repeat):
+                decode(body)
+            cpu_us = (time.process_time() - start) / repeat * 1e6
+            measured = _measure(lambda: decode(body))
+            # Retained memory of the result is what the in-process cache keeps per entry.
+            row[method] = {"cpu_us": round(cpu_us, 1), "retained_kb": round(measured["retained_mb"] * 1024, 1),
+                           "peak_kb": round(measured["peak_mb"] * 1024, 1)}
+        # Shared-cache hits decode the stored entry, which is the projected document.
+        full_blob = encode_entry(json.loads(body), 0.0)
+        projected_blob = encode_entry(payloads.decode(body, engine), 0.0)
+        row["cache_entry"] = {}
+        for label, blob in (("full", full_blob), ("projected", projected_blob)):
+            start = time.process_time()
+            for _ in range(repeat):
+                decode_entry(blob)
+            row["cache_entry"][label] = {
+                "blob_bytes": len(blob),
+                "cpu_us": round((time.process_time() - start) / repeat * 1e6, 1),
+            }
+        report[name] = row
+    return report
+
+
+# --- records ---
+
+def _raw_items(kind: str, count: int) -> list[dict]:
+    """SerpApi items as the tools see them; ~1 in 4 fields missing, authors drawn from a small pool."""
+    items = []
+    for i in range(count):
+        author = i % 500
+        if kind == "papers":
+            items.append({
+                "title": f"Gluten sensitivity study {i}", "link": f"https://example.org/paper/{i}",
+                "snippet": "Coeliac disease and gluten. " * 6,
+                "publication_info": {"authors": [
+                    {"name": f"A{author} Author", "author_id": f"AUTH{author:08d}"},
+                    {"name": f"B{author + 1} Author", "author_id": f"AUTH{author + 1:08d}"},
+                ]},
+            })
+        elif kind == "authors":
+            items.append({"name": f"A{author} Author", "author_id": f"AUTH{author:08d}",
+                          "link": f"https://scholar.google.com/citations?user=AUTH{author:08d}",
+                          **({"affiliations": "Example University"} if i % 4 else {})})
+        else:
+            items.append({"title": f"News {i}", "link": f"https://news.example/{i}",
+                          **({"author": f"Reporter {i % 50}"} if i % 4 else {})})
+    return items
+
+
+# Today's tool code: nested dicts with a fresh "N/A" per missing field.
+_DICT_BUILDERS = {
+    "papers": lambda r: {
+        "title": r.get("title", "N/A"), "link": r.get("link", "N/A"), "snippet": r.get("snippet", "N/A"),
+        "author_names": [a.get("name", "N/A") for a in r["publication_info"]["authors"]],
+        "author_ids": [a.get("author_id", "N/A") for a in r["publication_info"]["authors"]],
+    },
+    "authors": lambda r: {"name": r.get("name", "N/A"), "link": r.get("link", "N/A"),
+                          "author_id": r.get("author_id", "N/A"), "affiliations": r.get("affiliations", "N/A")},
+    "news": lambda r: {"title": r.get("title", "N/A"), "link": r.get("link", "N/A"), "author": r.get("author", "N/A")},
+}
+_RECORD_BUILDERS = {
+    "papers": records.Paper.from_scholar_result,
+    "authors": records.AuthorProfile.from_profile_search,
+    "news": records.NewsItem.from_news_result,
+}
+
+
+def bench_records(count: int) -> dict:
+    report = {}
+    for kind in ("papers", "authors", "news"):
+        # Raw items are decoded fresh each time, as they would be from SerpApi.
+        blob = json.dumps(_raw_items(kind, count)).encode()
+        as_dicts = _measure(lambda: [_DICT_BUILDERS[kind](r) for r in json.loads(blob)])
+        as_records = _measure(lambda: [_RECORD_BUILDERS[kind](r) for r in json.loads(blob)])
+        dicts = [_DICT_BUILDERS[kind](r) for r in json.loads(blob)]
+        parsed = [_RECORD_BUILDERS[kind](r) for r in json.loads(blob)]
+        json_blob = zlib.compress(json.dumps(dicts, separators=(",", ":")).encode())
+        packed_blob = zlib.compress(records.pack(parsed))
+        start = time.perf_counter()
+        records.unpack(zlib.decompress(packed_blob))
+        unpack_s = time.perf_counter() - start
+        start = time.perf_counter()
+        json.loads(zlib.decompress(json_blob))
+        json_s = time.perf_counter() - start
+        # What the cache stores for record types outside records.PACKED_TYPES.
+        records_json_blob = zlib.compress(json.dumps(records.to_json(parsed), separators=(",", ":")).encode())
+        start = time.perf_counter()
+        records.from_json(json.loads(zlib.decompress(records_json_blob)))
+        records_json_s = time.perf_counter() - start
+        report[kind] = {
+            "bytes_per_record": {
+                "dict": round(as_dicts["retained_mb"] * 2**20 / count, 1),
+                "slotted": round(as_records["retained_mb"] * 2**20 / count, 1),
+            },
+            "serialized_bytes_per_record": {
+                "json_zlib": round(len(json_blob) / count, 1),
+                "records_json_zlib": round(len(records_json_blob) / count, 1),
+                "packed_zlib": round(len(packed_blob) / count, 1),
+                "packed_raw": round(len(records.pack(parsed)) / count, 1),
+            },
+            "decode_us_per_record": {
+                "json_zlib": round(json_s / count * 1e6, 2),
+                "records_json_zlib": round(records_json_s / count * 1e6, 2),
+                "packed_zlib": round(unpack_s / count * 1e6, 2),
+            },
+            "cache_stores": "packed_zlib" if records.prefers_packed(parsed) else "records_json_zlib",
+        }
+    return report
+
+
+def main(argv: list[str]) -> None:
+    del argv  # 未使用引数の破棄
+    report = {}
+    if "sessions" in FLAGS.benchmark:
+        report["sessions"] = bench_sessions(FLAGS.sessions, FLAGS.events_per_session)
+    if "decode" in FLAGS.benchmark:
+        report["decode"] = bench_decode(FLAGS.payload_dir, FLAGS.decode_repeat)
+    if "records" in FLAGS.benchmark:
+        report["records"] = bench_records(FLAGS.records)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    app.run(main)
@@ -6,6 +6,8 @@ from absl import app, flags
 from dotenv import load_dotenv
 # インポートパス修正: academic_researchではなくgoogle_scholar_02パッケージからroot_agentを読み込む
 from google_scholar_02.agent import root_agent
+from google_scholar_02.settings import settings
+from google_scholar_02.warmup import warm_up
 
 from vertexai import agent_engines
 from vertexai.preview.reasoning_engines import AdkApp
@@ -25,10 +27,19 @@ flags.DEFINE_bool("create", False, "Create a new agent.")
 flags.DEFINE_bool("delete", False, "Delete an existing agent.")
 flags.mark_bool_flags_as_mutual_exclusive(["create", "delete"])
 
+class WarmAdkApp(AdkApp):
+    """AdkApp that warms connection pools, the tool cache and imports when a replica starts."""
+
+    def set_up(self):
+        super().set_up()
+        if settings.warmup_enabled:
+            warm_up()
+
+
 def create() -> None:
     """Creates an agent engine for Academic Research (Google Scholar) Agent."""
-    # エージェントをAdkAppでラップしてAgent Engineに対応させる
-    adk_app = AdkApp(agent=root_agent, enable_tracing=True)
+    # エージェントをAdkAppでラップしてAgent Engineに対応させる（起動時にウォームアップ）
+    adk_app = WarmAdkApp(agent=root_agent, enable_tracing=True)
     # Agent Engine上にエージェントを作成
     try:
         remote_agent = agent_engines.create(
@@ -46,11 +57,24 @@ def create() -> None:
                 "lxml>=4.9.0,<6.0.0",
                 "requests>=2.31.0,<3.0.0",
                 "pandas>=2.0.0,<3.0.0",
+                # レプリカ間で共有するツール結果キャッシュ (CACHE_BACKEND=redis)
+                "redis>=5.0.0,<9.0.0",
+                # SerpApi レスポンスの高速デコードと大きな文書のストリーム解析
+                "orjson>=3.9.0,<4.0.0",
+                "ijson>=3.2.0,<4.0.0",
+                # 著者メトリクス (h-index 等) のベクトル化計算
+                "numpy>=1.26.0,<3.0.0",
                 # cloudpickle はSDK側が要求するため固定化
                 "cloudpickle==3.1.1",
             ],
             # ローカルのエージェントコードをパッケージに含める
             extra_packages=["google_scholar_02"],  # パッケージ本体のみをアップロード（サイズ削減のため）
+            # SerpApi キー（プール）はコードに埋め込まず環境変数で渡す
+            env_vars={
+                name: os.environ[name]
+                for name in ("SERPAPI_API_KEY", "SERPAPI_API_KEYS")
+                if os.getenv(name)
+            } or None,
         )
         print(f"Created remote agent: {remote_agent.resource_name}")
         return remote_agent
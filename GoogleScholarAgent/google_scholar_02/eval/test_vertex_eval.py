@@ -20,8 +20,8 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from google_scholar.agent import root_agent
+from google_scholar.sessions import BoundedSessionService
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 
 
 # --- Configuration ---
@@ -171,7 +171,7 @@ async def run_vertex_evaluation():
     APP_NAME_FOR_EVAL = "google_scholar_eval_app"
     USER_ID_FOR_EVAL = "eval_user"
 
-    session_service = InMemorySessionService()
+    session_service = BoundedSessionService.from_settings()
     runner = Runner(agent=root_agent, app_name=APP_NAME_FOR_EVAL, session_service=session_service)
 
     temp_results_collection: List[Dict[str, Any]] = [] 
@@ -0,0 +1,144 @@
+"""Per-turn guard against runaway tool-call loops.
+
+Plugged into ``root_agent`` as before/after tool callbacks. Within one turn
+(one ADK invocation) it:
+
+* answers repeated identical calls, and near-identical ones (same tool, the
+  same filters and ids, free-text ``query``/``name`` with a high token
+  overlap), from a turn-local result memo;
+* caps the number of real tool executions and the wall time of the turn.
+
+Every time the guard steps in, a ``guard.fired.<reason>`` counter is bumped.
+"""
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from . import metrics
+from .settings import settings
+
+_TOKEN_RE = re.compile(r"\w+")
+# Free-text arguments, compared by token overlap. Every other argument
+# (ids, year ranges, result counts, sort order, language, country) must match exactly.
+_TEXT_ARGS = frozenset({"query", "name"})
+
+
+def _tokens(args: dict[str, Any]) -> frozenset[str]:
+    text = " ".join(str(v) for k, v in args.items() if k in _TEXT_ARGS and isinstance(v, str))
+    return frozenset(t.lower() for t in _TOKEN_RE.findall(text))
+
+
+def _exact_part(args: dict[str, Any]) -> str:
+    return json.dumps({k: v for k, v in args.items() if k not in _TEXT_ARGS}, sort_keys=True, default=str)
+
+
+def _jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    # Calls without any text are only ever exact duplicates.
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class _Turn:
+    __slots__ = ("started", "calls", "memo", "seen")
+
+    def __init__(self):
+        self.started = time.time()
+        self.calls = 0
+        # signature -> tool response
+        self.memo: dict[str, Any] = {}
+        # (tool name, exact part, tokens, signature) for near-duplicate matching
+        self.seen: list[tuple[str, str, frozenset[str], str]] = []
+
+
+class ToolCallGuard:
+    """Detects repeated tool calls and enforces per-turn budgets."""
+
+    def __init__(
+        self,
+        max_calls_per_turn: int = 8,
+        max_turn_seconds: float = 90,
+        similarity_threshold: float = 0.8,
+        max_tracked_turns: int = 1024,
+    ):
+        self.max_calls_per_turn = max_calls_per_turn
+        self.max_turn_seconds = max_turn_seconds
+        self.similarity_threshold = similarity_threshold
+        self.max_tracked_turns = max_tracked_turns
+        self._turns: OrderedDict[str, _Turn] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _turn(self, invocation_id: str) -> _Turn:
+        with self._lock:
+            turn = self._turns.get(invocation_id)
+            if turn is None:
+                turn = self._turns[invocation_id] = _Turn()
+                while len(self._turns) > self.max_tracked_turns:
+                    self._turns.popitem(last=False)
+            return turn
+
+    @staticmethod
+    def _signature(tool_name: str, args: dict[str, Any]) -> str:
+        return f"{tool_name}:{json.dumps(args, sort_keys=True, default=str)}"
+
+    def _fire(self, reason: str, tool_name: str) -> None:
+        metrics.incr(f"guard.fired.{reason}")
+        metrics.incr(f"guard.fired.{reason}.{tool_name}")
+
+    def before_tool(self, tool, args: dict[str, Any], tool_context) -> Optional[dict]:
+        """ADK before_tool_callback: returns a response to skip the tool, or None."""
+        turn = self._turn(tool_context.invocation_id)
+        signature = self._signature(tool.name, args)
+        exact = _exact_part(args)
+        tokens = _tokens(args)
+
+        with self._lock:
+            if signature in turn.memo:
+                self._fire("duplicate", tool.name)
+                return turn.memo[signature]
+            for name, seen_exact, seen_tokens, seen_signature in turn.seen:
+                if (
+                    name == tool.name
+                    and seen_exact == exact
+                    and seen_signature in turn.memo
+                    and _jaccard(tokens, seen_tokens) >= self.similarity_threshold
+                ):
+                    self._fire("near_duplicate", tool.name)
+                    return turn.memo[seen_signature]
+
+            if turn.calls >= self.max_calls_per_turn:
+                self._fire("call_cap", tool.name)
+                return {
+                    "error": f"Tool call limit ({self.max_calls_per_turn}) reached for this turn. "
+                    "Answer the user with the results you already have."
+                }
+            if time.time() - turn.started > self.max_turn_seconds:
+                self._fire("time_cap", tool.name)
+                return {
+                    "error": "Time budget for this turn is exhausted. "
+                    "Answer the user with the results you already have."
+                }
+
+            turn.calls += 1
+            turn.seen.append((tool.name, exact, tokens, signature))
+        metrics.incr("guard.calls")
+        return None
+
+    def after_tool(self, tool, args: dict[str, Any], tool_context, tool_response) -> Optional[dict]:
+        """ADK after_tool_callback: memoizes successful results for the turn."""
+        if isinstance(tool_response, dict) and "error" not in tool_response:
+            turn = self._turn(tool_context.invocation_id)
+            with self._lock:
+                turn.memo[self._signature(tool.name, args)] = tool_response
+        return None
+
+
+tool_call_guard = ToolCallGuard(
+    max_calls_per_turn=settings.guard_max_calls_per_turn,
+    max_turn_seconds=settings.guard_max_turn_seconds,
+    similarity_threshold=settings.guard_similarity_threshold,
+)
@@ -0,0 +1,309 @@
+# loadtest.py - End-to-end load test for root_agent without Gemini or SerpApi
+#
+# Runs root_agent through ADK's Runner with a scripted, deterministic model
+# and points the tools at a local mock upstream, so the tool and runner layers
+# can be exercised at scale for free.
+#
+#   python -m google_scholar_02.loadtest --sessions=200 --concurrency=50
+
+import asyncio
+import json
+import os
+import random
+import resource
+import threading
+import time
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import AsyncGenerator
+from urllib.parse import parse_qs, urlparse
+
+from absl import app, flags
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from . import memprofile, metrics
+from .agent import root_agent
+from .sessions import BoundedSessionService
+from .settings import settings
+from .tools.serpapi import key_pool
+
+FLAGS = flags.FLAGS
+flags.DEFINE_integer("sessions", 100, "Number of sessions to run.")
+flags.DEFINE_integer("concurrency", 20, "Sessions running at the same time.")
+flags.DEFINE_integer("turns", 2, "User turns per session.")
+flags.DEFINE_integer("upstream_delay_ms", 50, "Simulated mock upstream latency.")
+flags.DEFINE_integer("api_keys", 2, "Fake SerpApi keys in the key pool.")
+flags.DEFINE_integer("seed", 0, "Seed for the scripted model and query mix.")
+flags.DEFINE_bool("in_memory_sessions", False, "Use ADK's unbounded InMemorySessionService.")
+
+APP_NAME = "google_scholar_loadtest"
+
+_TOPICS = ["gluten", "protein folding", "graph neural networks", "soil microbiome", "CRISPR"]
+_AUTHORS = ["Mark Miller", "Jane Doe", "Geoffrey Hinton", "Yoshua Bengio"]
+
+
+# --- Mock upstream (SerpApi + Scholar profile pages) ---
+
+def _mock_serpapi_payload(params: dict[str, str], base_url: str) -> dict:
+    engine = params.get("engine", "")
+    query = params.get("q", "")
+    if engine == "google_scholar" and query.startswith("author:"):
+        name = query[len("author:"):]
+        return {"profiles": {"authors": [
+            {"name": name, "link": f"{base_url}/citations?user=MOCK{zlib.crc32(name.encode()) % 10000}",
+             "author_id": f"MOCK{zlib.crc32(name.encode()) % 10000}"},
+        ]}}
+    if engine == "google_scholar":
+        return {"organic_results": [
+            {"title": f"{query} study {i}", "link": f"{base_url}/paper/{i}",
+             "snippet": f"A study about {query}. " * 5,
+             "publication_info": {"authors": [
+                 {"name": f"Author {i}", "author_id": f"MOCKA{i}"},
+                 {"name": f"Author {i + 1}", "author_id": f"MOCKA{i + 1}"},
+             ]}}
+            for i in range(int(params.get("start", 0)), int(params.get("start", 0)) + int(params.get("num", 5)))
+        ]}
+    if engine == "google_scholar_author":
+        author_id = params.get("author_id", "")
+        return {
+            "search_metadata": {"google_scholar_author_url": f"{base_url}/citations?user={author_id}"},
+            "author": {"name": f"Author {author_id}", "affiliations": "Mock University",
+                       "interests": [{"title": t} for t in _TOPICS[:3]]},
+            "articles": [
+                {"title": f"Paper {i} by {author_id}", "link": f"{base_url}/citations?view_op=view_citation&citation_for_view={author_id}:{i}",
+                 "authors": "A Author, B Author", "publication": "Mock Journal", "year": str(2000 + i % 25),
+                 "cited_by": {"value": max(0, 150 - i)}}
+                for i in range(int(params.get("start", 0)), min(180, int(params.get("start", 0)) + int(params.get("num", 20))))
+            ],
+            "cited_by": {
+                "table": [{"citations": {"all": 11325, "since_2020": 4000}},
+                          {"h_index": {"all": 75, "since_2020": 40}},
+                          {"i10_index": {"all": 141, "since_2020": 90}}],
+                "graph": [{"year": year, "citations": 200 + 40 * (year - 2010)} for year in range(2010, 2027)],
+            },
+            # MOCKA<n> lists MOCKA<n-1> and MOCKA<n+1>, so the co-author graph is a chain.
+            "co_authors": [
+                {"name": f"Author {n}", "author_id": f"MOCKA{n}"}
+                for n in ([int(author_id[5:]) - 1, int(author_id[5:]) + 1] if author_id[5:].isdigit() else [])
+            ],
+        }
+    if engine == "google_news":
+        return {"news_results": [
+            {"title": f"News on {query} #{i}", "link": f"{base_url}/news/{i}", "author": "Reporter"}
+            for i in range(5)
+        ]}
+    return {}
+
+
+def _mock_paper_page(path: str) -> str:
+    abstract = f"We study {path.rsplit('/', 1)[-1]} in depth. " * 8
+    return f'<html><head><meta name="citation_abstract" content="{abstract}"></head><body>{"x" * 5000}</body></html>'
+
+
+def _mock_profile_page(user: str) -> str:
+    rows = "".join(
+        f'<a class="gsc_a_at" href="/citations?view_op=view_article&user={user}&i={i}">Paper {i}</a>'
+        for i in range(20)
+    )
+    return f"<html><body><table>{rows}</table></body></html>"
+
+
+def start_mock_upstream(delay_ms: int) -> ThreadingHTTPServer:
+    """Starts the mock upstream on a free local port in a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay_ms / 1000)
+            parsed = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+            if parsed.path == "/account.json":
+                body = json.dumps({"total_searches_left": 5000, "account_rate_limit_per_hour": 1000,
+                                   "this_hour_searches": 0}).encode()
+                content_type = "application/json"
+            elif parsed.path == "/search.json":
+                body = json.dumps(_mock_serpapi_payload(params, base_url)).encode()
+                content_type = "application/json"
+            elif parsed.path.startswith("/paper/"):
+                body = _mock_paper_page(parsed.path).encode()
+                content_type = "text/html"
+            else:
+                body = _mock_profile_page(params.get("user", "")).encode()
+                content_type = "text/html"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# --- Scripted stand-in for gemini-2.5-pro ---
+
+class ScriptedLlm(BaseLlm):
+    """Deterministic model that replays realistic tool-call sequences.
+
+    The script is picked from the latest user message ("papers: ...",
+    "summaries: ..." (papers with abstracts), "news: ..." or "author: ...") and advanced by the number of tool
+    responses seen since that message.
+    """
+
+    model: str = "scripted-loadtest"
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        user_text, responses = "", []
+        for content in llm_request.contents:
+            for part in content.parts or []:
+                if content.role == "user" and part.text:
+                    user_text, responses = part.text, []
+                elif part.function_response:
+                    responses.append(part.function_response)
+
+        kind, _, argument = user_text.partition(":")
+        argument = argument.strip()
+        call = None
+        if kind == "papers" and not responses:
+            call = ("find_papers_tool", {"query": argument})
+        elif kind == "summaries" and not responses:
+            # Abstracts only when the user asks for them, as the prompt instructs.
+            call = ("find_papers_tool", {"query": argument, "include_abstracts": True})
+        elif kind == "news" and not responses:
+            call = ("find_news_tool", {"query": argument})
+        elif kind == "author" and not responses:
+            call = ("resolve_author_tool", {"name": argument})
+        elif kind == "author" and len(responses) == 1:
+            authors = (responses[0].response or {}).get("Authors") or []
+            if authors:
+                call = ("find_author_details_tool", {"author_id": authors[0]["author_id"]})
+
+        if call is not None:
+            part = types.Part(function_call=types.FunctionCall(name=call[0], args=call[1]))
+        else:
+            part = types.Part(text=f"Done: {user_text} ({len(responses)} tool results)")
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+
+# --- Process probes ---
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # ru_maxrss is a high-water mark (KiB on Linux), the best we can do here.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _open_fds() -> int:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return -1
+
+
+async def _sample_loop_lag(stop: asyncio.Event, interval: float = 0.05) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        metrics.observe("loadtest.loop_lag", time.perf_counter() - start - interval)
+        metrics.set_gauge("loadtest.open_fds.max", max(
+            _open_fds(), metrics.snapshot()["gauges"].get("loadtest.open_fds.max", 0)))
+
+
+# --- Driver ---
+
+async def _run_session(runner: Runner, session_service, rng: random.Random, turns: int) -> None:
+    user_id = f"user-{rng.randrange(1000)}"
+    session = await session_service.create_session(
+        app_name=APP_NAME, user_id=user_id, session_id=uuid.uuid4().hex)
+    for _ in range(turns):
+        kind = rng.choices(["papers", "summaries", "news", "author"], weights=[3, 1, 3, 3])[0]
+        argument = rng.choice(_AUTHORS if kind == "author" else _TOPICS)
+        message = types.Content(role="user", parts=[types.Part(text=f"{kind}: {argument}")])
+        start = time.perf_counter()
+        async for _event in runner.run_async(
+            user_id=user_id, session_id=session.id, new_message=message
+        ):
+            pass
+        metrics.observe("loadtest.turn_latency", time.perf_counter() - start)
+        metrics.incr(f"loadtest.turns.{kind}")
+
+
+async def run_load_test(
+    sessions: int, concurrency: int, turns: int, seed: int = 0, in_memory_sessions: bool = False
+) -> dict:
+    """Runs ``sessions`` scripted sessions and returns a summary report."""
+    agent = root_agent.clone(update={"model": ScriptedLlm()})
+    session_service = (
+        InMemorySessionService() if in_memory_sessions else BoundedSessionService.from_settings()
+    )
+    runner = Runner(agent=agent, app_name=APP_NAME, session_service=session_service)
+    rng = random.Random(seed)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded() -> None:
+        async with semaphore:
+            try:
+                await _run_session(runner, session_service, random.Random(rng.random()), turns)
+            except Exception as e:
+                metrics.incr("loadtest.session_errors")
+                print(f"Session failed: {e}")
+
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample_loop_lag(stop))
+    rss_before, fds_before = _rss_bytes(), _open_fds()
+    start = time.perf_counter()
+    await asyncio.gather(*(bounded() for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await sampler
+
+    snap = metrics.snapshot()
+    turns_done = snap["timings"].get("loadtest.turn_latency", {}).get("count", 0)
+    return {
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "turns_per_s": round(sessions * turns / elapsed, 2) if elapsed else 0.0,
+        "turns_sampled": turns_done,
+        "turn_latency": snap["timings"].get("loadtest.turn_latency"),
+        "loop_lag": snap["timings"].get("loadtest.loop_lag"),
+        "rss_growth_mb": round((_rss_bytes() - rss_before) / 2**20, 2),
+        "open_fds": {"before": fds_before, "after": _open_fds(),
+                     "max": snap["gauges"].get("loadtest.open_fds.max")},
+        "counters": snap["counters"],
+        "serpapi_keys": key_pool.usage(),
+        "memory": memprofile.report() if memprofile.enabled() else None,
+    }
+
+
+def main(argv: list[str]) -> None:
+    del argv  # 未使用引数の破棄
+    server = start_mock_upstream(FLAGS.upstream_delay_ms)
+    settings.serpapi_url = f"http://127.0.0.1:{server.server_address[1]}/search.json"
+    settings.serpapi_account_url = f"http://127.0.0.1:{server.server_address[1]}/account.json"
+    key_pool.set_keys([f"loadtest-key-{i:04d}" for i in range(FLAGS.api_keys)])
+    print(f"Mock upstream: {settings.serpapi_url}")
+    try:
+        report = asyncio.run(run_load_test(
+            FLAGS.sessions, FLAGS.concurrency, FLAGS.turns, FLAGS.seed, FLAGS.in_memory_sessions))
+    finally:
+        server.shutdown()
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    app.run(main)
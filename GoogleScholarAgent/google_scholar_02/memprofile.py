@@ -0,0 +1,219 @@
+"""Opt-in memory instrumentation built on tracemalloc.
+
+Enabled with ``settings.memprofile_enabled``. tracemalloc makes every
+allocation several times slower (more with deeper ``memprofile_frames``), so
+it is off by default and meant for a canary replica or a load test. When on:
+
+* every tool wrapped with ``@profiled`` records the bytes it retained and,
+  when no other tool was running at the same time, its peak, as
+  ``memory.tool.<name>.retained_bytes`` / ``.peak_bytes`` samples in
+  ``metrics`` next to the latency timings;
+* ``report()`` splits the live traced memory by area (BeautifulSoup trees,
+  tool cache, sessions, ...) and by tool module, and lists the top allocation sites;
+* with ``memprofile_snapshot_per_call`` tool calls are serialized and each one
+  keeps the top allocation sites of its own before/after snapshot diff;
+* with ``memprofile_snapshot_dir`` a snapshot is dumped every
+  ``memprofile_snapshot_interval_seconds`` for offline leak hunting:
+
+    python -m google_scholar_02.memreport --old=snap-1.tracemalloc --new=snap-2.tracemalloc
+"""
+
+import fnmatch
+import functools
+import os
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Optional
+
+from . import metrics
+from .settings import settings
+
+# Areas for report(): an allocation belongs to the first area with a matching frame.
+AREAS: dict[str, tuple[str, ...]] = {
+    "html_parsing": ("*/bs4/*", "*/lxml/*", "*/html/parser.py"),
+    "tool_cache": ("*/tools/cache.py", "*/tools/cache_backends.py", "*/tools/payloads.py"),
+    "sessions": ("*/google_scholar_02/sessions.py", "*/google/adk/sessions/*"),
+    "author_index": ("*/tools/author_index.py",),
+    "coauthor_graph": ("*/tools/coauthor_graph.py",),
+    "http": ("*/requests/*", "*/urllib3/*", "*/ssl.py"),
+}
+
+_lock = threading.Lock()
+_call_lock = threading.RLock()  # serializes tool calls in snapshot-per-call mode
+_in_flight = 0
+_tool_files: dict[str, str] = {}
+_last_call_sites: dict[str, list[dict]] = {}
+
+
+def enabled() -> bool:
+    return settings.memprofile_enabled and tracemalloc.is_tracing()
+
+
+def start() -> None:
+    """Starts tracemalloc (if enabled in settings) and the periodic snapshot thread."""
+    if not settings.memprofile_enabled:
+        return
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(settings.memprofile_frames)
+    if settings.memprofile_snapshot_dir and settings.memprofile_snapshot_interval_seconds > 0:
+        threading.Thread(target=_snapshot_loop, name="memprofile-snapshots", daemon=True).start()
+
+
+def _without_tracemalloc(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+    # Snapshots themselves allocate; keep them out of reports and diffs.
+    return snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+def _export_gauges() -> None:
+    current, peak = tracemalloc.get_traced_memory()
+    metrics.set_gauge("memory.traced_bytes", current)
+    metrics.set_gauge("memory.traced_peak_bytes", peak)
+
+
+def _site(stat: tracemalloc.Statistic) -> dict:
+    frame = stat.traceback[0]
+    return {"site": f"{frame.filename}:{frame.lineno}", "bytes": stat.size, "count": stat.count}
+
+
+def _diff_site(stat: tracemalloc.StatisticDiff) -> dict:
+    frame = stat.traceback[0]
+    return {"site": f"{frame.filename}:{frame.lineno}", "bytes_diff": stat.size_diff,
+            "count_diff": stat.count_diff, "bytes": stat.size}
+
+
+def _record(name: str, retained: int, peak: Optional[int]) -> None:
+    metrics.observe(f"memory.tool.{name}.retained_bytes", retained)
+    if peak is None:
+        metrics.incr("memory.peak_skipped")  # overlapping calls share one peak counter
+    else:
+        metrics.observe(f"memory.tool.{name}.peak_bytes", peak)
+    _export_gauges()
+
+
+def _call_with_snapshots(name: str, func: Callable, args, kwargs) -> Any:
+    with _call_lock:
+        before = tracemalloc.take_snapshot()
+        start_current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            top = _without_tracemalloc(after).compare_to(_without_tracemalloc(before), "lineno")
+            top = top[: settings.memprofile_top_n]
+            with _lock:
+                _last_call_sites[name] = [_diff_site(stat) for stat in top]
+            _record(name, current - start_current, peak - start_current)
+
+
+def profiled(func: Callable) -> Callable:
+    """Records per-call memory for a tool function; a no-op unless profiling is enabled."""
+    name = func.__name__
+    _tool_files[name] = func.__code__.co_filename
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        global _in_flight
+        if not enabled():
+            return func(*args, **kwargs)
+        if settings.memprofile_snapshot_per_call:
+            return _call_with_snapshots(name, func, args, kwargs)
+
+        with _lock:
+            _in_flight += 1
+            alone = _in_flight == 1
+            if alone:
+                tracemalloc.reset_peak()
+        start_current, _ = tracemalloc.get_traced_memory()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            with _lock:
+                alone = alone and _in_flight == 1
+                _in_flight -= 1
+            _record(name, current - start_current, peak - start_current if alone else None)
+
+    return wrapper
+
+
+@functools.lru_cache(maxsize=4096)
+def _area_of_file(filename: str) -> Optional[str]:
+    return next((area for area, patterns in AREAS.items()
+                 if any(fnmatch.fnmatch(filename, pattern) for pattern in patterns)), None)
+
+
+def report(snapshot: Optional[tracemalloc.Snapshot] = None) -> dict:
+    """Live traced memory split by area and by tool module, plus the top allocation sites.
+
+    Attribution walks each allocation's traceback, so it is only as deep as
+    ``settings.memprofile_frames``.
+    """
+    if snapshot is None:
+        if not tracemalloc.is_tracing():
+            return {"enabled": False}
+        snapshot = tracemalloc.take_snapshot()
+    snapshot = _without_tracemalloc(snapshot)
+
+    area_rank = {area: rank for rank, area in enumerate(AREAS)}
+    tool_modules = {filename: os.path.basename(filename) for filename in _tool_files.values()}
+    by_area = dict.fromkeys([*AREAS, "other"], 0)
+    by_tool_module = dict.fromkeys(tool_modules.values(), 0)
+    total = 0
+    for stat in snapshot.statistics("traceback"):
+        total += stat.size
+        filenames = {frame.filename for frame in stat.traceback}
+        areas = [area for area in map(_area_of_file, filenames) if area]
+        by_area[min(areas, key=area_rank.get) if areas else "other"] += stat.size
+        for filename in filenames & tool_modules.keys():
+            by_tool_module[tool_modules[filename]] += stat.size
+    for area, size in by_area.items():
+        metrics.set_gauge(f"memory.area.{area}.bytes", size)
+
+    with _lock:
+        last_calls = dict(_last_call_sites)
+    per_call = {name.removeprefix("memory.tool."): summary
+                for name, summary in metrics.snapshot()["timings"].items() if name.startswith("memory.tool.")}
+    return {
+        "enabled": True,
+        "traced_bytes": total,
+        "by_area": by_area,
+        "by_tool_module": by_tool_module,
+        "top_sites": [_site(stat) for stat in snapshot.statistics("lineno")[: settings.memprofile_top_n]],
+        "per_call": per_call,
+        "last_call_sites": last_calls,
+    }
+
+
+def diff(old: tracemalloc.Snapshot, new: tracemalloc.Snapshot, limit: int = 20) -> dict:
+    """Top allocation sites that grew between two snapshots (for leak hunting)."""
+    stats = _without_tracemalloc(new).compare_to(_without_tracemalloc(old), "lineno")
+    return {
+        "bytes_diff": sum(stat.size_diff for stat in stats),
+        "top_growth": [_diff_site(stat) for stat in stats[:limit]],
+    }
+
+
+def dump_snapshot(directory: str) -> str:
+    """Writes a snapshot to ``directory`` and returns its path."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"snap-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.tracemalloc")
+    tracemalloc.take_snapshot().dump(path)
+    metrics.incr("memory.snapshots")
+    return path
+
+
+def _snapshot_loop() -> None:
+    while True:
+        time.sleep(settings.memprofile_snapshot_interval_seconds)
+        try:
+            dump_snapshot(settings.memprofile_snapshot_dir)
+            _export_gauges()
+        except Exception as e:
+            print(f"DEBUG: memory snapshot failed: {e}")
+
+
+start()
+
@@ -0,0 +1,35 @@
+# memreport.py - Leak-hunting report from two tracemalloc snapshots
+#
+# Snapshots are written by memprofile.py when MEMPROFILE_ENABLED=true and
+# MEMPROFILE_SNAPSHOT_DIR / MEMPROFILE_SNAPSHOT_INTERVAL_SECONDS are set.
+#
+#   python -m google_scholar_02.memreport --old=snaps/snap-1.tracemalloc --new=snaps/snap-2.tracemalloc
+
+import json
+import tracemalloc
+
+from absl import app, flags
+
+from . import memprofile
+# Importing the agent imports every tool it registers, which registers their
+# files, so allocations can be attributed to them.
+from . import agent  # noqa: F401
+
+FLAGS = flags.FLAGS
+flags.DEFINE_string("old", None, "Earlier snapshot file.", required=True)
+flags.DEFINE_string("new", None, "Later snapshot file.", required=True)
+flags.DEFINE_integer("limit", 20, "Allocation sites to list.")
+
+
+def main(argv: list[str]) -> None:
+    del argv  # 未使用引数の破棄
+    old = tracemalloc.Snapshot.load(FLAGS.old)
+    new = tracemalloc.Snapshot.load(FLAGS.new)
+    print(json.dumps({
+        "diff": memprofile.diff(old, new, FLAGS.limit),
+        "new": memprofile.report(new),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    app.run(main)
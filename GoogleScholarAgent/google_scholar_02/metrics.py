@@ -0,0 +1,79 @@
+"""In-process counters, gauges and timings shared by the agent tools.
+
+Everything is kept in memory and exposed through ``snapshot()`` so that
+callers (logs, load tests, deploy hooks) can read the same numbers.
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+_MAX_SAMPLES = 1024
+
+_lock = threading.Lock()
+_counters: dict[str, int] = defaultdict(int)
+_gauges: dict[str, float] = {}
+_timings: dict[str, deque] = defaultdict(lambda: deque(maxlen=_MAX_SAMPLES))
+
+
+def incr(name: str, value: int = 1) -> None:
+    """Increments the counter ``name`` by ``value``."""
+    with _lock:
+        _counters[name] += value
+
+
+def set_gauge(name: str, value: float) -> None:
+    """Sets the gauge ``name`` to ``value``."""
+    with _lock:
+        _gauges[name] = value
+
+
+def observe(name: str, seconds: float) -> None:
+    """Records one duration sample (in seconds) for ``name``."""
+    with _lock:
+        _timings[name].append(seconds)
+
+
+@contextmanager
+def timed(name: str):
+    """Context manager that records the wall time of its body under ``name``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def _percentile(sorted_samples: list[float], pct: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(pct / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+def snapshot() -> dict:
+    """Returns a copy of all counters, gauges and timing summaries."""
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        samples = {name: sorted(values) for name, values in _timings.items()}
+
+    timings = {}
+    for name, values in samples.items():
+        timings[name] = {
+            "count": len(values),
+            "p50": _percentile(values, 50),
+            "p95": _percentile(values, 95),
+            "p99": _percentile(values, 99),
+            "max": values[-1] if values else 0.0,
+        }
+    return {"counters": counters, "gauges": gauges, "timings": timings}
+
+
+def reset() -> None:
+    """Clears every metric. Mainly useful between load-test runs."""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _timings.clear()
@@ -0,0 +1,444 @@
+"""Bounded session service for long-lived workers.
+
+Drop-in replacement for ADK's ``InMemorySessionService``:
+
+* sessions are kept in an LRU with an idle TTL, so memory stays bounded;
+* each session keeps at most ``max_events`` events, and tool payloads older
+  than the most recent ``keep_full_events`` events are compacted to a stub;
+* ``user:`` state is held in memory only while one of the user's sessions
+  is, and is dropped (or left to SQLite) together with the last of them;
+* with ``sqlite_path`` set, sessions are written through to SQLite and
+  reloaded on demand, so warm sessions survive a restart.
+
+    session_service = BoundedSessionService.from_settings()
+    runner = Runner(agent=root_agent, app_name=APP_NAME, session_service=session_service)
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session, State
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+from . import metrics
+from .settings import settings
+
+_COMPACTED_MARKER = "_compacted"
+
+SessionKey = tuple[str, str, str]
+
+
+def _split_state(state: dict[str, Any]) -> tuple[dict, dict, dict]:
+    """Splits a state dict into (app, user, session) deltas; temp keys are dropped."""
+    app_delta, user_delta, session_delta = {}, {}, {}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            app_delta[key.removeprefix(State.APP_PREFIX)] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_delta[key.removeprefix(State.USER_PREFIX)] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_delta[key] = value
+    return app_delta, user_delta, session_delta
+
+
+def _compact_event(event: Event) -> Event:
+    """Returns a copy of ``event`` with function-response payloads replaced by a stub."""
+    if not event.content or not event.content.parts:
+        return event
+    if not any(
+        part.function_response and not (part.function_response.response or {}).get(_COMPACTED_MARKER)
+        for part in event.content.parts
+    ):
+        return event
+
+    parts = []
+    for part in event.content.parts:
+        response = part.function_response
+        if response is not None and not (response.response or {}).get(_COMPACTED_MARKER):
+            payload = response.response or {}
+            stub = {
+                _COMPACTED_MARKER: True,
+                "keys": sorted(payload)[:10],
+                "size": len(json.dumps(payload, default=str)),
+            }
+            part = part.model_copy(update={"function_response": response.model_copy(update={"response": stub})})
+        parts.append(part)
+    return event.model_copy(update={"content": event.content.model_copy(update={"parts": parts})})
+
+
+class _SQLiteStore:
+    """Write-through persistence for sessions, events and scoped state."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    app_name TEXT, user_id TEXT, id TEXT, state TEXT,
+                    last_update_time REAL, PRIMARY KEY (app_name, user_id, id));
+                CREATE TABLE IF NOT EXISTS events (
+                    app_name TEXT, user_id TEXT, session_id TEXT, seq INTEGER,
+                    event_id TEXT, body TEXT,
+                    PRIMARY KEY (app_name, user_id, session_id, seq));
+                CREATE TABLE IF NOT EXISTS scoped_state (
+                    app_name TEXT, user_id TEXT, state TEXT, PRIMARY KEY (app_name, user_id));
+                """
+            )
+
+    def save_session(self, session: Session) -> None:
+        key = (session.app_name, session.user_id, session.id)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?)",
+                (*key, json.dumps(session.state, default=str), session.last_update_time),
+            )
+
+    def append_event(
+        self,
+        session: Session,
+        event: Event,
+        compacted: Optional[Event] = None,
+        keep_events: Optional[int] = None,
+    ) -> None:
+        """Appends ``event``, rewrites ``compacted`` in place and trims to ``keep_events``."""
+        key = (session.app_name, session.user_id, session.id)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO events VALUES (?, ?, ?, "
+                "(SELECT COALESCE(MAX(seq), -1) + 1 FROM events WHERE app_name=? AND user_id=? AND session_id=?), ?, ?)",
+                (*key, *key, event.id, event.model_dump_json(exclude_none=True)),
+            )
+            if compacted is not None:
+                self._conn.execute(
+                    "UPDATE events SET body=? WHERE app_name=? AND user_id=? AND session_id=? AND event_id=?",
+                    (compacted.model_dump_json(exclude_none=True), *key, compacted.id),
+                )
+            if keep_events is not None:
+                self._conn.execute(
+                    "DELETE FROM events WHERE app_name=? AND user_id=? AND session_id=? AND seq <= "
+                    "(SELECT MAX(seq) FROM events WHERE app_name=? AND user_id=? AND session_id=?) - ?",
+                    (*key, *key, keep_events),
+                )
+            self._conn.execute(
+                "UPDATE sessions SET state=?, last_update_time=? WHERE app_name=? AND user_id=? AND id=?",
+                (json.dumps(session.state, default=str), session.last_update_time, *key),
+            )
+
+    def load_session(self, key: SessionKey) -> Optional[Session]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, last_update_time FROM sessions WHERE app_name=? AND user_id=? AND id=?", key
+            ).fetchone()
+            if row is None:
+                return None
+            bodies = self._conn.execute(
+                "SELECT body FROM events WHERE app_name=? AND user_id=? AND session_id=? ORDER BY seq", key
+            ).fetchall()
+        return Session(
+            app_name=key[0], user_id=key[1], id=key[2],
+            state=json.loads(row[0]), last_update_time=row[1],
+            events=[Event.model_validate_json(body) for (body,) in bodies],
+        )
+
+    def list_sessions(self, app_name: str, user_id: Optional[str]) -> list[Session]:
+        query = "SELECT user_id, id, state, last_update_time FROM sessions WHERE app_name=?"
+        args: tuple = (app_name,)
+        if user_id is not None:
+            query += " AND user_id=?"
+            args += (user_id,)
+        with self._lock:
+            rows = self._conn.execute(query, args).fetchall()
+        return [
+            Session(app_name=app_name, user_id=uid, id=sid, state=json.loads(state), last_update_time=ts)
+            for uid, sid, state, ts in rows
+        ]
+
+    def delete_session(self, key: SessionKey) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE app_name=? AND user_id=? AND id=?", key)
+            self._conn.execute("DELETE FROM events WHERE app_name=? AND user_id=? AND session_id=?", key)
+
+    def delete_expired(self, cutoff: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM events WHERE (app_name, user_id, session_id) IN "
+                "(SELECT app_name, user_id, id FROM sessions WHERE last_update_time < ?)",
+                (cutoff,),
+            )
+            self._conn.execute("DELETE FROM sessions WHERE last_update_time < ?", (cutoff,))
+            # User state goes with the user's last session; app state (user_id "") stays.
+            self._conn.execute(
+                "DELETE FROM scoped_state WHERE user_id != '' AND NOT EXISTS "
+                "(SELECT 1 FROM sessions WHERE sessions.app_name = scoped_state.app_name "
+                "AND sessions.user_id = scoped_state.user_id)"
+            )
+
+    def load_scoped_state(self, app_name: str, user_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM scoped_state WHERE app_name=? AND user_id=?", (app_name, user_id)
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def save_scoped_state(self, app_name: str, user_id: str, state: dict) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scoped_state VALUES (?, ?, ?)",
+                (app_name, user_id, json.dumps(state, default=str)),
+            )
+
+
+class BoundedSessionService(BaseSessionService):
+    """LRU/TTL-bounded session service with event caps and optional SQLite persistence."""
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        ttl_seconds: float = 86400,
+        max_events: int = 200,
+        keep_full_events: int = 20,
+        sqlite_path: Optional[str] = None,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_events = max_events
+        self.keep_full_events = keep_full_events
+        self._sessions: OrderedDict[SessionKey, Session] = OrderedDict()
+        self._store = _SQLiteStore(sqlite_path) if sqlite_path else None
+        # App state is stored under user_id "" next to the per-user state.
+        # User state is only kept for users with a session in ``_sessions``.
+        self._scoped_state: dict[tuple[str, str], dict] = {}
+        self._user_sessions: Counter[tuple[str, str]] = Counter()
+        self._last_disk_sweep = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "BoundedSessionService":
+        return cls(
+            max_sessions=settings.session_max_sessions,
+            ttl_seconds=settings.session_ttl_seconds,
+            max_events=settings.session_max_events,
+            keep_full_events=settings.session_keep_full_events,
+            sqlite_path=settings.session_sqlite_path,
+        )
+
+    # --- BaseSessionService ---
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = (session_id or "").strip() or uuid.uuid4().hex
+        key = (app_name, user_id, session_id)
+        if self._lookup(key) is not None:
+            raise ValueError(f"Session with id {session_id} already exists.")
+
+        app_delta, user_delta, session_state = _split_state(state)
+        session = Session(
+            app_name=app_name, user_id=user_id, id=session_id,
+            state=session_state, last_update_time=time.time(),
+        )
+        self._remember(key, session)
+        self._update_scoped_state(app_name, user_id, app_delta, user_delta)
+        if self._store:
+            self._store.save_session(session)
+        metrics.incr("sessions.created")
+        return self._view(session)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        session = self._lookup((app_name, user_id, session_id.strip()))
+        if session is None:
+            return None
+        events = session.events
+        if config and config.num_recent_events is not None:
+            events = events[-config.num_recent_events:] if config.num_recent_events else []
+        if config and config.after_timestamp is not None:
+            events = [e for e in events if e.timestamp >= config.after_timestamp]
+        return self._view(session, events)
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: Optional[str] = None
+    ) -> ListSessionsResponse:
+        self._evict_expired()
+        found: dict[SessionKey, Session] = {}
+        if self._store:
+            for session in self._store.list_sessions(app_name, user_id):
+                found[(app_name, session.user_id, session.id)] = session
+        with self._lock:
+            for key, session in self._sessions.items():
+                if key[0] == app_name and (user_id is None or key[1] == user_id):
+                    found[key] = session
+        sessions = [self._view(session, []) for session in found.values()]
+        sessions.sort(key=lambda s: (s.last_update_time, s.user_id, s.id))
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id.strip())
+        with self._lock:
+            if self._sessions.pop(key, None) is not None:
+                self._forget_user(key)
+        if self._store:
+            self._store.delete_session(key)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        key = (session.app_name, session.user_id, session.id)
+        stored = self._lookup(key)
+        if stored is None:
+            raise ValueError(f"Session {session.id} not found.")
+
+        await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        app_delta, user_delta, session_delta = _split_state(
+            event.actions.state_delta if event.actions else {}
+        )
+        self._update_scoped_state(session.app_name, session.user_id, app_delta, user_delta)
+        if stored is not session:
+            stored.events.append(event)
+            stored.state.update(session_delta)
+        stored.last_update_time = event.timestamp
+
+        compacted, trimmed = self._enforce_event_cap(stored)
+        if self._store:
+            self._store.append_event(
+                stored, event, compacted, self.max_events if trimmed else None
+            )
+        return event
+
+    # --- internals ---
+
+    def _lookup(self, key: SessionKey) -> Optional[Session]:
+        self._evict_expired()
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                return session
+        if self._store is None:
+            return None
+        session = self._store.load_session(key)
+        if session is not None:
+            metrics.incr("sessions.loaded_from_disk")
+            self._remember(key, session)
+        return session
+
+    def _remember(self, key: SessionKey, session: Session) -> None:
+        with self._lock:
+            if key not in self._sessions:
+                self._user_sessions[key[:2]] += 1
+            self._sessions[key] = session
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                evicted, _ = self._sessions.popitem(last=False)
+                self._forget_user(evicted)
+                metrics.incr("sessions.evicted_lru")
+            metrics.set_gauge("sessions.in_memory", len(self._sessions))
+
+    def _forget_user(self, key: SessionKey) -> None:
+        """Drops the user's state once their last in-memory session is gone (lock held)."""
+        user = key[:2]
+        self._user_sessions[user] -= 1
+        if self._user_sessions[user] <= 0:
+            del self._user_sessions[user]
+            if self._scoped_state.pop(user, None) is not None:
+                metrics.incr("sessions.evicted_user_state")
+        metrics.set_gauge("sessions.users_in_memory", len(self._user_sessions))
+
+    def _evict_expired(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            # The LRU order is close to last-update order, so stop at the first live one.
+            while self._sessions:
+                key, oldest = next(iter(self._sessions.items()))
+                if oldest.last_update_time >= cutoff:
+                    break
+                self._sessions.popitem(last=False)
+                self._forget_user(key)
+                metrics.incr("sessions.evicted_ttl")
+        # The on-disk sweep is a table scan, so run it at most once a minute.
+        if self._store and time.time() - self._last_disk_sweep > 60:
+            self._last_disk_sweep = time.time()
+            self._store.delete_expired(cutoff)
+
+    def _enforce_event_cap(self, session: Session) -> tuple[Optional[Event], bool]:
+        """Compacts the event that just fell out of the full-payload window and
+        trims the oldest events beyond ``max_events``.
+
+        Returns the compacted event (or None) and whether events were trimmed.
+        """
+        events = session.events
+        compacted = None
+        boundary = len(events) - self.keep_full_events - 1
+        if boundary >= 0:
+            candidate = _compact_event(events[boundary])
+            if candidate is not events[boundary]:
+                events[boundary] = compacted = candidate
+                metrics.incr("sessions.events_compacted")
+        trimmed = len(events) > self.max_events
+        if trimmed:
+            del events[: len(events) - self.max_events]
+            metrics.incr("sessions.events_trimmed")
+        return compacted, trimmed
+
+    def _keeps(self, scope_key: tuple[str, str]) -> bool:
+        """App state always stays in memory, user state only with a session (lock held)."""
+        return scope_key[1] == "" or scope_key in self._user_sessions
+
+    def _scoped(self, scope_key: tuple[str, str]) -> dict:
+        """A copy of the app or user state, loading it from SQLite when it is not in memory."""
+        with self._lock:
+            state = self._scoped_state.get(scope_key)
+            if state is not None or self._store is None:
+                return dict(state or {})
+        state = self._store.load_scoped_state(*scope_key) or {}
+        with self._lock:
+            if self._keeps(scope_key):
+                state = self._scoped_state.setdefault(scope_key, state)
+            return dict(state)
+
+    def _update_scoped_state(self, app_name: str, user_id: str, app_delta: dict, user_delta: dict) -> None:
+        for scope_key, delta in (((app_name, ""), app_delta), ((app_name, user_id), user_delta)):
+            if not delta:
+                continue
+            state = self._scoped(scope_key)
+            with self._lock:
+                # Re-read under the lock so concurrent deltas are not lost.
+                state = self._scoped_state.get(scope_key, state)
+                state.update(delta)
+                if self._keeps(scope_key):
+                    self._scoped_state[scope_key] = state
+                saved = dict(state)
+            if self._store:
+                self._store.save_scoped_state(*scope_key, saved)
+
+    def _view(self, session: Session, events: Optional[list[Event]] = None) -> Session:
+        """Returns a light copy of ``session`` with app and user state merged in."""
+        view = session.model_copy(deep=False)
+        view.events = list(session.events if events is None else events)
+        view.state = dict(session.state)
+        for key, value in self._scoped((session.app_name, "")).items():
+            view.state[State.APP_PREFIX + key] = value
+        for key, value in self._scoped((session.app_name, session.user_id)).items():
+            view.state[State.USER_PREFIX + key] = value
+        return view
@@ -1,4 +1,6 @@
 # google_scholar_02/settings.py
+import os
+import tempfile
 from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -10,11 +12,141 @@ class Settings(BaseSettings):
     """
 
     serpapi_api_key: Optional[str] = None
+    # More SerpApi keys to balance calls across (JSON list, e.g. '["key1", "key2"]');
+    # serpapi_api_key, when set, joins the pool.
+    serpapi_api_keys: list[str] = []
     google_genai_use_vertexai: bool = True
     staging_bucket: Optional[str] = None
     google_cloud_location: Optional[str] = None
     google_cloud_project: Optional[str] = None
 
+    # Tool result cache (stale-while-revalidate), keyed by SerpApi engine.
+    # "default" applies to engines that are not listed explicitly.
+    cache_max_entries: int = 2048
+    cache_ttl_seconds: dict[str, int] = {
+        "default": 3600,
+        "google_news": 900,
+        "scholar_profile": 86400,
+        "abstract": 30 * 86400,
+        "author_metrics": 86400,
+    }
+    cache_max_stale_seconds: dict[str, int] = {
+        "default": 86400,
+        "google_news": 3600,
+        "google_scholar_author": 7 * 86400,
+        "scholar_profile": 7 * 86400,
+        # Abstract fetches carry the caller's deadline, so they are never refreshed in the background.
+        "abstract": 0,
+    }
+    cache_refresh_workers: int = 4
+    # Shared tier behind the in-process LRU: "memory" (none), "sqlite" or "redis".
+    cache_backend: str = "memory"
+    cache_sqlite_path: str = "tool_cache.sqlite3"
+    cache_redis_url: str = "redis://localhost:6379/0"
+
+    # SerpApi endpoint; the load test points this at a local mock upstream.
+    serpapi_url: str = "https://serpapi.com/search.json"
+    # Compressed bodies at least this large are parsed incrementally (needs ijson).
+    serpapi_stream_min_bytes: int = 256 * 1024
+
+    # SerpApi calls allowed per rolling hour (0 = unlimited).
+    # Background refreshes are skipped once the budget is spent.
+    serpapi_hourly_budget: int = 0
+    # Client-side SerpApi rate limit shared by all tools (0 = unlimited).
+    serpapi_requests_per_second: float = 0
+    serpapi_burst: int = 5
+    # Per-key SerpApi limits: calls per rolling hour (0 = unknown), 429 cool-down
+    # (doubles on repeated 429s) and how often to read searches left from the account API.
+    serpapi_key_hourly_limit: int = 0
+    serpapi_key_cooldown_seconds: int = 60
+    serpapi_account_url: str = "https://serpapi.com/account.json"
+    serpapi_account_refresh_seconds: int = 900
+    # Paged searches (find_papers_tool / find_news_tool num_results).
+    serpapi_page_workers: int = 4
+    search_max_results: int = 40
+
+    # BoundedSessionService limits; set session_sqlite_path to persist sessions.
+    session_max_sessions: int = 1000
+    session_ttl_seconds: int = 86400
+    session_max_events: int = 200
+    session_keep_full_events: int = 20
+    session_sqlite_path: Optional[str] = None
+
+    # Local author-name index (tools/author_index.py); None keeps it in memory only.
+    author_index_path: Optional[str] = None
+    # How long a recorded single-profile search for a name answers find_author_tool locally.
+    author_index_search_ttl_seconds: int = 7 * 86400
+
+    # Saved watches (tools/watches.py): store, re-run interval, scheduler poll,
+    # results fetched per run and delta size. The store is opened on first use.
+    watch_sqlite_path: str = os.path.join(tempfile.gettempdir(), "google_scholar_02", "watches.sqlite3")
+    watch_interval_seconds: int = 86400
+    watch_poll_seconds: int = 300
+    watch_fetch_results: int = 20
+    watch_max_items_per_update: int = 10
+    watch_scheduler_enabled: bool = True
+
+    # Abstract enrichment for find_papers_tool (tools/abstracts.py).
+    abstract_workers: int = 8
+    abstract_per_host_concurrency: int = 2
+    abstract_per_host_interval_seconds: float = 0.5
+    abstract_deadline_seconds: float = 4.0
+    # Extra time fetches still running at the deadline get to finish and fill the cache.
+    abstract_background_seconds: float = 10.0
+    abstract_max_chars: int = 1500
+    abstract_max_bytes: int = 512 * 1024
+
+    # Author metrics (tools/author_metrics.py): article pages of 100, fetched this many at a time.
+    author_metrics_max_articles: int = 1000
+    author_metrics_page_batch: int = 3
+    author_metrics_max_authors: int = 10
+
+    # Co-author graph (tools/coauthor_graph.py) and its expansion (tools/coauthors.py);
+    # a None path keeps the graph in memory only.
+    coauthor_graph_path: Optional[str] = None
+    coauthor_expand_workers: int = 4
+    coauthor_expand_max_authors: int = 12
+    coauthor_expand_deadline_seconds: float = 6.0
+    coauthor_expand_ttl_seconds: int = 7 * 86400
+    coauthor_path_max_hops: int = 6
+
+    # Author-name resolution cascade (tools/resolve_author.py).
+    author_variant_workers: int = 4
+    author_max_variants: int = 6
+
+    # Opt-in tracemalloc instrumentation (memprofile.py); slows allocation-heavy code a lot.
+    memprofile_enabled: bool = False
+    memprofile_frames: int = 16
+    memprofile_top_n: int = 10
+    # Serializes tool calls so each gets its own snapshot diff; debugging only.
+    memprofile_snapshot_per_call: bool = False
+    memprofile_snapshot_dir: Optional[str] = None
+    memprofile_snapshot_interval_seconds: int = 0
+
+    # Start-up warm-up (warmup.py, run by the AdkApp in deploy.py).
+    warmup_enabled: bool = True
+    warmup_budget_seconds: float = 10
+    warmup_connections: int = 2  # per upstream host
+    warmup_preload_entries: int = 50  # per cache namespace
+
+    # Admission control for the agent's tools (admission.py); "default" applies to
+    # tools that are not listed. Scraping author details is the slowest call.
+    admission_workers: int = 16
+    admission_concurrency: dict[str, int] = {"default": 4, "find_author_details_tool": 2}
+    admission_queue_depth: dict[str, int] = {"default": 16, "find_author_details_tool": 8}
+    admission_max_wait_seconds: dict[str, float] = {"default": 5.0, "find_author_details_tool": 8.0}
+    admission_fallback_entries: int = 512
+
+    # Per-turn tool-call guard (see guard.py).
+    guard_max_calls_per_turn: int = 8
+    guard_max_turn_seconds: float = 90
+    guard_similarity_threshold: float = 0.8
+
+    # Circuit breaker around direct scholar.google.com profile scraping.
+    scholar_circuit_failure_threshold: int = 3
+    scholar_circuit_cooldown_seconds: int = 300
+    scholar_scrape_max_latency_seconds: float = 8.0
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
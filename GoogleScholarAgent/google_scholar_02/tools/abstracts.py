@@ -0,0 +1,202 @@
+"""Abstract enrichment for paper search results.
+
+Scholar results only carry a snippet. ``enrich_abstracts`` fetches the
+landing page of every result link on a bounded thread pool and reads the
+abstract from the page's meta tags (``citation_abstract`` as set by arXiv,
+most publishers and DOI landing pages, then Dublin Core, Open Graph and the
+plain description). arXiv PDF links are read from their ``/abs/`` page.
+
+Politeness: at most ``abstract_per_host_concurrency`` requests per host at a
+time, started at least ``abstract_per_host_interval_seconds`` apart. Only the
+``<head>`` of a page is downloaded when the server allows it. Results
+(including "no abstract found") are cached per link, and the whole stage
+returns at ``abstract_deadline_seconds``: papers not done by then keep "N/A".
+Fetches already running then get ``abstract_background_seconds`` more to
+finish and fill the cache for the next call.
+"""
+
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from urllib.parse import urlsplit
+
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+
+from .. import metrics
+from ..settings import settings
+from .cache import cached
+from .records import NA
+
+_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml',
+}
+# Meta tags holding an abstract, best first: (attribute, value).
+_ABSTRACT_META = (
+    ("name", "citation_abstract"),
+    ("name", "dcterms.abstract"),
+    ("name", "dc.description"),
+    ("property", "og:description"),
+    ("name", "twitter:description"),
+    ("name", "description"),
+)
+# Shorter descriptions are usually site blurbs, not abstracts.
+_MIN_ABSTRACT_CHARS = 80
+_ARXIV_PDF = re.compile(r"^https?://(?:www\.)?arxiv\.org/pdf/([^?#]+?)(?:\.pdf)?(?:[?#].*)?$", re.IGNORECASE)
+_LEADING_LABEL = re.compile(r"^\s*abstract[\s:.\-–—]*", re.IGNORECASE)
+_CHUNK_BYTES = 16 * 1024
+
+
+class HostLimiter:
+    """Caps concurrent requests per host and spaces out their start times."""
+
+    def __init__(self, concurrency: int, interval: float):
+        self.concurrency = max(1, concurrency)
+        self.interval = interval
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, host: str, deadline: float) -> Iterator[None]:
+        """Holds a request slot for ``host``; raises TimeoutError if none frees up before ``deadline``."""
+        with self._lock:
+            semaphore = self._slots.setdefault(host, threading.BoundedSemaphore(self.concurrency))
+        if not semaphore.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            metrics.incr("abstracts.host_busy")
+            raise TimeoutError(f"no request slot for {host} before the deadline")
+        try:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                if start >= deadline:
+                    raise TimeoutError(f"{host} is rate limited past the deadline")
+                self._next_start[host] = start + self.interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+        finally:
+            semaphore.release()
+
+
+host_limiter = HostLimiter(settings.abstract_per_host_concurrency, settings.abstract_per_host_interval_seconds)
+_pool = ThreadPoolExecutor(max_workers=settings.abstract_workers, thread_name_prefix="abstracts")
+http = requests.Session()
+http.headers.update(_HEADERS)
+
+
+def landing_page(link: str) -> Optional[str]:
+    """Returns the page to read an abstract from, or None when the link is a non-arXiv PDF."""
+    arxiv = _ARXIV_PDF.match(link)
+    if arxiv:
+        return f"https://arxiv.org/abs/{arxiv.group(1)}"
+    if urlsplit(link).path.lower().endswith(".pdf"):
+        return None
+    return link
+
+
+def _host(url: str) -> str:
+    host = urlsplit(url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def clean_abstract(value: str) -> str:
+    value = _LEADING_LABEL.sub("", " ".join(value.split()))
+    limit = settings.abstract_max_chars
+    if len(value) > limit:
+        value = value[:limit].rsplit(" ", 1)[0] + "…"
+    return value
+
+
+def extract_abstract(html: str) -> str:
+    """Reads the abstract from a landing page's meta tags; NA when there is none."""
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("meta"))
+    found: dict[tuple[str, str], str] = {}
+    for tag in soup.find_all("meta"):
+        content = tag.get("content")
+        if not content:
+            continue
+        for attribute in ("name", "property"):
+            value = tag.get(attribute)
+            if value:
+                found.setdefault((attribute, value.strip().lower()), content)
+    for key in _ABSTRACT_META:
+        content = found.get(key)
+        if content and len(content.strip()) >= _MIN_ABSTRACT_CHARS:
+            return clean_abstract(content)
+    return NA
+
+
+def _download_head(url: str, deadline: float) -> Optional[str]:
+    """Downloads ``url`` up to ``</head>`` (or the size cap); None for non-HTML responses."""
+    timeout = max(0.1, deadline - time.monotonic())
+    with http.get(url, timeout=timeout, stream=True, allow_redirects=True) as response:
+        response.raise_for_status()
+        if "html" not in response.headers.get("Content-Type", "html").lower():
+            return None
+        body = bytearray()
+        for chunk in response.iter_content(_CHUNK_BYTES):
+            # Search a little before the new chunk in case the tag straddles two chunks.
+            search_from = max(0, len(body) - 7)
+            body += chunk
+            if body.find(b"</head>", search_from) >= 0 or len(body) >= settings.abstract_max_bytes:
+                break
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"reading {url} ran past the deadline")
+        return body.decode(response.encoding or "utf-8", errors="replace")
+
+
+def _fetch_abstract(link: str, deadline: float) -> str:
+    page = landing_page(link)
+    if page is None:
+        metrics.incr("abstracts.skipped_pdf")
+        return NA
+    with host_limiter.slot(_host(page), deadline):
+        with metrics.timed("abstracts.fetch_latency"):
+            html = _download_head(page, deadline)
+    return NA if html is None else extract_abstract(html)
+
+
+def fetch_abstract(link: str, deadline: float) -> str:
+    """Abstract for ``link``, served from the cache when possible (misses included)."""
+    return cached("abstract", {"link": link}, lambda: _fetch_abstract(link, deadline))
+
+
+def enrich_abstracts(articles: list[dict], deadline_seconds: Optional[float] = None) -> None:
+    """Adds an 'abstract' to every article in place, within one overall deadline.
+
+    Fetch errors and links not finished in time leave "N/A". Fetches still
+    running at the deadline keep going in the background, until
+    ``abstract_background_seconds`` later, and fill the cache for the next
+    call; queued ones are cancelled.
+    """
+    deadline_seconds = settings.abstract_deadline_seconds if deadline_seconds is None else deadline_seconds
+    # The fetches' own deadline: the answer does not wait for it, the cache does.
+    fetch_deadline = time.monotonic() + deadline_seconds + settings.abstract_background_seconds
+    links = {article["link"] for article in articles if article.get("link", NA) != NA}
+    with metrics.timed("abstracts.enrich"):
+        futures = {link: _pool.submit(fetch_abstract, link, fetch_deadline) for link in links}
+        wait(futures.values(), timeout=deadline_seconds)
+
+    abstracts = {}
+    for link, future in futures.items():
+        if not future.done():
+            future.cancel()
+            metrics.incr("abstracts.timed_out")
+            continue
+        try:
+            abstracts[link] = future.result()
+        except (TimeoutError, requests.exceptions.Timeout):
+            metrics.incr("abstracts.timed_out")
+        except Exception as e:
+            metrics.incr("abstracts.failed")
+            print(f"DEBUG: abstract fetch failed for {link}: {e}")
+
+    for article in articles:
+        abstract = abstracts.get(article.get("link"), NA)
+        metrics.incr("abstracts.found" if abstract != NA else "abstracts.missing")
+        article["abstract"] = abstract
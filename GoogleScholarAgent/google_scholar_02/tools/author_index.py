@@ -0,0 +1,183 @@
+"""Local author-name index so repeated author lookups skip SerpApi.
+
+Every author seen by find_author_tool, find_papers_tool (author_names /
+author_ids) and find_author_details_tool is added incrementally, with the
+best display name, affiliation and link seen so far and a sightings count.
+
+Profiles seen on this replica say nothing about namesakes it has not seen,
+so ``lookup`` only answers for names (normalized: lower case, no accents or
+punctuation) whose upstream profile search (find_author_tool) was recorded
+with ``record_search`` within ``author_index_search_ttl_seconds``. It then
+returns that search's whole candidate list, the authors seen most often in
+papers and author details first, then those with a known affiliation. Every
+other name goes upstream.
+
+With ``settings.author_index_path`` set, the index is saved as gzipped JSON
+(author rows and the recorded searches) and reloaded on start.
+"""
+
+import atexit
+import gzip
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from typing import Optional
+
+from .. import metrics
+from ..settings import settings
+
+# Letters that NFKD does not decompose into ASCII + combining marks.
+_TRANSLITERATIONS = str.maketrans({
+    "ß": "ss", "æ": "ae", "Æ": "Ae", "ø": "o", "Ø": "O", "ł": "l", "Ł": "L",
+    "đ": "d", "Đ": "D", "þ": "th", "Þ": "Th", "œ": "oe", "Œ": "Oe", "ı": "i",
+})
+
+_PROFILE_URL = "https://scholar.google.com/citations?user={}"
+
+
+def strip_diacritics(name: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", name.translate(_TRANSLITERATIONS))
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def normalize_name(name: str) -> str:
+    """Lower-cased, accent-free, punctuation-free form of a name."""
+    return " ".join(re.findall(r"\w+", strip_diacritics(name).lower()))
+
+
+class AuthorIndex:
+    """Incremental author table plus the recorded name -> author_ids searches."""
+
+    def __init__(self, path: Optional[str] = None, save_every: int = 200):
+        self.path = path
+        self.save_every = save_every
+        # author_id -> [display name, affiliations, link, sightings, from_profile]
+        self._authors: dict[str, list] = {}
+        # normalized name -> (author_ids an upstream profile search returned, when)
+        self._searches: dict[str, tuple[list[str], float]] = {}
+        self._dirty = 0
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def __len__(self) -> int:
+        return len(self._authors)
+
+    # --- updates ---
+
+    def add(
+        self,
+        author_id: str,
+        name: str,
+        affiliations: Optional[str] = None,
+        link: Optional[str] = None,
+        from_profile: bool = False,
+    ) -> None:
+        if not author_id or author_id == "N/A" or not name or name == "N/A":
+            return
+        with self._lock:
+            record = self._authors.get(author_id)
+            if record is None:
+                record = self._authors[author_id] = [name, None, None, 0, False]
+            if from_profile or not record[4]:
+                # Profile names ("Geoffrey Hinton") beat paper bylines ("G Hinton").
+                record[0] = name
+            if affiliations and affiliations != "N/A":
+                record[1] = affiliations
+            if link and link != "N/A":
+                record[2] = link
+            record[3] += 1
+            record[4] = record[4] or from_profile
+            self._dirty += 1
+            should_save = self.path and self._dirty >= self.save_every
+        if should_save:
+            self.save()
+
+    def record_search(self, name: str, author_ids: list[str]) -> None:
+        """Records the complete candidate list of an upstream profile search for ``name``."""
+        key = normalize_name(name)
+        if not key:
+            return
+        with self._lock:
+            self._searches[key] = (list(author_ids), time.time())
+            self._dirty += 1
+
+    def add_from_papers(self, articles: list[dict]) -> None:
+        for article in articles:
+            for name, author_id in zip(article.get("author_names", []), article.get("author_ids", [])):
+                self.add(author_id, name)
+
+    # --- queries ---
+
+    def lookup(self, name: str) -> Optional[list[dict]]:
+        """Returns the authors an upstream search for ``name`` found, or None.
+
+        Only a profile search for exactly this normalized name, recorded
+        within ``author_index_search_ttl_seconds`` and with at least one
+        result, answers; profiles only seen through papers or author details
+        never do, since namesakes may exist upstream. The candidates are
+        ranked by sightings, then by whether an affiliation is known.
+        """
+        key = normalize_name(name)
+        with self._lock:
+            search = self._searches.get(key)
+            if search is None:
+                metrics.incr("author_index.miss")
+                return None
+            author_ids, searched_at = search
+            if time.time() - searched_at > settings.author_index_search_ttl_seconds:
+                metrics.incr("author_index.expired")
+                return None
+            if not author_ids or any(a not in self._authors for a in author_ids):
+                metrics.incr("author_index.miss")
+                return None
+            # sorted() is stable: equal candidates keep the upstream order.
+            ranked = sorted(
+                author_ids,
+                key=lambda a: (self._authors[a][3], self._authors[a][1] is not None),
+                reverse=True,
+            )
+            metrics.incr("author_index.hit")
+            return [self._profile(author_id) for author_id in ranked]
+
+    def _profile(self, author_id: str) -> dict:
+        name, affiliations, link, _, _ = self._authors[author_id]
+        profile = {"name": name, "link": link or _PROFILE_URL.format(author_id), "author_id": author_id}
+        if affiliations:
+            profile["affiliations"] = affiliations
+        return profile
+
+    # --- persistence ---
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                "authors": [[author_id, *record] for author_id, record in self._authors.items()],
+                "searches": [[name, ids, at] for name, (ids, at) in self._searches.items()],
+            }
+            self._dirty = 0
+        tmp_path = self.path + ".tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _load(self, path: str) -> None:
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"DEBUG: could not load author index {path}: {e}")
+            return
+        for author_id, name, affiliations, link, sightings, from_profile in data["authors"]:
+            self._authors[author_id] = [name, affiliations, link, sightings, from_profile]
+        self._searches = {name: (ids, at) for name, ids, at in data.get("searches", [])}
+
+
+author_index = AuthorIndex(settings.author_index_path)
+if settings.author_index_path:
+    atexit.register(author_index.save)
@@ -0,0 +1,249 @@
+"""Tool to compute citation metrics for one or more Google Scholar authors.
+
+The full publication list is read from the google_scholar_author engine in
+pages of 100 articles (Scholar lists them most-cited first, so paging stops
+at the first page that ends in an uncited article), together with Scholar's
+own ``cited_by`` table and citations-per-year graph. Each author becomes a
+pair of integer columns (citations and year per article).
+
+``compute_metrics`` pads the columns of a whole batch of authors into 2-D
+arrays and derives h-index, i10-index, g-index, totals, citations per year
+and the citation trend for every author in one vectorized NumPy pass. The
+computed metrics are cached per author_id.
+"""
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import numpy as np
+import requests
+
+from .. import metrics
+from ..memprofile import profiled
+from ..settings import settings
+from .cache import make_key, tool_cache
+from .serpapi import serpapi_search, serpapi_search_pages
+
+ARTICLE_PAGE_SIZE = 100
+# Complete years used for the trend; the current year is still partial.
+TREND_YEARS = 5
+PER_YEAR_SHOWN = 10
+
+_author_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="author-metrics")
+
+
+def _int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_article_columns(results: dict) -> list[tuple[int, int]]:
+    """(citations, year) per article; 0 where Scholar has none."""
+    return [
+        (_int((article.get("cited_by") or {}).get("value")), _int(article.get("year")))
+        for article in results.get("articles", [])
+    ]
+
+
+def parse_metrics_page(results: dict) -> dict:
+    """First article page plus the author's name, cited_by table and graph."""
+    table = {}
+    for row in (results.get("cited_by") or {}).get("table", []):
+        for metric, values in row.items():
+            for period, value in values.items():
+                table[metric if period == "all" else f"{metric}_{period}"] = _int(value)
+    graph = [(_int(point.get("year")), _int(point.get("citations")))
+             for point in (results.get("cited_by") or {}).get("graph", [])]
+    return {
+        "name": (results.get("author") or {}).get("name", "N/A"),
+        "table": table,
+        "graph": [point for point in graph if point[0]],
+        "articles": parse_article_columns(results),
+    }
+
+
+def fetch_author_columns(author_id: str) -> dict:
+    """Reads an author's articles (most-cited first) until the citations run out."""
+    params = {"engine": "google_scholar_author", "author_id": author_id}
+    first = serpapi_search({**params, "num": ARTICLE_PAGE_SIZE}, timeout=10, parse=parse_metrics_page)
+    articles = list(first["articles"])
+    start = ARTICLE_PAGE_SIZE
+    # A short page is the last one, and once an article has no citations
+    # neither do the ones after it, so they cannot change any metric.
+    while len(articles) == start and articles[-1][0] > 0 and start < settings.author_metrics_max_articles:
+        pages = min(settings.author_metrics_page_batch,
+                    -(-(settings.author_metrics_max_articles - start) // ARTICLE_PAGE_SIZE))
+        rows = serpapi_search_pages(params, pages * ARTICLE_PAGE_SIZE, ARTICLE_PAGE_SIZE,
+                                    parse_article_columns, start=start)
+        articles.extend(rows)
+        if len(rows) < pages * ARTICLE_PAGE_SIZE:
+            break
+        start += pages * ARTICLE_PAGE_SIZE
+    metrics.incr("author_metrics.articles_read", len(articles))
+    return {
+        "name": first["name"],
+        "table": first["table"],
+        "graph": first["graph"],
+        "cited_by": np.fromiter((c for c, _ in articles), dtype=np.int64, count=len(articles)),
+        "years": np.fromiter((y for _, y in articles), dtype=np.int64, count=len(articles)),
+    }
+
+
+def _padded(columns: list[np.ndarray]) -> np.ndarray:
+    width = max(1, max(len(column) for column in columns))
+    matrix = np.zeros((len(columns), width), dtype=np.int64)
+    for row, column in enumerate(columns):
+        matrix[row, :len(column)] = column
+    return matrix
+
+
+def compute_metrics(authors: list[dict], current_year: int) -> list[dict]:
+    """Citation metrics for a batch of authors (``fetch_author_columns`` output), in one pass."""
+    # Articles: one row per author, most-cited first, zero padded.
+    cited = -np.sort(-_padded([a["cited_by"] for a in authors]), axis=1)
+    ranks = np.arange(1, cited.shape[1] + 1)
+    h_index = (cited >= ranks).sum(axis=1)
+    i10_index = (cited >= 10).sum(axis=1)
+    cumulative = np.cumsum(cited, axis=1)
+    total = cumulative[:, -1]
+    # g: the largest g whose top g articles have at least g^2 citations together.
+    g_hits = cumulative >= ranks ** 2
+    g_index = np.where(g_hits.any(axis=1), cited.shape[1] - np.argmax(g_hits[:, ::-1], axis=1), 0)
+    years = _padded([a["years"] for a in authors])
+    recent_articles = ((years > current_year - TREND_YEARS) & (years <= current_year)).sum(axis=1)
+
+    # Citations per year: one row per author over a shared year axis.
+    first_year = min((year for a in authors for year, _ in a["graph"]), default=current_year)
+    axis = np.arange(first_year, current_year + 1)
+    per_year = np.zeros((len(authors), len(axis)), dtype=np.int64)
+    for row, author in enumerate(authors):
+        if author["graph"]:
+            graph = np.asarray(author["graph"], dtype=np.int64)
+            graph = graph[(graph[:, 0] >= first_year) & (graph[:, 0] <= current_year)]
+            per_year[row, graph[:, 0] - first_year] = graph[:, 1]
+
+    # Trend over the last complete years: least-squares slope, and the last
+    # three years against the three before them.
+    complete = per_year[:, :-1][:, -TREND_YEARS:].astype(float)
+    if complete.shape[1] >= 2:
+        x = np.arange(complete.shape[1], dtype=float)
+        x -= x.mean()
+        slope = (complete - complete.mean(axis=1, keepdims=True)) @ x / (x @ x)
+    else:
+        slope = np.zeros(len(authors))
+    mean = complete.mean(axis=1) if complete.shape[1] else np.zeros(len(authors))
+    relative_slope = slope / np.maximum(mean, 1.0)
+    recent3 = per_year[:, :-1][:, -3:].sum(axis=1)
+    previous3 = per_year[:, :-1][:, -6:-3].sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = np.where(previous3 > 0, (recent3 / previous3 - 1) * 100, np.nan)
+    direction = np.where(relative_slope > 0.05, "rising", np.where(relative_slope < -0.05, "declining", "flat"))
+
+    shown = axis[-PER_YEAR_SHOWN:]
+    results = []
+    for row, author in enumerate(authors):
+        results.append({
+            "name": author["name"],
+            "h_index": int(h_index[row]),
+            "i10_index": int(i10_index[row]),
+            "g_index": int(g_index[row]),
+            "total_citations": int(total[row]),
+            "articles_counted": int(len(author["cited_by"])),
+            f"articles_last_{TREND_YEARS}_years": int(recent_articles[row]),
+            "citations_per_year": {
+                str(year): int(count)
+                for year, count in zip(shown, per_year[row, -len(shown):]) if count
+            },
+            "trend": {
+                "direction": str(direction[row]),
+                "slope_citations_per_year": round(float(slope[row]), 1),
+                "growth_last_3_years_pct": None if np.isnan(growth[row]) else round(float(growth[row]), 1),
+            },
+            # Scholar's own numbers, for comparison with the ones computed from the article list.
+            "scholar_reported": author["table"],
+        })
+    return results
+
+
+def _ranking(rows: list[dict]) -> dict[str, list[str]]:
+    ids = np.array([row["author_id"] for row in rows])
+    columns = {
+        "h_index": np.array([row["h_index"] for row in rows]),
+        "total_citations": np.array([row["total_citations"] for row in rows]),
+        "trend": np.array([row["trend"]["slope_citations_per_year"] for row in rows]),
+    }
+    return {name: ids[np.argsort(-values, kind="stable")].tolist() for name, values in columns.items()}
+
+
+def _cache_key(author_id: str) -> str:
+    return make_key("author_metrics", {"author_id": author_id})
+
+
+@profiled
+def author_metrics_tool(author_ids: list[str]) -> dict:
+    """Computes citation metrics (h-index, i10-index, g-index, citations per year, trend)
+    from an author's full Google Scholar publication list.
+
+    Args:
+        author_ids: One or more Google Scholar author IDs (e.g. ["2EpSYrcAAAAJ"]).
+            Pass several to compare authors in one call. A single ID string is
+            accepted too.
+
+    Returns:
+        A dictionary with an 'authors' list (one entry per author_id with the
+        metrics, or an 'error') and, for more than one author, a 'ranking' of
+        the author_ids by h_index, total_citations and trend.
+    """
+    if isinstance(author_ids, str):
+        # A bare "ID" or "ID1, ID2" would otherwise be iterated character by character.
+        author_ids = re.split(r"[\s,]+", author_ids)
+    if not isinstance(author_ids, (list, tuple)):
+        return {"error": "author_ids must be a list of author IDs."}
+    author_ids = list(dict.fromkeys(str(a).strip() for a in author_ids if a and str(a).strip()))
+    if not author_ids:
+        return {"error": "author_ids must contain at least one author ID."}
+    author_ids = author_ids[: settings.author_metrics_max_authors]
+
+    ttl = settings.cache_ttl_seconds.get("author_metrics", settings.cache_ttl_seconds["default"])
+    now = time.time()
+    cached = tool_cache.get_many([_cache_key(a) for a in author_ids])
+    found = {}
+    for author_id in author_ids:
+        entry = cached.get(_cache_key(author_id))
+        if entry is not None and now - entry["computed_at"] <= ttl:
+            found[author_id] = entry
+    metrics.incr("author_metrics.cache_hit", len(found))
+
+    missing = [a for a in author_ids if a not in found]
+    errors = {}
+    if missing:
+        fetched = {}
+        for author_id, future in [(a, _author_pool.submit(fetch_author_columns, a)) for a in missing]:
+            try:
+                fetched[author_id] = future.result()
+            except requests.exceptions.RequestException as e:
+                errors[author_id] = f"Request error: {e}"
+            except Exception as e:
+                errors[author_id] = f"Unexpected error: {e}"
+        if fetched:
+            with metrics.timed("author_metrics.compute"):
+                computed = compute_metrics(list(fetched.values()), time.gmtime().tm_year)
+            for author_id, row in zip(fetched, computed):
+                row = {"author_id": author_id, **row, "computed_at": now}
+                tool_cache.set(_cache_key(author_id), row, expire=ttl)
+                found[author_id] = row
+
+    rows = [
+        {k: v for k, v in found[a].items() if k != "computed_at"} if a in found
+        else {"author_id": a, "error": errors[a]}
+        for a in author_ids
+    ]
+    result = {"authors": rows}
+    computed_rows = [row for row in rows if "error" not in row]
+    if len(computed_rows) > 1:
+        result["ranking"] = _ranking(computed_rows)
+    return result
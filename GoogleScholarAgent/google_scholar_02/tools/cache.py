@@ -0,0 +1,202 @@
+"""Stale-while-revalidate cache for SerpApi and Scholar profile results.
+
+Fresh entries are served directly. Once an entry is older than its TTL but
+still within the engine's max staleness, the stale value is returned right
+away and a single background refresh is scheduled on a bounded worker pool.
+Entries older than that are fetched synchronously.
+
+Lookups go to an in-process LRU first and then to the shared backend chosen
+by ``settings.cache_backend`` (see ``cache_backends.py``), so results fetched
+by one replica are reused by all of them.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional
+
+from .. import metrics
+from ..settings import settings
+from .cache_backends import CacheBackend, Entry, MemoryBackend, backend_from_settings
+
+
+def make_key(namespace: str, params: dict) -> str:
+    """Builds a stable cache key from a namespace and request parameters.
+
+    The API key is left out so that the same query shares one entry.
+    """
+    significant = {k: v for k, v in params.items() if k != "api_key"}
+    return f"{namespace}:{json.dumps(significant, sort_keys=True, default=str)}"
+
+
+def _engine_setting(values: dict[str, int], engine: str) -> int:
+    return values.get(engine, values.get("default", 0))
+
+
+class ToolCache:
+    """Thread-safe two-tier cache with stale-while-revalidate semantics."""
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        refresh_workers: int = 4,
+        shared: Optional[CacheBackend] = None,
+    ):
+        self._local = MemoryBackend(max_entries)
+        self._shared = shared
+        self._refreshing: set[str] = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, refresh_workers),
+            thread_name_prefix="cache-refresh",
+        )
+
+    def _lookup_many(self, keys: list[str]) -> dict[str, Entry]:
+        found = self._local.get_many(keys)
+        missing = [key for key in keys if key not in found]
+        if missing and self._shared is not None:
+            try:
+                shared = self._shared.get_many(missing)
+            except Exception as e:
+                # A broken shared tier degrades to local-only caching.
+                metrics.incr("cache.shared_error")
+                print(f"DEBUG: shared cache read failed: {e}")
+                shared = {}
+            for key, (value, stored_at) in shared.items():
+                self._local.set(key, value, stored_at)
+                metrics.incr("cache.shared_hit")
+            found.update(shared)
+        return found
+
+    def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Any],
+        *,
+        ttl: float,
+        max_stale: float,
+        can_refresh: Callable[[], bool] = lambda: True,
+        fresh: bool = False,
+    ) -> Any:
+        """Returns the cached value for ``key``, calling ``fetch`` when needed.
+
+        With ``fresh`` the cached value is skipped: ``fetch`` always runs and
+        its result replaces the entry. Exceptions raised by ``fetch`` on the
+        synchronous path propagate to the caller and nothing is cached.
+        """
+        entry = None if fresh else self._lookup_many([key]).get(key)
+
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age <= ttl:
+                metrics.incr("cache.hit")
+                return value
+            if age <= ttl + max_stale:
+                metrics.incr("cache.stale_hit")
+                self._schedule_refresh(key, fetch, can_refresh, ttl + max_stale)
+                return value
+
+        metrics.incr("cache.miss")
+        value = fetch()
+        self.set(key, value, expire=ttl + max_stale)
+        return value
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        """Returns cached values (regardless of age) for the keys that are present.
+
+        Misses in the local tier are fetched from the shared backend in one batch.
+        """
+        return {key: value for key, (value, _) in self._lookup_many(list(keys)).items()}
+
+    def peek(self, key: str, max_age: Optional[float] = None) -> Any | None:
+        """Returns the cached value for ``key``, or None.
+
+        Age is ignored unless ``max_age`` is given; older entries then count as missing.
+        """
+        entry = self._lookup_many([key]).get(key)
+        if entry is None or (max_age is not None and time.time() - entry[1] > max_age):
+            return None
+        return entry[0]
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None) -> None:
+        stored_at = time.time()
+        self._local.set(key, value, stored_at)
+        if self._shared is not None:
+            try:
+                self._shared.set(key, value, stored_at, expire)
+            except Exception as e:
+                metrics.incr("cache.shared_error")
+                print(f"DEBUG: shared cache write failed: {e}")
+
+    def clear(self) -> None:
+        self._local.clear()
+
+    def preload(self, namespaces: Iterable[str], per_namespace: int) -> int:
+        """Copies the most-read shared entries of each namespace into the local LRU.
+
+        Returns how many entries were loaded (0 without a shared tier).
+        """
+        if self._shared is None:
+            return 0
+        loaded = 0
+        for namespace in namespaces:
+            for key, (value, stored_at) in self._shared.hottest(namespace, per_namespace).items():
+                self._local.set(key, value, stored_at)
+                loaded += 1
+        metrics.incr("cache.preloaded", loaded)
+        return loaded
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        fetch: Callable[[], Any],
+        can_refresh: Callable[[], bool],
+        expire: float,
+    ) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            if not can_refresh():
+                metrics.incr("cache.refresh_skipped")
+                return
+            self._refreshing.add(key)
+        self._executor.submit(self._refresh, key, fetch, expire)
+
+    def _refresh(self, key: str, fetch: Callable[[], Any], expire: float) -> None:
+        try:
+            self.set(key, fetch(), expire)
+            metrics.incr("cache.refreshed")
+        except Exception as e:
+            # Keep serving the stale value; the next stale hit retries.
+            metrics.incr("cache.refresh_failed")
+            print(f"DEBUG: background refresh failed for {key}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+tool_cache = ToolCache(
+    max_entries=settings.cache_max_entries,
+    refresh_workers=settings.cache_refresh_workers,
+    shared=backend_from_settings(settings),
+)
+
+
+def cached(
+    engine: str,
+    params: dict,
+    fetch: Callable[[], Any],
+    can_refresh: Callable[[], bool] = lambda: True,
+    fresh: bool = False,
+) -> Any:
+    """Serves ``fetch()`` through the shared cache using the engine's TTLs (``fresh`` bypasses it)."""
+    return tool_cache.get_or_fetch(
+        make_key(engine, params),
+        fetch,
+        ttl=_engine_setting(settings.cache_ttl_seconds, engine),
+        max_stale=_engine_setting(settings.cache_max_stale_seconds, engine),
+        can_refresh=can_refresh,
+        fresh=fresh,
+    )
@@ -0,0 +1,254 @@
+"""Storage backends for the tool result cache.
+
+``ToolCache`` always keeps an in-process LRU in front of an optional shared
+backend. The shared backends store zlib-compressed JSON (or packed records)
+so that results fetched by one Agent Engine replica can be reused by every
+other replica:
+
+* ``SQLiteBackend``: a local file, survives restarts of a single worker;
+* ``RedisBackend``: any Redis-protocol server (Redis, Valkey, Memorystore),
+  shared across replicas. Needs the optional ``redis`` package.
+"""
+
+import json
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+
+from .. import metrics
+from . import records
+from .payloads import loads
+
+Entry = tuple[Any, float]  # (value, stored_at)
+
+_STORED_AT = struct.Struct("!d")
+
+
+# Mark entries holding parsed records, packed or as tagged JSON; a zlib
+# stream never starts with either byte.
+_RECORDS_MARKER = b"R"
+_JSON_RECORDS_MARKER = b"J"
+
+
+def _json(value: Any) -> bytes:
+    return zlib.compress(json.dumps(value, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def encode_entry(value: Any, stored_at: float) -> bytes:
+    """Serializes an entry as an 8-byte timestamp followed by compressed JSON.
+
+    Values with records use packed records when every record type in them
+    gains from it (``records.PACKED_TYPES``), and tagged JSON otherwise.
+    """
+    if records.contains_records(value):
+        if records.prefers_packed(value):
+            try:
+                return _STORED_AT.pack(stored_at) + _RECORDS_MARKER + zlib.compress(records.pack(value))
+            except ValueError:
+                metrics.incr("cache.pack_fallback")
+        return _STORED_AT.pack(stored_at) + _JSON_RECORDS_MARKER + _json(records.to_json(value))
+    return _STORED_AT.pack(stored_at) + _json(value)
+
+
+def decode_entry(blob: bytes) -> Entry:
+    (stored_at,) = _STORED_AT.unpack_from(blob)
+    body = blob[_STORED_AT.size:]
+    if body[:1] == _RECORDS_MARKER:
+        return records.unpack(zlib.decompress(body[1:])), stored_at
+    if body[:1] == _JSON_RECORDS_MARKER:
+        return records.from_json(loads(zlib.decompress(body[1:]))), stored_at
+    return loads(zlib.decompress(body)), stored_at
+
+
+class CacheBackend:
+    """Interface for cache storage. ``expire`` is a hint in seconds."""
+
+    def get(self, key: str) -> Optional[Entry]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Entry]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, stored_at: float, expire: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def hottest(self, namespace: str, limit: int) -> dict[str, Entry]:
+        """The ``limit`` most-read live entries whose key starts with ``namespace:``.
+
+        Used to warm a fresh replica; backends without read counts return nothing.
+        """
+        return {}
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU. Values are kept as live objects, not serialized."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Entry]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = entry
+        return found
+
+    def set(self, key: str, value: Any, stored_at: float, expire: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (value, stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                metrics.incr("cache.evicted")
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend(CacheBackend):
+    """Compressed entries in a local SQLite file, with per-key hit counts."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB, expires_at REAL, hits INTEGER DEFAULT 0)"
+            )
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Entry]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                f"SELECT key, value FROM cache WHERE key IN ({placeholders}) "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (*keys, time.time()),
+            ).fetchall()
+            if rows:
+                self._conn.execute(
+                    f"UPDATE cache SET hits = hits + 1 WHERE key IN ({','.join('?' * len(rows))})",
+                    [key for key, _ in rows],
+                )
+        return {key: decode_entry(blob) for key, blob in rows}
+
+    def set(self, key: str, value: Any, stored_at: float, expire: Optional[float] = None) -> None:
+        expires_at = stored_at + expire if expire else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO cache (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+                (key, encode_entry(value, stored_at), expires_at),
+            )
+
+    def hottest(self, namespace: str, limit: int) -> dict[str, Entry]:
+        # Range scan on the primary key instead of LIKE, which would not use the index.
+        prefix = namespace + ":"
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM cache WHERE key >= ? AND key < ? "
+                "AND (expires_at IS NULL OR expires_at > ?) ORDER BY hits DESC LIMIT ?",
+                (prefix, namespace + ";", time.time(), limit),
+            ).fetchall()
+        return {key: decode_entry(blob) for key, blob in rows}
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache")
+
+    def purge_expired(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+
+
+class RedisBackend(CacheBackend):
+    """Compressed entries on a Redis-protocol server; batch reads use one MGET.
+
+    Read counts live in one sorted set per namespace, capped at
+    ``max_tracked`` members, for ``hottest``.
+    """
+
+    def __init__(self, url: str, prefix: str = "gs02:", max_tracked: int = 10000):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("RedisBackend requires the 'redis' package (pip install redis)") from e
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self._max_tracked = max_tracked
+
+    def _hits_key(self, key: str) -> str:
+        return f"{self._prefix}hits:{key.split(':', 1)[0]}"
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Entry]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        blobs = self._client.mget([self._prefix + key for key in keys])
+        found = {key: decode_entry(blob) for key, blob in zip(keys, blobs) if blob is not None}
+        if found:
+            pipe = self._client.pipeline(transaction=False)
+            for key in found:
+                pipe.zincrby(self._hits_key(key), 1, key)
+                pipe.zremrangebyrank(self._hits_key(key), 0, -self._max_tracked - 1)
+            pipe.execute()
+        return found
+
+    def hottest(self, namespace: str, limit: int) -> dict[str, Entry]:
+        # Over-fetch a little: some of the hottest keys may have expired.
+        keys = [k.decode() for k in self._client.zrevrange(self._hits_key(namespace + ":"), 0, 2 * limit - 1)]
+        if not keys:
+            return {}
+        blobs = self._client.mget([self._prefix + key for key in keys])
+        entries = [(key, blob) for key, blob in zip(keys, blobs) if blob is not None]
+        return {key: decode_entry(blob) for key, blob in entries[:limit]}
+
+    def set(self, key: str, value: Any, stored_at: float, expire: Optional[float] = None) -> None:
+        self._client.set(
+            self._prefix + key,
+            encode_entry(value, stored_at),
+            ex=max(1, int(expire)) if expire else None,
+        )
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._prefix + key)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=self._prefix + "*", count=500):
+            self._client.delete(key)
+
+
+def backend_from_settings(settings) -> Optional[CacheBackend]:
+    """Builds the shared backend selected by ``settings.cache_backend``, if any."""
+    if settings.cache_backend == "sqlite":
+        return SQLiteBackend(settings.cache_sqlite_path)
+    if settings.cache_backend == "redis":
+        return RedisBackend(settings.cache_redis_url)
+    return None
@@ -0,0 +1,124 @@
+"""Circuit breaker and adaptive source selection for flaky upstreams."""
+
+import threading
+import time
+
+from .. import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the circuit is open."""
+
+
+class CircuitBreaker:
+    """Classic closed/open/half-open breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    every call is refused for ``cooldown_seconds``. The first call after the
+    cool-down is let through as a half-open probe; its outcome decides whether
+    the circuit closes again or re-opens for another cool-down.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, cooldown_seconds: float = 300):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """Returns True if a call may go through right now."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and time.time() - self._opened_at >= self.cooldown_seconds:
+                self._set_state(HALF_OPEN)
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            metrics.incr(f"circuit.{self.name}.rejected")
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            if self._state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.time()
+                if self._state != OPEN:
+                    metrics.incr(f"circuit.{self.name}.opened")
+                self._set_state(OPEN)
+
+    def _set_state(self, state: str) -> None:
+        self._state = state
+        metrics.set_gauge(f"circuit.{self.name}.open", 0 if state == CLOSED else 1)
+
+
+class SourceSelector:
+    """Tracks success rate and latency per source with exponential averages.
+
+    ``choose`` returns the first source in preference order that currently
+    looks healthy, otherwise the one with the best observed success rate.
+    Every ``explore_interval``-th call goes to the first preferred source
+    anyway so that an unhealthy source gets a chance to recover.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        min_success: float = 0.5,
+        max_latency: float = 8.0,
+        explore_interval: int = 10,
+    ):
+        self.alpha = alpha
+        self.min_success = min_success
+        self.max_latency = max_latency
+        self.explore_interval = explore_interval
+        self._stats: dict[str, dict[str, float]] = {}
+        self._calls = 0
+        self._lock = threading.Lock()
+
+    def record(self, source: str, ok: bool, latency: float = 0.0) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(source, {"success": 1.0, "latency": latency})
+            stats["success"] += self.alpha * ((1.0 if ok else 0.0) - stats["success"])
+            stats["latency"] += self.alpha * (latency - stats["latency"])
+            metrics.set_gauge(f"source.{source}.success", stats["success"])
+            metrics.set_gauge(f"source.{source}.latency", stats["latency"])
+
+    def is_healthy(self, source: str) -> bool:
+        with self._lock:
+            stats = self._stats.get(source)
+            if stats is None:
+                return True
+            return stats["success"] >= self.min_success and stats["latency"] <= self.max_latency
+
+    def choose(self, preferred: list[str]) -> str:
+        with self._lock:
+            self._calls += 1
+            if self.explore_interval > 0 and self._calls % self.explore_interval == 0:
+                return preferred[0]
+        for source in preferred:
+            if self.is_healthy(source):
+                return source
+        with self._lock:
+            return max(preferred, key=lambda s: self._stats.get(s, {"success": 1.0})["success"])
@@ -0,0 +1,343 @@
+"""Local co-author graph, built from the author lists of every fetched paper.
+
+Authors are interned to small integers: a Scholar author_id when the byline
+links one, otherwise the byline name reduced to "initial surname" (so
+"GE Hinton" and "Geoffrey Hinton" meet). Each author keeps a
+``{neighbour: shared papers}`` dict. Every paper is remembered by an 8-byte
+hash of its normalized title together with the authors already linked for
+it, so seeing the same paper again (from a search and from an author
+profile) only adds the authors that were missing and never counts a pair
+twice. Co-authors an author lists on their Scholar profile are kept as
+"declared" links.
+
+Queries run on the in-memory index: ``top_collaborators`` ranks neighbours
+by shared papers, and ``shortest_path`` is a bidirectional BFS over authors
+with an author_id (name-only nodes are ambiguous, "J Wang" would connect
+everyone, so paths never pass through them).
+
+With ``settings.coauthor_graph_path`` set, the graph is saved as gzipped
+JSON and reloaded on start, like the author index.
+"""
+
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Iterable, Optional
+
+from .. import metrics
+from ..settings import settings
+from .author_index import normalize_name
+
+# Papers with longer author lists (consortium papers) would add thousands of
+# pairs each and say little about who works with whom.
+_MAX_PAPER_AUTHORS = 50
+_NAME_PREFIX = "~"
+
+
+def byline_key(name: str) -> str:
+    """"initial surname" form of a name, as Scholar bylines abbreviate it."""
+    tokens = normalize_name(name).split()
+    if len(tokens) < 2:
+        return " ".join(tokens)
+    return f"{tokens[0][0]} {tokens[-1]}"
+
+
+def split_byline(authors: str) -> list[str]:
+    """Names of an author-profile article's "A, B, C, ..." byline."""
+    return [name.strip() for name in authors.split(",") if name.strip() and name.strip() not in ("...", "…")]
+
+
+def _paper_key(title: str) -> Optional[bytes]:
+    title = normalize_name(title)
+    return hashlib.blake2b(title.encode("utf-8"), digest_size=8).digest() if title else None
+
+
+class CoauthorGraph:
+    """Incremental co-authorship adjacency index over interned author keys."""
+
+    def __init__(self, path: Optional[str] = None, save_every: int = 200):
+        self.path = path
+        self.save_every = save_every
+        self._ids: dict[str, int] = {}  # author_id or "~initial surname" -> node
+        self._keys: list[str] = []
+        self._names: list[str] = []
+        self._from_profile = bytearray()
+        self._adjacency: list[dict[int, int]] = []
+        self._declared: set[tuple[int, int]] = set()
+        self._papers: dict[bytes, tuple[int, ...]] = {}
+        self._expanded: dict[int, float] = {}  # node -> when its profile was last ingested
+        self._dirty = 0
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            links = sum(len(neighbours) for neighbours in self._adjacency) // 2
+            return {"authors": len(self._keys), "links": links, "papers": len(self._papers)}
+
+    # --- updates (callers hold the lock) ---
+
+    def _node(self, key: str, name: str, from_profile: bool = False) -> int:
+        node = self._ids.get(key)
+        if node is None:
+            node = self._ids[key] = len(self._keys)
+            self._keys.append(key)
+            self._names.append(name)
+            self._from_profile.append(from_profile)
+            self._adjacency.append({})
+        elif from_profile and not self._from_profile[node]:
+            # Profile names ("Geoffrey Hinton") beat paper bylines ("G Hinton").
+            self._names[node] = name
+            self._from_profile[node] = True
+        return node
+
+    def _author_node(self, name: str, author_id: Optional[str] = None, from_profile: bool = False) -> Optional[int]:
+        if author_id and author_id != "N/A":
+            return self._node(author_id, name, from_profile)
+        key = byline_key(name) if name and name != "N/A" else ""
+        return self._node(_NAME_PREFIX + key, name) if key else None
+
+    def _add_paper(self, title: str, members: Iterable[int]) -> None:
+        members = tuple(dict.fromkeys(m for m in members if m is not None))
+        key = _paper_key(title)
+        if key is None or len(members) > _MAX_PAPER_AUTHORS:
+            return
+        known = self._papers.get(key, ())
+        new = [m for m in members if m not in known]
+        if not new:
+            return
+        everyone = known + tuple(new)
+        self._papers[key] = everyone
+        adjacency = self._adjacency
+        for a in new:
+            for b in everyone:
+                # Pairs between two new members are visited twice; count them once.
+                if a == b or (b in new and b < a):
+                    continue
+                adjacency[a][b] = adjacency[a].get(b, 0) + 1
+                adjacency[b][a] = adjacency[b].get(a, 0) + 1
+        self._dirty += 1
+
+    def _after_update(self) -> None:
+        with self._lock:
+            should_save = self.path and self._dirty >= self.save_every
+        if should_save:
+            self.save()
+
+    def add_from_papers(self, articles: list[dict]) -> None:
+        """Ingests find_papers_tool articles (title, author_names, author_ids)."""
+        with self._lock:
+            for article in articles:
+                names = article.get("author_names", [])
+                ids = article.get("author_ids", [])
+                # A summary-only byline is one "A Author, B Author - Venue" string without ids.
+                if not ids:
+                    continue
+                self._add_paper(article.get("title", ""), [
+                    self._author_node(name, author_id) for name, author_id in zip(names, ids)
+                ])
+        metrics.incr("coauthor_graph.papers_ingested", len(articles))
+        self._after_update()
+
+    def add_author_articles(
+        self,
+        author_id: str,
+        name: str,
+        articles: list[tuple[str, str]],
+        co_authors: Iterable[tuple[str, str]] = (),
+        expanded: bool = True,
+    ) -> None:
+        """Ingests an author profile: (title, byline) articles and declared (name, author_id) co-authors.
+
+        Byline names are matched to the owner and to the declared co-authors
+        by "initial surname"; the rest become name-only nodes. ``expanded``
+        marks the profile as read in full (its 100 most-cited articles).
+        """
+        if not author_id or author_id == "N/A":
+            return
+        with self._lock:
+            owner = self._node(author_id, name, from_profile=name != "N/A")
+            known_ids = {byline_key(name): author_id}
+            for co_name, co_id in co_authors:
+                co_node = self._author_node(co_name, co_id, from_profile=True)
+                if co_node is None or co_node == owner:
+                    continue
+                known_ids.setdefault(byline_key(co_name), co_id)
+                self._declared.add((min(owner, co_node), max(owner, co_node)))
+                self._adjacency[owner].setdefault(co_node, 0)
+                self._adjacency[co_node].setdefault(owner, 0)
+            for title, byline in articles:
+                members = [owner]
+                for byline_name in split_byline(byline):
+                    members.append(self._author_node(byline_name, known_ids.get(byline_key(byline_name))))
+                self._add_paper(title, members)
+            if expanded:
+                self._expanded[owner] = time.time()
+            self._dirty += 1
+        metrics.incr("coauthor_graph.profiles_ingested")
+        self._after_update()
+
+    # --- queries ---
+
+    def needs_expansion(self, author_id: str) -> bool:
+        with self._lock:
+            node = self._ids.get(author_id)
+            expanded_at = self._expanded.get(node) if node is not None else None
+        return expanded_at is None or time.time() - expanded_at > settings.coauthor_expand_ttl_seconds
+
+    def _describe(self, node: int) -> dict:
+        key = self._keys[node]
+        return {"name": self._names[node], "author_id": None if key.startswith(_NAME_PREFIX) else key}
+
+    def describe(self, author_id: str) -> Optional[dict]:
+        with self._lock:
+            node = self._ids.get(author_id)
+            return None if node is None else self._describe(node)
+
+    def top_collaborators(self, author_id: str, limit: int = 10, linked_only: bool = False) -> list[dict]:
+        """Co-authors of ``author_id``, most shared papers first (declared links break ties)."""
+        with self._lock:
+            node = self._ids.get(author_id)
+            if node is None:
+                return []
+            ranked = sorted(
+                self._adjacency[node].items(),
+                key=lambda item: (item[1], (min(node, item[0]), max(node, item[0])) in self._declared),
+                reverse=True,
+            )
+            result = []
+            for neighbour, shared in ranked:
+                if linked_only and self._keys[neighbour].startswith(_NAME_PREFIX):
+                    continue
+                result.append({
+                    **self._describe(neighbour),
+                    "shared_papers": shared,
+                    "declared": (min(node, neighbour), max(node, neighbour)) in self._declared,
+                })
+                if len(result) == limit:
+                    break
+            return result
+
+    def shortest_path(self, source_id: str, target_id: str, max_hops: int) -> Optional[list[dict]]:
+        """Fewest-hops chain of co-authors from ``source_id`` to ``target_id``, or None.
+
+        Among chains of the same length the one whose weakest link has the
+        most shared papers wins. Each entry after the first carries the link
+        to the previous author.
+        """
+        with self._lock:
+            source, target = self._ids.get(source_id), self._ids.get(target_id)
+            if source is None or target is None:
+                return None
+            if source == target:
+                return [self._describe(source)]
+            keys, adjacency = self._keys, self._adjacency
+            parents = ({source: None}, {target: None})
+            depths = ({source: 0}, {target: 0})
+            frontiers = ([source], [target])
+            meetings: list[tuple[int, int]] = []
+            for _ in range(max_hops):
+                # Grow the smaller side by one whole level, so every meeting
+                # point of that level is seen before one is picked.
+                side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+                seen, other = parents[side], parents[1 - side]
+                depth, other_depth = depths[side], depths[1 - side]
+                next_frontier, best = [], None
+                for node in frontiers[side]:
+                    for neighbour in adjacency[node]:
+                        if keys[neighbour].startswith(_NAME_PREFIX):
+                            continue
+                        if neighbour in other:
+                            hops = depth[node] + 1 + other_depth[neighbour]
+                            if best is None or hops < best:
+                                best, meetings = hops, []
+                            if hops == best:
+                                meetings.append((node, neighbour) if side == 0 else (neighbour, node))
+                        elif neighbour not in seen:
+                            seen[neighbour] = node
+                            depth[neighbour] = depth[node] + 1
+                            next_frontier.append(neighbour)
+                if meetings or not next_frontier:
+                    break
+                frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+            if not meetings:
+                return None
+
+            def chain(meeting: tuple[int, int]) -> list[int]:
+                # meeting = (last node on the source side, first node on the target side)
+                nodes, node = [], meeting[0]
+                while node is not None:
+                    nodes.append(node)
+                    node = parents[0][node]
+                nodes.reverse()
+                node = meeting[1]
+                while node is not None:
+                    nodes.append(node)
+                    node = parents[1][node]
+                return nodes
+
+            def strength(nodes: list[int]) -> tuple[int, int]:
+                shared = [adjacency[a][b] for a, b in zip(nodes, nodes[1:])]
+                return min(shared), sum(shared)
+
+            best_chain = max(map(chain, meetings), key=strength)
+            path = [self._describe(best_chain[0])]
+            for previous, node in zip(best_chain, best_chain[1:]):
+                path.append({
+                    **self._describe(node),
+                    "shared_papers": adjacency[previous].get(node, 0),
+                    "declared": (min(previous, node), max(previous, node)) in self._declared,
+                })
+            return path
+
+    # --- persistence ---
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                "nodes": [[key, name, flag] for key, name, flag in zip(self._keys, self._names, self._from_profile)],
+                "links": [[a, b, shared] for a, neighbours in enumerate(self._adjacency)
+                          for b, shared in neighbours.items() if a < b],
+                "declared": sorted(self._declared),
+                "papers": [[key.hex(), list(members)] for key, members in self._papers.items()],
+                "expanded": [[node, at] for node, at in self._expanded.items()],
+            }
+            self._dirty = 0
+        tmp_path = self.path + ".tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _load(self, path: str) -> None:
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"DEBUG: could not load co-author graph {path}: {e}")
+            return
+        for key, name, from_profile in data["nodes"]:
+            self._ids[key] = len(self._keys)
+            self._keys.append(key)
+            self._names.append(name)
+            self._from_profile.append(bool(from_profile))
+            self._adjacency.append({})
+        for a, b, shared in data["links"]:
+            self._adjacency[a][b] = self._adjacency[b][a] = shared
+        self._declared = {(a, b) for a, b in data["declared"]}
+        self._papers = {bytes.fromhex(key): tuple(members) for key, members in data["papers"]}
+        self._expanded = {node: at for node, at in data["expanded"]}
+
+
+coauthor_graph = CoauthorGraph(settings.coauthor_graph_path)
+if settings.coauthor_graph_path:
+    atexit.register(coauthor_graph.save)
@@ -0,0 +1,130 @@
+"""Tool to answer co-author questions from the local co-author graph.
+
+The graph (tools/coauthor_graph.py) already holds every paper the other
+tools fetched. Authors it has not expanded yet (or not within
+``coauthor_expand_ttl_seconds``) are expanded first: their Scholar profile
+(100 most-cited articles plus declared co-authors) is fetched on a bounded
+pool, ``coauthor_expand_max_authors`` profiles per call at most, until
+``coauthor_expand_deadline_seconds``. Profiles still loading at the deadline
+are ingested in the background for the next call.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+
+from .. import metrics
+from ..memprofile import profiled
+from ..settings import settings
+from .coauthor_graph import coauthor_graph
+from .find_author_details import parse_author
+from .serpapi import has_capacity, serpapi_search
+
+_expand_pool = ThreadPoolExecutor(max_workers=settings.coauthor_expand_workers, thread_name_prefix="coauthors")
+
+
+def _expand_author(author_id: str) -> None:
+    params = {"engine": "google_scholar_author", "author_id": author_id, "num": 100}
+    results = serpapi_search(params, timeout=10, parse=parse_author)
+    profile = results["author"]
+    coauthor_graph.add_author_articles(
+        author_id,
+        profile.name if profile is not None else "N/A",
+        [(article.title, article.authors) for article in results["articles"]],
+        results.get("co_authors", ()),
+    )
+
+
+def expand(author_ids: list[str], depth: int, deadline: float) -> int:
+    """Expands ``author_ids`` and then, up to ``depth`` levels, their linked co-authors.
+
+    Returns the number of profiles ingested before the deadline.
+    """
+    budget = settings.coauthor_expand_max_authors
+    expanded = 0
+    frontier = list(dict.fromkeys(author_ids))
+    for _ in range(depth):
+        todo = [a for a in frontier if coauthor_graph.needs_expansion(a)][:budget]
+        if not todo:
+            break
+        if not has_capacity():
+            metrics.incr("coauthors.expand_skipped_quota")
+            break
+        futures = {_expand_pool.submit(_expand_author, a): a for a in todo}
+        budget -= len(todo)
+        done, _ = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        for future in done:
+            try:
+                future.result()
+                expanded += 1
+            except requests.exceptions.RequestException as e:
+                metrics.incr("coauthors.expand_failed")
+                print(f"DEBUG: co-author expansion failed for {futures[future]}: {e}")
+        if len(done) < len(futures):
+            metrics.incr("coauthors.expand_timed_out", len(futures) - len(done))
+            break
+        if budget <= 0:
+            break
+        # Most frequent collaborators first, so the budget goes where the links are.
+        frontier = [
+            c["author_id"]
+            for a in todo
+            for c in coauthor_graph.top_collaborators(a, limit=budget, linked_only=True)
+        ]
+    metrics.incr("coauthors.expanded", expanded)
+    return expanded
+
+
+@profiled
+def coauthor_network_tool(author_id: str, target_author_id: str = "", num_collaborators: int = 10) -> dict:
+    """Finds an author's most frequent collaborators and, optionally, the shortest
+    chain of co-authors linking them to another author.
+
+    Args:
+        author_id: The Google Scholar author ID (e.g., "2EpSYrcAAAAJ").
+        target_author_id: Another author ID to find a collaboration path to; empty for none.
+        num_collaborators: How many top collaborators to return.
+
+    Returns:
+        A dictionary with the 'author', their 'collaborators' (name, author_id
+        or null for byline-only names, shared_papers, declared) and, when a
+        target is given, the 'path' from author to target (null when no path
+        of at most coauthor_path_max_hops is known).
+    """
+    author_id = author_id.strip()
+    target_author_id = target_author_id.strip()
+    if not author_id:
+        return {"error": "author_id is required."}
+    deadline = time.monotonic() + settings.coauthor_expand_deadline_seconds
+    try:
+        with metrics.timed("coauthors.expand"):
+            expanded = expand([author_id] + ([target_author_id] if target_author_id else []), 1, deadline)
+            path = None
+            if target_author_id:
+                path = coauthor_graph.shortest_path(author_id, target_author_id, settings.coauthor_path_max_hops)
+                if path is None:
+                    # Grow both ends one more level and look again.
+                    frontier = [
+                        c["author_id"]
+                        for a in (author_id, target_author_id)
+                        for c in coauthor_graph.top_collaborators(a, limit=num_collaborators, linked_only=True)
+                    ]
+                    expanded += expand(frontier, 1, deadline)
+                    path = coauthor_graph.shortest_path(author_id, target_author_id, settings.coauthor_path_max_hops)
+    except Exception as e:
+        return {"error": f"Unexpected error: {e}"}
+
+    author = coauthor_graph.describe(author_id)
+    if author is None:
+        return {"error": f"No co-author data found for author {author_id}."}
+    result = {
+        "author": author,
+        "collaborators": coauthor_graph.top_collaborators(author_id, limit=max(1, int(num_collaborators))),
+        "profiles_fetched": expanded,
+        "graph": coauthor_graph.stats(),
+    }
+    if target_author_id:
+        result["target"] = coauthor_graph.describe(target_author_id)
+        result["path"] = path
+    return result
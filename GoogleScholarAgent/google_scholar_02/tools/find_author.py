@@ -3,7 +3,14 @@
 import os
 import requests
 
-SERPAPI_API_KEY = "64ba52253fc90fe8ff1cea888a40f6334cc9547588ef51ad1f7cf140c79f4262"
+from .author_index import author_index
+from .records import AuthorProfile
+from .serpapi import serpapi_search
+
+def parse_profiles(results: dict) -> list[AuthorProfile]:
+    authors = results.get("profiles", {}).get("authors", [])
+    return [AuthorProfile.from_profile_search(author) for author in authors]
+
 
 def find_author_tool(name: str) -> dict:
     """Performs a search on Google scholar to search for authors
@@ -15,27 +22,26 @@ def find_author_tool(name: str) -> dict:
     name, link to profile, author_id,
     """
 
-    base_url = "https://serpapi.com/search.json"
+    local = author_index.lookup(name)
+    if local is not None:
+        return {"Authors": local}
+
     params = {
         "engine": "google_scholar",
         "q": f"author:{name}",
-        "api_key": SERPAPI_API_KEY,
     }
     try:
-        response = requests.get(base_url, params=params, timeout=10)
-        response.raise_for_status()
-        results = response.json()
+        profiles = serpapi_search(params, timeout=10, parse=parse_profiles)
 
         found_authors = []
-        if "profiles" in results and "authors" in results["profiles"]:
-            for author_data in results["profiles"]["authors"]:
-                author_profile = {
-                    "name": author_data.get("name", "N/A"),
-                    "link": author_data.get("link", "N/A"),
-                    "author_id": author_data.get("author_id", "N/A"),
-                }
-                found_authors.append(author_profile)
-        else:
+        author_index.record_search(name, [profile.author_id for profile in profiles])
+        for profile in profiles:
+            found_authors.append(profile.to_dict())
+            author_index.add(
+                profile.author_id, profile.name,
+                affiliations=profile.affiliations, link=profile.link, from_profile=True,
+            )
+        if not profiles:
             print("""DEBUG: 'profiles' or 'authors' key NOT found
                 in SerpApi response for author search.""")
 
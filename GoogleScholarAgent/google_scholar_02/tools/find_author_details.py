@@ -4,12 +4,93 @@ import os
 import requests
 from bs4 import BeautifulSoup
 import re
+import time
+
+from .. import metrics
+from ..memprofile import profiled
+from ..settings import settings
+from .author_index import author_index
+from .cache import cached
+from .coauthor_graph import coauthor_graph
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, SourceSelector
+from .records import NA, AuthorProfile, Paper, text
+from .serpapi import key_pool, serpapi_search
+
+# Markup only Scholar's rate-limit / CAPTCHA interstitials carry. A bare
+# "recaptcha" would also match ordinary pages that load the reCAPTCHA script.
+_BLOCK_PAGE_MARKERS = ("gs_captcha", "unusual traffic", 'action="/sorry/')
+
+scholar_breaker = CircuitBreaker(
+    "scholar_profile",
+    failure_threshold=settings.scholar_circuit_failure_threshold,
+    cooldown_seconds=settings.scholar_circuit_cooldown_seconds,
+)
+link_sources = SourceSelector(max_latency=settings.scholar_scrape_max_latency_seconds)
+# Pooled connections to scholar.google.com; warmup.py pre-opens them.
+scholar_http = requests.Session()
+
+
+class ScholarBlockedError(requests.exceptions.RequestException):
+    """Scholar answered with a rate-limit or CAPTCHA page."""
+
+
+def _is_block_page(response: requests.Response) -> bool:
+    if response.status_code in (429, 503) or "/sorry/" in response.url:
+        return True
+    text = response.text[:20000].lower()
+    return any(marker in text for marker in _BLOCK_PAGE_MARKERS)
+
+
+def _fetch_article_links(profile_url: str) -> list[str]:
+    """Downloads the profile page and extracts article links. Raises on errors."""
+    if not scholar_breaker.allow():
+        raise CircuitOpenError("Scholar profile scraping is paused (circuit open)")
+
+    article_links = set()
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    }
+    start = time.perf_counter()
+    try:
+        response = scholar_http.get(profile_url, headers=headers, timeout=15) # Increased timeout
+        if _is_block_page(response):
+            metrics.incr("scholar.scrape.blocked")
+            raise ScholarBlockedError(f"Scholar returned a block page for {profile_url}")
+        response.raise_for_status() # Raise HTTPError for bad responses
+    except Exception:
+        scholar_breaker.record_failure()
+        link_sources.record("scrape", False, time.perf_counter() - start)
+        raise
+    scholar_breaker.record_success()
+    link_sources.record("scrape", True, time.perf_counter() - start)
+
+    soup = BeautifulSoup(response.text, 'html.parser')
+
+    # Google Scholar article titles are often links with the class 'gsc_a_at'
+    # Or sometimes they are within specific table rows
+    # Let's target the primary article links
+    for link_tag in soup.find_all('a', class_='gsc_a_at'):
+        href = link_tag.get('href')
+        if href:
+            # Construct full URL if it's relative
+            if not href.startswith('http'):
+                full_url = f"https://scholar.google.com{href}"
+            else:
+                full_url = href
+
+            # Filter out links that are not direct article view links if possible,
+            # e.g., "cited by" links or "all versions" links often have different classes or URL patterns.
+            # For simplicity, we'll assume gsc_a_at points to the main article view.
+            if "view_article" in full_url: # A common pattern for main article links
+                article_links.add(full_url)
+
+    return sorted(list(article_links))
 
-SERPAPI_API_KEY = "64ba52253fc90fe8ff1cea888a40f6334cc9547588ef51ad1f7cf140c79f4262"
 
 def _scrape_article_links_from_profile(profile_url: str) -> list[str]:
     """
     Scrapes an author's Google Scholar profile page to find direct article links.
+    Results are served through the shared stale-while-revalidate cache.
 
     Args:
         profile_url (str): The URL of the Google Scholar author profile page.
@@ -17,42 +98,42 @@ def _scrape_article_links_from_profile(profile_url: str) -> list[str]:
     Returns:
         list[str]: A list of unique article URLs found on the profile page.
     """
-    article_links = set()
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(profile_url, headers=headers, timeout=15) # Increased timeout
-        response.raise_for_status() # Raise HTTPError for bad responses
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Google Scholar article titles are often links with the class 'gsc_a_at'
-        # Or sometimes they are within specific table rows
-        # Let's target the primary article links
-        for link_tag in soup.find_all('a', class_='gsc_a_at'):
-            href = link_tag.get('href')
-            if href:
-                # Construct full URL if it's relative
-                if not href.startswith('http'):
-                    full_url = f"https://scholar.google.com{href}"
-                else:
-                    full_url = href
-                
-                # Filter out links that are not direct article view links if possible,
-                # e.g., "cited by" links or "all versions" links often have different classes or URL patterns.
-                # For simplicity, we'll assume gsc_a_at points to the main article view.
-                if "view_article" in full_url: # A common pattern for main article links
-                    article_links.add(full_url)
-
+        return cached(
+            "scholar_profile",
+            {"url": profile_url},
+            lambda: _fetch_article_links(profile_url),
+        )
+    except CircuitOpenError as e:
+        print(f"DEBUG: {e}")
     except requests.exceptions.RequestException as e:
         print(f"Error scraping profile URL {profile_url}: {e}")
     except Exception as e:
         print(f"An unexpected error occurred during profile scraping: {e}")
 
-    return sorted(list(article_links))
+    return []
+
+
+def _article_links_from_serpapi(articles: list[Paper]) -> list[str]:
+    """Builds the article link list from SerpApi's ``articles`` instead of scraping."""
+    return sorted({article.link for article in articles if article.link != NA})
+
+
+def parse_author(results: dict) -> dict:
+    """Parses a google_scholar_author document into an AuthorProfile and Papers."""
+    author_id = results.get("search_parameters", {}).get("author_id")
+    return {
+        "author": AuthorProfile.from_author_engine(author_id, results["author"]) if "author" in results else None,
+        "articles": [Paper.from_author_article(article) for article in results.get("articles", [])],
+        "profile_url": text(results["search_metadata"].get("google_scholar_author_url")),
+        "co_authors": [
+            (text(co_author.get("name")), text(co_author.get("author_id")))
+            for co_author in results.get("co_authors", [])
+        ],
+    }
 
 
+@profiled
 def find_author_details_tool(author_id: str) -> dict:
     """ Retrieves detailed information for a specific Google Scholar author profile
         and scrapes article links directly from the author's profile page.
@@ -67,59 +148,59 @@ def find_author_details_tool(author_id: str) -> dict:
         Returns an empty dictionary if not found or an error occurs.
     """
 
-    base_url = "https://serpapi.com/search.json"
     params = {
         "engine": "google_scholar_author",  
         "author_id": author_id,
-        "api_key": SERPAPI_API_KEY,
         "as_sdt": "as_vis"
     }
     try:
-        response = requests.get(base_url, params=params, timeout=10)
-        response.raise_for_status()
-        results = response.json()
+        results = serpapi_search(params, timeout=10, parse=parse_author)
 
         author_details = {}
-        processed_articles = []
         scraped_article_urls = [] # New list for scraped URLs
 
-        if "author" in results:
-            author_data = results["author"]
-            author_details = {
-                "name": author_data.get("name", "N/A"),
-                "author image": author_data.get("thumbnail", "N/A")
-                if author_data.get("thumbnail") != "https://scholar.google.com/citations/images/avatar_scholar_128.png"
-                else "N/A", 
-                "affiliations": author_data.get("affiliations", "N/A"),
-                "interests": [
-                    interest.get("title", "N/A")
-                    for interest in author_data.get("interests", [])
-                ]
-            }
+        profile = results["author"]
+        if profile is not None:
+            author_details = profile.to_details_dict()
+            author_index.add(
+                author_id, profile.name,
+                affiliations=profile.affiliations, from_profile=True,
+            )
+            # Only the first page of articles: not a full expansion for coauthors.py.
+            coauthor_graph.add_author_articles(
+                author_id, profile.name,
+                [(article.title, article.authors) for article in results["articles"]],
+                results.get("co_authors", ()), expanded=False,
+            )
             
-        author_profile_url = results["search_metadata"].get("google_scholar_author_url", "N/A")
+        author_profile_url = results["profile_url"]
         author_details["author profile url"] = author_profile_url
         print(f"DEBUG: Author profile URL: {author_profile_url}")
-        # --- New: Scrape article links from the author's profile URL ---
-        if author_profile_url and author_profile_url != "N/A":
+        # --- Article links: scrape the profile page when Scholar is healthy,
+        # otherwise (or when scraping yields nothing) use SerpApi's articles ---
+        links_source = "serpapi"
+        if (
+            author_profile_url
+            and author_profile_url != "N/A"
+            and link_sources.choose(["scrape", "serpapi"]) == "scrape"
+        ):
             scraped_article_urls = _scrape_article_links_from_profile(author_profile_url)
+            links_source = "scrape"
+        if not scraped_article_urls:
+            scraped_article_urls = _article_links_from_serpapi(results["articles"])
+            links_source = "serpapi"
+            link_sources.record("serpapi", bool(scraped_article_urls))
+        metrics.incr(f"scholar.article_links.{links_source}")
         # -----------------------------------------------------------
 
-        if "articles" in results:
-            for article in results["articles"][:5]: # Still limiting to 5 from SerpApi results
-                processed_articles.append({
-                    "title": article.get("title", "N/A"),
-                    "link": article.get("link", "N/A"),
-                    "authors": article.get("authors", "N/A"),
-                    "publication": article.get("publication", "N/A"),
-                    "cited_by_value": article.get("cited_by", {}).get("value", "N/A"),
-                    "year": article.get("year", "N/A")
-                })
+        # Still limiting to 5 from SerpApi results
+        processed_articles = [article.to_article_dict() for article in results["articles"][:5]]
 
         return {
             "author": author_details,
             "articles": processed_articles,
-            "scraped_article_links": scraped_article_urls # Add scraped links here
+            "scraped_article_links": scraped_article_urls, # Add scraped links here
+            "article_links_source": links_source,
         }
 
     except requests.exceptions.RequestException as e:
@@ -131,9 +212,8 @@ def find_author_details_tool(author_id: str) -> dict:
 
 # Example usage (you'll need a valid author_id and SERPAPI_API_KEY for this to work)
 if __name__ == "__main__":
-    # Ensure SERPAPI_API_KEY is set in your environment variables for this example to run
-    # For testing purposes, you might replace os.getenv with your actual key, but secure it in production.
-    if not SERPAPI_API_KEY:
+    # Ensure SERPAPI_API_KEY (or SERPAPI_API_KEYS) is set in your environment or .env for this example to run
+    if not len(key_pool):
         print("SERPAPI_API_KEY environment variable not set. Please set it to run the example.")
     else:
         # Example author ID (e.g., Geoffrey Hinton) - replace with an ID you want to test
@@ -3,44 +3,93 @@
 import os
 import requests
 
-SERPAPI_API_KEY = "64ba52253fc90fe8ff1cea888a40f6334cc9547588ef51ad1f7cf140c79f4262"
+from ..memprofile import profiled
+from ..settings import settings
+from .records import NewsItem
+from .serpapi import serpapi_search
 
-def find_news_tool(query: str) -> dict:
+def parse_news(search_results: dict) -> list[NewsItem]:
+    return [NewsItem.from_news_result(result) for result in search_results.get("news_results", [])]
 
-    """Performs a search on Google News using SerpApi, limiting results to 5 articles
-    and returning only specific details (link, title, snippet).
+
+@profiled
+def find_news_tool(
+    query: str,
+    num_results: int = 10,
+    year_from: int = 0,
+    year_to: int = 0,
+    sort_by_date: bool = False,
+    language: str = "",
+    country: str = "",
+) -> dict:
+
+    """Performs a search on Google News using SerpApi and returns only specific
+    details (link, title, author).
 
     Args:
         query: The search query string.
+        num_results: How many articles to return (at most 40).
+        year_from: Only news published in or after this year; 0 for no lower bound.
+        year_to: Only news published in or before this year; 0 for no upper bound.
+        sort_by_date: Newest first instead of by relevance.
+        language: Two-letter language code (e.g. "en"); empty for the default.
+        country: Two-letter country code (e.g. "us", "de"); empty for the default.
 
     Returns:
-        A dictionary containing a list of up to 5 simplified news article results.
+        A dictionary containing a list of up to num_results simplified news article results.
         Each article dictionary will have 'link', 'title', and 'author'.
         Returns an empty dictionary if the request fails or no results are found.
     """
 
-    base_url = "https://serpapi.com/search.json"
-    params = {
-        "engine": "google_news", 
-        "q":query, 
-        "api_key": SERPAPI_API_KEY,
-        "num": 5,
-    }
+    return search_news(
+        query,
+        num_results=num_results,
+        year_from=year_from,
+        year_to=year_to,
+        sort_by_date=sort_by_date,
+        language=language,
+        country=country,
+    )
+
 
+def search_news(
+    query: str,
+    when_days: int | None = None,
+    num_results: int = 5,
+    year_from: int = 0,
+    year_to: int = 0,
+    sort_by_date: bool = False,
+    language: str = "",
+    country: str = "",
+    fresh: bool = False,
+) -> dict:
+    """find_news_tool with a relative ``when_days`` window (used by watches, with ``fresh``
+    to skip the cache)."""
     try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        search_results = response.json()
-
-        processed_articles = []
-        if "news_results" in search_results:
-            for result in search_results["news_results"]:
-                article_info = {
-                    "title": result.get("title", "N/A"),
-                    "link": result.get("link", "N/A"),
-                    "author": result.get("author", "N/A")
-                }
-                processed_articles.append(article_info)
+        # The google_news engine has no date parameters; use Google News query operators.
+        if when_days:
+            query = f"{query} when:{when_days}d"
+        if year_from:
+            query = f"{query} after:{int(year_from)}-01-01"
+        if year_to:
+            query = f"{query} before:{int(year_to) + 1}-01-01"
+
+        # google_news returns its whole result list in one response (no num/start
+        # paging), so the count is applied here.
+        num_results = max(1, min(int(num_results), settings.search_max_results))
+        params = {
+            "engine": "google_news", 
+            "q":query, 
+        }
+        if sort_by_date:
+            params["so"] = 1
+        if language:
+            params["hl"] = language.lower()
+        if country:
+            params["gl"] = country.lower()
+
+        news = serpapi_search(params, parse=parse_news, fresh=fresh)
+        processed_articles = [item.to_dict() for item in news[:num_results]]
 
         return {"articles": processed_articles}
 
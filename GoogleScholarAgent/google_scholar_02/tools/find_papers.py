@@ -2,52 +2,102 @@
 
 import requests
 
-def find_papers_tool(query: str) -> dict:
-    """Performs a search on Google Scholar using SerpApi, limiting results to 5 articles."""
+from ..memprofile import profiled
+from ..settings import settings
+from .abstracts import enrich_abstracts
+from .author_index import author_index
+from .coauthor_graph import coauthor_graph
+from .records import NA, Paper
+from .serpapi import serpapi_search_pages
 
-    SERPAPI_API_KEY = "64ba52253fc90fe8ff1cea888a40f6334cc9547588ef51ad1f7cf140c79f4262"
+# Google Scholar returns at most 20 results per request.
+SCHOLAR_PAGE_SIZE = 20
 
-    if not SERPAPI_API_KEY:
-        return {"error": "SERPAPI_API_KEY not set in code."}
 
-    base_url = "https://serpapi.com/search.json"
-    params = {
-        "engine": "google_scholar",
-        "q": query,
-        "api_key": SERPAPI_API_KEY,
-        "as_ylo": "2000",
-        "num": 5,
-    }
+@profiled
+def find_papers_tool(
+    query: str,
+    num_results: int = 10,
+    year_from: int = 2000,
+    year_to: int = 0,
+    sort_by_date: bool = False,
+    language: str = "",
+    include_abstracts: bool = False,
+) -> dict:
+    """Performs a search on Google Scholar using SerpApi.
+
+    Args:
+        query: The research topic to search for.
+        num_results: How many articles to return (at most 40).
+        year_from: Only papers published in or after this year.
+        year_to: Only papers published in or before this year; 0 for no upper bound.
+        sort_by_date: Newest first. Scholar then only lists papers added in the last year.
+        language: Two-letter language code (e.g. "en", "de") to restrict results to; empty for any.
+        include_abstracts: Also fetch each paper's abstract from its landing page.
+            Adds an 'abstract' to every article ("N/A" when none was found in time).
+    """
+    results = search_papers(
+        query,
+        as_ylo=year_from,
+        as_yhi=year_to,
+        num_results=num_results,
+        sort_by_date=sort_by_date,
+        language=language,
+    )
+    if include_abstracts and "articles" in results:
+        enrich_abstracts(results["articles"])
+    return results
+
+
+def parse_papers(search_results: dict) -> list[Paper]:
+    return [Paper.from_scholar_result(result) for result in search_results.get("organic_results", [])]
+
+
+def search_papers(
+    query: str,
+    as_ylo: int | str = "2000",
+    as_yhi: int | str = 0,
+    num_results: int = 5,
+    sort_by_date: bool = False,
+    language: str = "",
+    fresh: bool = False,
+) -> dict:
+    """find_papers_tool without abstracts, with SerpApi's year bounds (also used by watches,
+    with ``fresh`` to skip the cache)."""
 
     try:
-        response = requests.get(base_url, params=params, timeout=10)
-        response.raise_for_status()
-        search_results = response.json()
+        num_results = max(1, min(int(num_results), settings.search_max_results))
+        params = {
+            "engine": "google_scholar",
+            "q": query,
+            "as_ylo": str(as_ylo),
+        }
+        if as_yhi and int(as_yhi):
+            params["as_yhi"] = str(as_yhi)
+        if sort_by_date:
+            # 2 = sort by date including citations and patents (1 would keep only abstracts).
+            params["scisbd"] = 2
+        if language:
+            params["hl"] = language.lower()
+            params["lr"] = f"lang_{language.lower()}"
 
+        papers = serpapi_search_pages(params, num_results, SCHOLAR_PAGE_SIZE, parse_papers, timeout=10, fresh=fresh)
         processed_articles = []
-        if "organic_results" in search_results:
-            for result in search_results["organic_results"]:
-                author_names, author_ids = [], []
-                pub = result.get("publication_info", {})
-                if isinstance(pub, dict):
-                    if "authors" in pub:
-                        for author in pub["authors"]:
-                            author_names.append(author.get("name", "N/A"))
-                            author_ids.append(author.get("author_id", "N/A"))
-                    elif "summary" in pub:
-                        author_names.append(pub.get("summary", "N/A"))
-
-                processed_articles.append({
-                    "title": result.get("title", "N/A"),
-                    "link": result.get("link", "N/A"),
-                    "snippet": result.get("snippet", "N/A"),
-                    "author_names": author_names,
-                    "author_ids": author_ids,
-                })
+        seen = set()
+        for paper in papers:
+            key = paper.link if paper.link != NA else paper.title
+            if key in seen:
+                continue
+            seen.add(key)
+            processed_articles.append(paper.to_dict())
+            if len(processed_articles) == num_results:
+                break
 
+        author_index.add_from_papers(processed_articles)
+        coauthor_graph.add_from_papers(processed_articles)
         return {"articles": processed_articles}
 
     except requests.exceptions.RequestException as e:
         return {"error": f"Request error: {e}"}
     except Exception as e:
-        return {"error": f"Unexpected error: {e}"}
\ No newline at end of file
+        return {"error": f"Unexpected error: {e}"}
@@ -0,0 +1,118 @@
+"""Decoding and field projection for SerpApi responses.
+
+SerpApi documents carry much more than the tools read (search_metadata,
+search_parameters, pagination, related searches, inline HTML). Responses are
+decoded with orjson when it is installed, and then projected down to the keys
+listed in ``FIELDS`` for their engine before they are cached or returned.
+Bodies larger than ``settings.serpapi_stream_min_bytes`` are parsed
+incrementally with ijson (when installed), so the keys that are dropped are
+never built as Python objects.
+
+A projection spec maps a key to ``None`` (keep the value as is) or to a
+nested spec. A nested spec applied to a list projects every element.
+"""
+
+import json
+from typing import Any, BinaryIO, Callable, Optional
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; the standard library is the fallback
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+Spec = Optional[dict[str, Any]]
+
+_ARTICLE = {"title": None, "link": None, "snippet": None, "publication_info": None, "resources": None}
+
+# Keys each engine's tools read. Engines not listed here are returned whole.
+FIELDS: dict[str, dict[str, Any]] = {
+    "google_scholar": {
+        "organic_results": _ARTICLE,
+        "profiles": {"authors": {"name": None, "link": None, "author_id": None, "affiliations": None}},
+    },
+    "google_scholar_author": {
+        "author": {"name": None, "thumbnail": None, "affiliations": None, "email": None, "interests": {"title": None}},
+        "articles": {"title": None, "link": None, "authors": None, "publication": None, "year": None,
+                     "cited_by": {"value": None}},
+        "search_metadata": {"google_scholar_author_url": None},
+        "search_parameters": {"author_id": None},
+        # Co-authors listed on the profile (coauthor_graph.py).
+        "co_authors": {"name": None, "author_id": None},
+        # Scholar's own citations / h-index / i10 table and citations-per-year graph (author_metrics.py).
+        "cited_by": {"table": None, "graph": None},
+    },
+    "google_news": {
+        "news_results": {"title": None, "link": None, "author": None, "date": None, "source": None},
+    },
+}
+
+
+def loads(data: bytes | str) -> Any:
+    """json.loads, through orjson when it is available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _compile(spec: Spec) -> Callable[[Any], Any]:
+    """Turns a spec into a projection function, so the spec is walked once, not per item."""
+    if spec is None:
+        return lambda value: value
+    plain = tuple(key for key, sub in spec.items() if sub is None)
+    nested = tuple((key, _compile(sub)) for key, sub in spec.items() if sub is not None)
+
+    def project_dict(value):
+        if isinstance(value, dict):
+            projected = {key: value[key] for key in plain if key in value}
+            for key, fn in nested:
+                if key in value:
+                    projected[key] = fn(value[key])
+            return projected
+        if isinstance(value, list):
+            return [project_dict(item) for item in value]
+        return value
+    return project_dict
+
+
+_projectors: dict[int, Callable[[Any], Any]] = {}
+
+
+def project(value: Any, spec: Spec) -> Any:
+    """Returns ``value`` reduced to the keys in ``spec``."""
+    if spec is None:
+        return value
+    projector = _projectors.get(id(spec))
+    if projector is None:
+        projector = _projectors[id(spec)] = _compile(spec)
+    return projector(value)
+
+
+def stream_project(stream: BinaryIO, spec: dict[str, Any]) -> dict:
+    """Parses a JSON object from ``stream``, building only the top-level keys in ``spec``."""
+    builders: dict[str, Any] = {}
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if not prefix:
+            continue  # events of the root object itself
+        key = prefix.split(".", 1)[0]
+        if key not in spec:
+            continue
+        builder = builders.get(key)
+        if builder is None:
+            builder = builders[key] = ijson.ObjectBuilder()
+        builder.event(event, value)
+    return {key: project(builder.value, spec[key]) for key, builder in builders.items()}
+
+
+def can_stream() -> bool:
+    return ijson is not None
+
+
+def decode(data: bytes, engine: str) -> dict:
+    """Decodes a SerpApi body and projects it to the engine's fields."""
+    spec = FIELDS.get(engine)
+    return project(loads(data), spec)
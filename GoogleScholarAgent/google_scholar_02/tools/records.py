@@ -0,0 +1,454 @@
+"""Slotted record types for papers, author profiles and news items.
+
+Tools parse SerpApi documents into these records once (inside the cached
+fetch), so the cache holds compact objects instead of nested dicts of
+strings, and every tool builds the dict the model sees with ``to_dict()``.
+
+Missing values are the interned ``NA`` sentinel, and short strings (names,
+ids, years, venues) are interned too, so repeats share one object.
+
+``pack``/``unpack`` give the shared cache tiers a compact binary form: one
+string table per blob (every distinct string stored once) followed by an
+array of 32-bit tags and indices. Lists of one record type are stored
+column by column, so decoding them is a few slices and one ``map(cls, ...)``.
+Ints take one word (two for 64-bit values) and floats two, so both decode
+with their type.
+
+The binary form only pays off for papers and author profiles (see
+``bench.py --benchmark=records``); ``PACKED_TYPES`` lists them. Values with
+other records (news) use ``to_json``/``from_json``: plain JSON in which each
+record list is one ``{"__records__": type, "rows": [...]}`` object.
+"""
+
+import struct
+import sys
+from array import array
+from dataclasses import dataclass, fields
+from itertools import starmap
+from typing import Any, Union
+
+NA = sys.intern("N/A")
+
+_INTERN_MAX_LEN = 48
+_DEFAULT_AVATAR = "https://scholar.google.com/citations/images/avatar_scholar_128.png"
+
+
+def text(value: Any) -> str:
+    """Returns ``value`` as a string, NA when missing, interned when short."""
+    if value is None or value == "" or value == NA:
+        return NA
+    value = str(value)
+    return sys.intern(value) if len(value) <= _INTERN_MAX_LEN else value
+
+
+@dataclass(slots=True)
+class Paper:
+    """A Scholar search result or an article from an author profile."""
+
+    title: str = NA
+    link: str = NA
+    snippet: str = NA
+    author_names: tuple[str, ...] = ()
+    author_ids: tuple[str, ...] = ()
+    authors: str = NA  # author-profile articles carry a single "A, B, C" string
+    publication: str = NA
+    year: str = NA
+    cited_by: Union[int, str] = NA
+
+    @classmethod
+    def from_scholar_result(cls, result: dict) -> "Paper":
+        names, ids = [], []
+        pub = result.get("publication_info", {})
+        if isinstance(pub, dict):
+            if "authors" in pub:
+                for author in pub["authors"]:
+                    names.append(text(author.get("name")))
+                    ids.append(text(author.get("author_id")))
+            elif "summary" in pub:
+                names.append(text(pub.get("summary")))
+        return cls(
+            title=text(result.get("title")),
+            link=text(result.get("link")),
+            snippet=text(result.get("snippet")),
+            author_names=tuple(names),
+            author_ids=tuple(ids),
+        )
+
+    @classmethod
+    def from_author_article(cls, article: dict) -> "Paper":
+        cited_by = (article.get("cited_by") or {}).get("value")
+        return cls(
+            title=text(article.get("title")),
+            link=text(article.get("link")),
+            authors=text(article.get("authors")),
+            publication=text(article.get("publication")),
+            year=text(article.get("year")),
+            cited_by=cited_by if isinstance(cited_by, int) else text(cited_by),
+        )
+
+    def to_dict(self) -> dict:
+        """find_papers_tool's article shape."""
+        return {
+            "title": self.title,
+            "link": self.link,
+            "snippet": self.snippet,
+            "author_names": list(self.author_names),
+            "author_ids": list(self.author_ids),
+        }
+
+    def to_article_dict(self) -> dict:
+        """find_author_details_tool's article shape."""
+        return {
+            "title": self.title,
+            "link": self.link,
+            "authors": self.authors,
+            "publication": self.publication,
+            "cited_by_value": self.cited_by,
+            "year": self.year,
+        }
+
+
+@dataclass(slots=True)
+class AuthorProfile:
+    """A Scholar author, from a profile search or the author engine."""
+
+    author_id: str = NA
+    name: str = NA
+    link: str = NA
+    affiliations: str = NA
+    email: str = NA
+    thumbnail: str = NA
+    interests: tuple[str, ...] = ()
+
+    @classmethod
+    def from_profile_search(cls, author: dict) -> "AuthorProfile":
+        return cls(
+            author_id=text(author.get("author_id")),
+            name=text(author.get("name")),
+            link=text(author.get("link")),
+            affiliations=text(author.get("affiliations")),
+        )
+
+    @classmethod
+    def from_author_engine(cls, author_id: str, author: dict) -> "AuthorProfile":
+        thumbnail = author.get("thumbnail")
+        return cls(
+            author_id=text(author_id),
+            name=text(author.get("name")),
+            affiliations=text(author.get("affiliations")),
+            email=text(author.get("email")),
+            thumbnail=NA if thumbnail == _DEFAULT_AVATAR else text(thumbnail),
+            interests=tuple(text(i.get("title")) for i in author.get("interests", [])),
+        )
+
+    def to_dict(self) -> dict:
+        """find_author_tool's author shape."""
+        return {"name": self.name, "link": self.link, "author_id": self.author_id}
+
+    def to_details_dict(self) -> dict:
+        """find_author_details_tool's author shape."""
+        return {
+            "name": self.name,
+            "author image": self.thumbnail,
+            "affiliations": self.affiliations,
+            "interests": list(self.interests),
+        }
+
+
+@dataclass(slots=True)
+class NewsItem:
+    title: str = NA
+    link: str = NA
+    author: str = NA
+    date: str = NA
+
+    @classmethod
+    def from_news_result(cls, result: dict) -> "NewsItem":
+        return cls(
+            title=text(result.get("title")),
+            link=text(result.get("link")),
+            author=text(result.get("author")),
+            date=text(result.get("date")),
+        )
+
+    def to_dict(self) -> dict:
+        """find_news_tool's article shape."""
+        return {"title": self.title, "link": self.link, "author": self.author}
+
+
+RECORD_TYPES = (Paper, AuthorProfile, NewsItem)
+# Record types whose packed form beats zlib JSON in size and decode time.
+PACKED_TYPES = (Paper, AuthorProfile)
+_TYPE_CODES = {cls: code for code, cls in enumerate(RECORD_TYPES)}
+_FIELD_NAMES = [tuple(f.name for f in fields(cls)) for cls in RECORD_TYPES]
+# Positions of the tuple fields, which JSON turns into lists.
+_TUPLE_FIELDS = [
+    tuple(i for i, f in enumerate(fields(cls)) if f.default == ()) for cls in RECORD_TYPES
+]
+
+
+def contains_records(value: Any) -> bool:
+    """Cheap check used by the cache encoder to pick the binary format."""
+    if isinstance(value, RECORD_TYPES):
+        return True
+    if isinstance(value, list):
+        return bool(value) and isinstance(value[0], RECORD_TYPES)
+    if isinstance(value, dict):
+        return any(contains_records(v) for v in value.values())
+    return False
+
+
+def record_types(value: Any) -> set[type]:
+    """The record types that occur in ``value``."""
+    if isinstance(value, RECORD_TYPES):
+        return {type(value)}
+    if isinstance(value, (list, tuple)):
+        return set().union(*map(record_types, value)) if value else set()
+    if isinstance(value, dict):
+        return set().union(*map(record_types, value.values())) if value else set()
+    return set()
+
+
+def prefers_packed(value: Any) -> bool:
+    """True when ``value`` holds records and all of them are of a ``PACKED_TYPES`` type."""
+    types = record_types(value)
+    return bool(types) and all(cls in PACKED_TYPES for cls in types)
+
+
+# --- JSON codec ---
+
+def to_json(value: Any) -> Any:
+    """``value`` as plain JSON data, with records in tagged objects."""
+    if isinstance(value, RECORD_TYPES):
+        code = _TYPE_CODES[type(value)]
+        return {"__record__": code, **{name: getattr(value, name) for name in _FIELD_NAMES[code]}}
+    if isinstance(value, list) and value and all(type(item) is type(value[0]) for item in value) \
+            and isinstance(value[0], RECORD_TYPES):
+        code = _TYPE_CODES[type(value[0])]
+        names = _FIELD_NAMES[code]
+        return {"__records__": code, "rows": [[getattr(item, name) for name in names] for item in value]}
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_json(item) for key, item in value.items()}
+    return value
+
+
+def _row(code: int, row: list) -> Any:
+    for i in _TUPLE_FIELDS[code]:
+        row[i] = tuple(row[i])
+    return RECORD_TYPES[code](*row)
+
+
+def from_json(value: Any) -> Any:
+    """Inverse of ``to_json`` (after ``json.loads``)."""
+    if isinstance(value, dict):
+        if "__records__" in value:
+            code = value["__records__"]
+            if not _TUPLE_FIELDS[code]:
+                return list(starmap(RECORD_TYPES[code], value["rows"]))
+            return [_row(code, row) for row in value["rows"]]
+        if "__record__" in value:
+            code = value["__record__"]
+            return _row(code, [value[name] for name in _FIELD_NAMES[code]])
+        return {key: from_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [from_json(item) for item in value]
+    return value
+
+
+# --- binary codec ---
+
+_MAGIC = b"GSR1"
+_HEADER = struct.Struct("<4sII")  # magic, string count, string bytes
+_STR, _INT, _RECORD, _LIST, _TUPLE, _DICT, _NONE, _TRUE, _FALSE, _RECORD_LIST, _INT64, _FLOAT = range(12)
+# Column layouts inside a _RECORD_LIST.
+_COL_STR, _COL_TAGGED, _COL_STR_TUPLE, _COL_ANY = range(4)
+_MAX_INT = 2**32 - 1
+_WORD = 2**32
+_INT64_RANGE = range(-2**63, 2**63)
+_DOUBLE = struct.Struct("<d")
+_DOUBLE_WORDS = struct.Struct("<II")
+
+
+class _Packer:
+    def __init__(self):
+        self.strings: dict[str, int] = {}
+        self.out = array("I")
+
+    def string(self, value: str) -> int:
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+    def add(self, value: Any) -> None:
+        out = self.out
+        if isinstance(value, str):
+            out.extend((_STR, self.string(value)))
+        elif value is None:
+            out.append(_NONE)
+        elif value is True or value is False:
+            out.append(_TRUE if value else _FALSE)
+        elif isinstance(value, int) and 0 <= value <= _MAX_INT:
+            out.extend((_INT, value))
+        elif isinstance(value, int):
+            if value not in _INT64_RANGE:
+                raise ValueError("ints beyond 64 bits cannot be packed")
+            value %= 2**64  # two's complement
+            out.extend((_INT64, value % _WORD, value // _WORD))
+        elif isinstance(value, float):
+            out.append(_FLOAT)
+            out.extend(_DOUBLE_WORDS.unpack(_DOUBLE.pack(value)))
+        elif isinstance(value, RECORD_TYPES):
+            code = _TYPE_CODES[type(value)]
+            out.extend((_RECORD, code))
+            for name in _FIELD_NAMES[code]:
+                self.add(getattr(value, name))
+        elif isinstance(value, list) and value and all(type(item) is type(value[0]) for item in value) \
+                and isinstance(value[0], RECORD_TYPES):
+            self.add_record_list(value)
+        elif isinstance(value, (list, tuple)):
+            out.extend((_LIST if isinstance(value, list) else _TUPLE, len(value)))
+            for item in value:
+                self.add(item)
+        elif isinstance(value, dict):
+            out.extend((_DICT, len(value)))
+            for key, item in value.items():
+                if type(key) is not str:
+                    raise ValueError(f"{type(key).__name__} dict keys cannot be packed")
+                out.append(self.string(key))
+                self.add(item)
+        else:
+            raise ValueError(f"{type(value).__name__} values cannot be packed")
+
+    def add_record_list(self, items: list) -> None:
+        """Stores a homogeneous record list column by column, so it decodes in bulk."""
+        code = _TYPE_CODES[type(items[0])]
+        out, string = self.out, self.string
+        out.extend((_RECORD_LIST, code, len(items)))
+        for name in _FIELD_NAMES[code]:
+            column = [getattr(item, name) for item in items]
+            if all(type(value) is str for value in column):
+                out.append(_COL_STR)
+                out.extend(map(string, column))
+            elif all(type(value) is tuple and all(type(element) is str for element in value) for value in column):
+                out.append(_COL_STR_TUPLE)
+                out.extend(map(len, column))
+                for value in column:
+                    out.extend(map(string, value))
+            elif all(type(value) is str or (type(value) is int and 0 <= value <= _MAX_INT) for value in column):
+                out.append(_COL_TAGGED)
+                for value in column:
+                    if type(value) is int:
+                        out.extend((_INT, value))
+                    else:
+                        out.extend((_STR, string(value)))
+            else:
+                out.append(_COL_ANY)
+                for value in column:
+                    self.add(value)
+
+
+def pack(value: Any) -> bytes:
+    """Serializes records, lists, tuples, str-keyed dicts, strings, ints up to 64 bits and floats.
+
+    Raises ValueError for anything else, so callers can fall back to JSON.
+    """
+    packer = _Packer()
+    packer.add(value)
+    if "\x00" in "".join(packer.strings):
+        raise ValueError("strings containing NUL cannot be packed")
+    table = "\x00".join(packer.strings).encode("utf-8")
+    if sys.byteorder == "big":
+        packer.out.byteswap()
+    return _HEADER.pack(_MAGIC, len(packer.strings), len(table)) + table + packer.out.tobytes()
+
+
+def unpack(blob: bytes) -> Any:
+    """Inverse of ``pack``."""
+    magic, count, table_size = _HEADER.unpack_from(blob)
+    if magic != _MAGIC:
+        raise ValueError("not a packed record blob")
+    start = _HEADER.size
+    # Each distinct string is decoded once and shared by every record in the
+    # blob, so there is no need to intern them again here.
+    strings = blob[start:start + table_size].decode("utf-8").split("\x00") if count else []
+    lookup = strings.__getitem__
+    ints = array("I")
+    ints.frombytes(blob[start + table_size:])
+    if sys.byteorder == "big":
+        ints.byteswap()
+    position = 0
+
+    def read_record_list() -> list:
+        nonlocal position
+        cls, length = RECORD_TYPES[ints[position]], ints[position + 1]
+        position += 2
+        columns = []
+        for _ in _FIELD_NAMES[_TYPE_CODES[cls]]:
+            layout = ints[position]
+            position += 1
+            if layout == _COL_STR:
+                columns.append(list(map(lookup, ints[position:position + length])))
+                position += length
+            elif layout == _COL_STR_TUPLE:
+                lengths = ints[position:position + length]
+                position += length
+                flat = list(map(lookup, ints[position:position + sum(lengths)]))
+                position += len(flat)
+                column, offset = [], 0
+                for size in lengths:
+                    column.append(tuple(flat[offset:offset + size]))
+                    offset += size
+                columns.append(column)
+            elif layout == _COL_TAGGED:
+                pairs = ints[position:position + 2 * length]
+                position += 2 * length
+                columns.append([strings[v] if t == _STR else v for t, v in zip(pairs[::2], pairs[1::2])])
+            else:
+                columns.append([read() for _ in range(length)])
+        return list(map(cls, *columns))
+
+    def read() -> Any:
+        nonlocal position
+        tag = ints[position]
+        position += 1
+        if tag == _STR:
+            position += 1
+            return strings[ints[position - 1]]
+        if tag == _INT:
+            position += 1
+            return ints[position - 1]
+        if tag == _RECORD_LIST:
+            return read_record_list()
+        if tag == _RECORD:
+            cls = RECORD_TYPES[ints[position]]
+            position += 1
+            return cls(*[read() for _ in _FIELD_NAMES[_TYPE_CODES[cls]]])
+        if tag in (_LIST, _TUPLE):
+            length = ints[position]
+            position += 1
+            items = [read() for _ in range(length)]
+            return items if tag == _LIST else tuple(items)
+        if tag == _DICT:
+            length = ints[position]
+            position += 1
+            result = {}
+            for _ in range(length):
+                key = strings[ints[position]]
+                position += 1
+                result[key] = read()
+            return result
+        if tag == _INT64:
+            position += 2
+            value = ints[position - 2] + ints[position - 1] * _WORD
+            return value - 2**64 if value >= 2**63 else value
+        if tag == _FLOAT:
+            position += 2
+            return _DOUBLE.unpack(_DOUBLE_WORDS.pack(ints[position - 2], ints[position - 1]))[0]
+        if tag == _NONE:
+            return None
+        return tag == _TRUE
+
+    return read()
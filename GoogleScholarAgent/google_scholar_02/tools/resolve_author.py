@@ -0,0 +1,131 @@
+"""Tool to resolve an author name to Google Scholar profiles without the search sub-agent.
+
+Resolution cascade:
+    1. memoized name -> author resolution from earlier lookups, for
+       ``author_index_search_ttl_seconds`` like the author index
+    2. find_author_tool with the name as given (answered from the local
+       author index when the match is confident)
+    3. name variants (diacritics stripped, transliterated, initials, reordered)
+       searched concurrently
+    4. only then, tell the model to fall back to google_search_agent
+
+A failed search (quota, network, rate limit) is returned as an error right
+away: it says nothing about whether the author has a profile.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from .. import metrics
+from ..memprofile import profiled
+from ..settings import settings
+from .author_index import normalize_name, strip_diacritics
+from .cache import make_key, tool_cache
+from .find_author import find_author_tool
+
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "Ä": "Ae", "Ö": "Oe", "Ü": "Ue"})
+
+_variant_pool = ThreadPoolExecutor(
+    max_workers=settings.author_variant_workers, thread_name_prefix="author-variants"
+)
+
+
+def name_variants(name: str) -> list[str]:
+    """Returns alternative spellings of ``name`` worth searching, without the original."""
+    candidates = []
+    ascii_name = strip_diacritics(name).strip()
+    candidates.append(ascii_name)
+    # German-style umlaut transliteration (Müller -> Mueller).
+    if name.translate(_UMLAUTS) != name:
+        candidates.append(strip_diacritics(name.translate(_UMLAUTS)).strip())
+
+    parts = [p for p in re.split(r"[\s,]+", ascii_name) if p]
+    if "," in name and len(parts) >= 2:
+        # "Last, First" -> "First Last"
+        parts = parts[1:] + parts[:1]
+        candidates.append(" ".join(parts))
+    if len(parts) >= 2:
+        first, last = parts[0], parts[-1]
+        candidates.append(f"{first[0]}. {last}")
+        candidates.append(f"{first[0]} {last}")
+        candidates.append(f"{last} {first}")
+        if len(parts) > 2:
+            # Drop middle names / initials.
+            candidates.append(f"{first} {last}")
+
+    seen = {name.strip().lower()}
+    variants = []
+    for candidate in candidates:
+        key = candidate.lower()
+        if candidate and key not in seen:
+            seen.add(key)
+            variants.append(candidate)
+    return variants[: settings.author_max_variants]
+
+
+def _memo_key(name: str) -> str:
+    return make_key("author_resolution", {"name": normalize_name(name)})
+
+
+def _remember(name: str, authors: list[dict]) -> None:
+    # Only unambiguous resolutions are memoized; several candidates still need the user.
+    if len(authors) == 1:
+        tool_cache.set(_memo_key(name), authors[0], expire=settings.author_index_search_ttl_seconds)
+
+
+@profiled
+def resolve_author_tool(name: str) -> dict:
+    """Finds Google Scholar author profiles for a name, trying spelling variants.
+
+    Args:
+        name: The author's name as the user wrote it.
+
+    Returns:
+        A dictionary with an 'Authors' list (name, link, author_id) and the
+        'source' that produced it. If nothing was found, 'Authors' is empty and
+        'fallback' is "google_search_agent": only then run a general Google search.
+        If a search failed, 'error' is set instead and there is no 'fallback'.
+    """
+    memoized = tool_cache.peek(_memo_key(name), max_age=settings.author_index_search_ttl_seconds)
+    if memoized is not None:
+        metrics.incr("author_resolution.memo")
+        return {"Authors": [memoized], "source": "memo"}
+
+    direct = find_author_tool(name)
+    if direct.get("Authors"):
+        metrics.incr("author_resolution.direct")
+        _remember(name, direct["Authors"])
+        return {"Authors": direct["Authors"], "source": "find_author_tool"}
+    if "error" in direct:
+        metrics.incr("author_resolution.error")
+        return {"Authors": [], "error": direct["error"]}
+
+    variants = name_variants(name)
+    found: dict[str, dict] = {}
+    matched = []
+    errors = []
+    for variant, result in zip(variants, _variant_pool.map(find_author_tool, variants)):
+        if "error" in result:
+            errors.append(result["error"])
+        authors = result.get("Authors") or []
+        if authors:
+            matched.append(variant)
+        for author in authors:
+            found.setdefault(author.get("author_id", author.get("name")), author)
+    if found:
+        metrics.incr("author_resolution.variants")
+        authors = list(found.values())
+        _remember(name, authors)
+        return {"Authors": authors, "source": "name_variants", "matched_variants": matched}
+
+    if errors:
+        # Some variants were never searched; "no profile" would be a guess.
+        metrics.incr("author_resolution.error")
+        return {"Authors": [], "error": errors[0]}
+    metrics.incr("author_resolution.fallback")
+    return {
+        "Authors": [],
+        "source": "none",
+        "tried_variants": variants,
+        "fallback": "google_search_agent",
+    }
@@ -0,0 +1,393 @@
+"""Shared SerpApi access for the tools: caching, API keys, rate limiting and the hourly quota budget."""
+
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+import requests
+
+from .. import metrics
+from ..settings import settings
+from . import payloads
+from .cache import cached
+
+
+class QuotaBudget:
+    """Counts SerpApi calls over a rolling hour against a fixed budget."""
+
+    def __init__(self, hourly_limit: int):
+        self.hourly_limit = hourly_limit
+        self._calls: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        while self._calls and now - self._calls[0] > 3600:
+            self._calls.popleft()
+
+    def remaining(self) -> int | None:
+        """Calls left in the current window, or None when unlimited."""
+        if self.hourly_limit <= 0:
+            return None
+        with self._lock:
+            self._trim(time.time())
+            return max(0, self.hourly_limit - len(self._calls))
+
+    def has_room(self) -> bool:
+        remaining = self.remaining()
+        return remaining is None or remaining > 0
+
+    def record(self) -> None:
+        with self._lock:
+            now = time.time()
+            self._trim(now)
+            self._calls.append(now)
+
+
+class RateLimiter:
+    """Token bucket that blocks callers to stay under ``rate`` requests per second."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            metrics.incr("serpapi.rate_limited")
+            time.sleep(wait)
+
+
+class NoKeyAvailableError(requests.exceptions.RequestException):
+    """Every configured SerpApi key is exhausted or cooling down (or none is configured)."""
+
+
+class _KeyState:
+    def __init__(self, key: str, label: str):
+        self.key = key
+        self.label = label
+        self.calls: deque[float] = deque()  # call times within the last hour
+        self.total_calls = 0
+        self.throttled = 0
+        self.consecutive_throttled = 0
+        self.cooling_until = 0.0
+        # Searches left according to SerpApi's account API, counted down locally between refreshes.
+        self.searches_left: Optional[int] = None
+
+
+class KeyPool:
+    """Balances SerpApi calls across several API keys.
+
+    Each call goes to the available key with the most remaining quota
+    (the smaller of the per-key hourly limit and the searches left reported
+    by SerpApi's account API); keys with unknown quota are used round-robin
+    by their calls in the last hour. A key answered with 429 is taken out
+    for ``cooldown_seconds``, doubling on repeated 429s; a rejected key
+    (401/403) is taken out for ``max_cooldown_seconds``. Usage per key is
+    exported as ``serpapi.key.<last 4 chars>.*`` metrics.
+    """
+
+    def __init__(
+        self,
+        keys: list[str],
+        hourly_limit: int = 0,
+        cooldown_seconds: float = 60,
+        max_cooldown_seconds: float = 3600,
+        account_refresh_seconds: float = 0,
+    ):
+        self.hourly_limit = hourly_limit
+        self.cooldown_seconds = cooldown_seconds
+        self.max_cooldown_seconds = max_cooldown_seconds
+        self.account_refresh_seconds = account_refresh_seconds
+        self._lock = threading.Lock()
+        self._refreshed_at = 0.0
+        self._refreshing = False
+        self.set_keys(keys)
+
+    def set_keys(self, keys: list[str]) -> None:
+        states = []
+        for key in dict.fromkeys(k.strip() for k in keys if k and k.strip()):
+            label = key[-4:]
+            if any(state.label == label for state in states):
+                label = f"{label}_{len(states)}"
+            states.append(_KeyState(key, label))
+        with self._lock:
+            self._keys = states
+            self._refreshed_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _trim(self, state: _KeyState, now: float) -> None:
+        while state.calls and now - state.calls[0] > 3600:
+            state.calls.popleft()
+
+    def _remaining(self, state: _KeyState) -> Optional[int]:
+        limits = []
+        if self.hourly_limit > 0:
+            limits.append(self.hourly_limit - len(state.calls))
+        if state.searches_left is not None:
+            limits.append(state.searches_left)
+        return max(0, min(limits)) if limits else None
+
+    def _available(self, now: float) -> list[_KeyState]:
+        available = []
+        for state in self._keys:
+            self._trim(state, time.time())
+            if state.cooling_until <= now and self._remaining(state) != 0:
+                available.append(state)
+        return available
+
+    def acquire(self) -> _KeyState:
+        """Picks a key for one call and counts the call against it."""
+        self._maybe_refresh_accounts()
+        with self._lock:
+            if not self._keys:
+                raise NoKeyAvailableError("No SerpApi API key configured; set SERPAPI_API_KEY or SERPAPI_API_KEYS.")
+            available = self._available(time.monotonic())
+            if not available:
+                metrics.incr("serpapi.keys_exhausted")
+                raise NoKeyAvailableError("All SerpApi API keys are exhausted or cooling down.")
+            state = max(
+                available,
+                key=lambda s: (self._remaining(s) if self._remaining(s) is not None else float("inf"), -len(s.calls)),
+            )
+            state.calls.append(time.time())
+            state.total_calls += 1
+            if state.searches_left is not None:
+                state.searches_left -= 1
+            remaining = self._remaining(state)
+        metrics.incr(f"serpapi.key.{state.label}.calls")
+        if remaining is not None:
+            metrics.set_gauge(f"serpapi.key.{state.label}.remaining", remaining)
+        return state
+
+    def report(self, state: _KeyState, status_code: int) -> None:
+        """Feeds the HTTP status of a call back into the key's health."""
+        with self._lock:
+            if status_code == 429:
+                state.throttled += 1
+                state.consecutive_throttled += 1
+                backoff = self.cooldown_seconds * 2 ** (state.consecutive_throttled - 1)
+                state.cooling_until = time.monotonic() + min(backoff, self.max_cooldown_seconds)
+            elif status_code in (401, 403):
+                state.cooling_until = time.monotonic() + self.max_cooldown_seconds
+            elif status_code < 400:
+                state.consecutive_throttled = 0
+                return
+            else:
+                return
+        metrics.incr(f"serpapi.key.{state.label}.{'throttled' if status_code == 429 else 'rejected'}")
+
+    def remaining(self) -> Optional[int]:
+        """Calls left across the available keys, or None when any of them is unlimited."""
+        with self._lock:
+            total = 0
+            for state in self._available(time.monotonic()):
+                remaining = self._remaining(state)
+                if remaining is None:
+                    return None
+                total += remaining
+            return total
+
+    def has_room(self) -> bool:
+        with self._lock:
+            return bool(self._available(time.monotonic()))
+
+    def usage(self) -> list[dict]:
+        now = time.monotonic()
+        with self._lock:
+            for state in self._keys:
+                self._trim(state, time.time())
+            return [
+                {
+                    "key": state.label,
+                    "calls_last_hour": len(state.calls),
+                    "total_calls": state.total_calls,
+                    "throttled": state.throttled,
+                    "remaining": self._remaining(state),
+                    "cooling_seconds": round(max(0.0, state.cooling_until - now), 1),
+                }
+                for state in self._keys
+            ]
+
+    def _maybe_refresh_accounts(self) -> None:
+        if self.account_refresh_seconds <= 0:
+            return
+        with self._lock:
+            if self._refreshing or time.monotonic() - self._refreshed_at < self.account_refresh_seconds:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh_accounts, name="serpapi-accounts", daemon=True).start()
+
+    def refresh_accounts(self) -> None:
+        """Reads each key's remaining searches from SerpApi's account API (free of charge)."""
+        try:
+            for state in list(self._keys):
+                try:
+                    response = http.get(settings.serpapi_account_url, params={"api_key": state.key}, timeout=10)
+                    response.raise_for_status()
+                    account = payloads.loads(response.content)
+                except Exception as e:
+                    metrics.incr("serpapi.account_refresh_failed")
+                    print(f"DEBUG: SerpApi account lookup failed for key {state.label}: {e}")
+                    continue
+                limits = []
+                if account.get("total_searches_left") is not None:
+                    limits.append(int(account["total_searches_left"]))
+                if account.get("account_rate_limit_per_hour") is not None:
+                    limits.append(int(account["account_rate_limit_per_hour"]) - int(account.get("this_hour_searches") or 0))
+                with self._lock:
+                    state.searches_left = max(0, min(limits)) if limits else None
+        finally:
+            with self._lock:
+                self._refreshed_at = time.monotonic()
+                self._refreshing = False
+
+
+def _configured_keys() -> list[str]:
+    return [*settings.serpapi_api_keys, *([settings.serpapi_api_key] if settings.serpapi_api_key else [])]
+
+
+quota = QuotaBudget(settings.serpapi_hourly_budget)
+rate_limiter = RateLimiter(settings.serpapi_requests_per_second, settings.serpapi_burst)
+key_pool = KeyPool(
+    _configured_keys(),
+    hourly_limit=settings.serpapi_key_hourly_limit,
+    cooldown_seconds=settings.serpapi_key_cooldown_seconds,
+    account_refresh_seconds=settings.serpapi_account_refresh_seconds,
+)
+
+
+def has_capacity() -> bool:
+    """True when both the hourly budget and at least one API key have room."""
+    return quota.has_room() and key_pool.has_room()
+
+
+# One pooled session for all tools; requests already sends Accept-Encoding, this pins it to gzip.
+http = requests.Session()
+http.headers["Accept-Encoding"] = "gzip"
+
+
+# Statuses that are about the key rather than the request; the call is retried with another key.
+_KEY_STATUSES = (401, 403, 429)
+
+
+def _fetch(params: dict, timeout: float) -> dict:
+    engine = params.get("engine", "unknown")
+    attempts = max(1, len(key_pool))
+    for attempt in range(attempts):
+        key = key_pool.acquire()
+        rate_limiter.acquire()
+        quota.record()
+        metrics.incr(f"serpapi.calls.{engine}")
+        with metrics.timed(f"serpapi.latency.{engine}"):
+            request_params = {**params, "api_key": key.key}
+            with http.get(settings.serpapi_url, params=request_params, timeout=timeout, stream=True) as response:
+                key_pool.report(key, response.status_code)
+                if response.status_code in _KEY_STATUSES and attempt + 1 < attempts:
+                    metrics.incr("serpapi.key_retries")
+                    continue
+                response.raise_for_status()
+                size = int(response.headers.get("Content-Length") or 0)
+                spec = payloads.FIELDS.get(engine)
+                if spec is not None and payloads.can_stream() and size >= settings.serpapi_stream_min_bytes:
+                    # Large bodies: decompress and parse incrementally, building only the projected keys.
+                    response.raw.decode_content = True
+                    metrics.incr("serpapi.streamed")
+                    metrics.incr(f"serpapi.bytes.{engine}", size)
+                    return payloads.stream_project(response.raw, spec)
+                body = response.content
+        metrics.incr(f"serpapi.bytes.{engine}", len(body))
+        return payloads.decode(body, engine)
+
+
+def serpapi_search(
+    params: dict,
+    timeout: float = 10,
+    parse: Optional[Callable[[dict], Any]] = None,
+    fresh: bool = False,
+) -> Any:
+    """Runs a SerpApi search, served from the shared cache when possible.
+
+    With ``parse``, the projected document is turned into records (see
+    ``records.py``) before it is cached, and the parsed value is returned.
+    ``fresh`` always asks SerpApi (and updates the cache), for callers that
+    must not see an older result.
+
+    The API key comes from ``key_pool``; callers leave ``api_key`` out.
+
+    Raises ``requests.exceptions.RequestException`` like ``requests.get``
+    would (``NoKeyAvailableError`` when no key has quota left), so callers
+    keep their existing error handling.
+    """
+    engine = params.get("engine", "default")
+    if parse is None:
+        return cached(engine, params, lambda: _fetch(params, timeout), has_capacity, fresh)
+    # Parsed and raw entries for the same query must not share a key.
+    key_params = {**params, "parsed_as": parse.__qualname__}
+    return cached(engine, key_params, lambda: parse(_fetch(params, timeout)), has_capacity, fresh)
+
+
+_page_pool = ThreadPoolExecutor(max_workers=settings.serpapi_page_workers, thread_name_prefix="serpapi-pages")
+
+
+def serpapi_search_pages(
+    params: dict,
+    num_results: int,
+    page_size: int,
+    parse: Callable[[dict], list],
+    timeout: float = 10,
+    start: int = 0,
+    fresh: bool = False,
+) -> list:
+    """Fetches ``num_results`` parsed items as ``start``/``num`` pages, concurrently.
+
+    One page is a plain ``serpapi_search``. Larger requests are split into
+    pages of ``page_size`` that are fetched in parallel (each cached on its
+    own) and concatenated in order; the caller dedupes and truncates. The
+    page count is capped by the remaining hourly quota and key quota. A failing first
+    page raises, later failures return the pages fetched so far.
+    """
+    pages = max(1, math.ceil(num_results / page_size))
+    remaining = [r for r in (quota.remaining(), key_pool.remaining()) if r is not None]
+    remaining = min(remaining) if remaining else None
+    if remaining is not None and pages > max(1, remaining):
+        metrics.incr("serpapi.pages_trimmed")
+        pages = max(1, remaining)
+    if pages == 1:
+        first = {**params, "num": min(num_results, page_size)}
+        if start:
+            first["start"] = start
+        return serpapi_search(first, timeout, parse, fresh)
+
+    futures = [
+        _page_pool.submit(
+            serpapi_search, {**params, "num": page_size, "start": start + page * page_size}, timeout, parse, fresh
+        )
+        for page in range(pages)
+    ]
+    metrics.incr("serpapi.paged_searches")
+    items = list(futures[0].result())
+    for future in futures[1:]:
+        try:
+            items.extend(future.result())
+        except requests.exceptions.RequestException as e:
+            metrics.incr("serpapi.page_failed")
+            print(f"DEBUG: SerpApi page fetch failed: {e}")
+            break
+    return items
@@ -0,0 +1,332 @@
+"""Saved watches: periodic paper / news searches that keep only what is new.
+
+A watch is a (kind, query) pair saved by a user. ``WatchScheduler`` re-runs
+due watches in the background with a narrowed, newest-first upstream query
+(``as_ylo`` for Scholar, ``when:<days>d`` for Google News) that bypasses the
+tool cache, hashes every result and stores only items whose hash has not
+been seen for that watch. The first run just records the baseline.
+``get_watch_updates_tool`` hands the model the undelivered delta instead of
+the full result list.
+
+The SQLite store (``settings.watch_sqlite_path``) is opened on first use,
+so importing the agent creates no file.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from google.adk.tools.tool_context import ToolContext
+
+from .. import metrics
+from ..memprofile import profiled
+from ..settings import settings
+from .find_news import search_news
+from .find_papers import search_papers
+from .serpapi import has_capacity
+
+KINDS = ("papers", "news")
+
+
+def content_hash(kind: str, item: dict) -> str:
+    """Stable hash of a result; papers by title (links change between versions), news by link."""
+    if kind == "papers" or item.get("link", "N/A") == "N/A":
+        basis = item.get("title", "")
+    else:
+        basis = item["link"]
+    normalized = " ".join(re.findall(r"\w+", basis.lower()))
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _watch_id(user_id: str, kind: str, query: str) -> str:
+    basis = f"{user_id}\n{kind}\n{' '.join(query.lower().split())}"
+    return hashlib.blake2b(basis.encode("utf-8"), digest_size=6).hexdigest()
+
+
+class WatchStore:
+    """SQLite store for watches, seen-item hashes and undelivered updates."""
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS watches (
+                    watch_id TEXT PRIMARY KEY, user_id TEXT, kind TEXT, query TEXT,
+                    interval_seconds REAL, created_at REAL, last_run REAL,
+                    delivered_seq INTEGER DEFAULT 0);
+                CREATE TABLE IF NOT EXISTS seen (
+                    watch_id TEXT, item_hash TEXT, PRIMARY KEY (watch_id, item_hash)) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS updates (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT, watch_id TEXT, found_at REAL, item TEXT);
+                CREATE INDEX IF NOT EXISTS updates_by_watch ON updates (watch_id, seq);
+                """
+            )
+
+    def add(self, user_id: str, kind: str, query: str, interval_seconds: float) -> dict:
+        watch_id = _watch_id(user_id, kind, query)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO watches (watch_id, user_id, kind, query, interval_seconds, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(watch_id) DO UPDATE SET interval_seconds = excluded.interval_seconds",
+                (watch_id, user_id, kind, query, interval_seconds, time.time()),
+            )
+        return self.get(watch_id)
+
+    def get(self, watch_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM watches WHERE watch_id = ?", (watch_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list_for_user(self, user_id: str) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM watches WHERE user_id = ? ORDER BY created_at", (user_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def due(self, now: float) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM watches WHERE last_run IS NULL OR last_run + interval_seconds <= ? ORDER BY last_run",
+                (now,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def delete(self, watch_id: str) -> None:
+        with self._lock, self._conn:
+            for table in ("watches", "seen", "updates"):
+                self._conn.execute(f"DELETE FROM {table} WHERE watch_id = ?", (watch_id,))
+
+    def record_run(self, watch: dict, items: list[dict], ran_at: float) -> int:
+        """Stores the items not seen before and returns how many there were.
+
+        On the first run every item becomes part of the baseline and none is
+        reported as new.
+        """
+        baseline = watch["last_run"] is None
+        hashes = {content_hash(watch["kind"], item): item for item in items}
+        new = 0
+        with self._lock, self._conn:
+            for item_hash, item in hashes.items():
+                inserted = self._conn.execute(
+                    "INSERT OR IGNORE INTO seen VALUES (?, ?)", (watch["watch_id"], item_hash)
+                ).rowcount
+                if inserted and not baseline:
+                    self._conn.execute(
+                        "INSERT INTO updates (watch_id, found_at, item) VALUES (?, ?, ?)",
+                        (watch["watch_id"], ran_at, json.dumps(item, ensure_ascii=False)),
+                    )
+                    new += 1
+            self._conn.execute("UPDATE watches SET last_run = ? WHERE watch_id = ?", (ran_at, watch["watch_id"]))
+        return new
+
+    def take_updates(self, watch_id: str, limit: int) -> tuple[list[dict], int]:
+        """Returns up to ``limit`` undelivered items (oldest first) and how many remain after them."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "SELECT delivered_seq FROM watches WHERE watch_id = ?", (watch_id,)
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT seq, found_at, item FROM updates WHERE watch_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (watch_id, cursor, limit),
+            ).fetchall()
+            if rows:
+                cursor = rows[-1]["seq"]
+                self._conn.execute("UPDATE watches SET delivered_seq = ? WHERE watch_id = ?", (cursor, watch_id))
+            remaining = self._conn.execute(
+                "SELECT COUNT(*) FROM updates WHERE watch_id = ? AND seq > ?", (watch_id, cursor)
+            ).fetchone()[0]
+        items = [{**json.loads(row["item"]), "found_at": row["found_at"]} for row in rows]
+        return items, remaining
+
+
+def run_watch(store: WatchStore, watch: dict) -> dict:
+    """Runs one watch against SerpApi with a date filter and records the delta.
+
+    The search skips the tool cache (a cached answer could be older than the
+    last run) and asks for the newest ``watch_fetch_results`` items.
+    """
+    now = time.time()
+    since = watch["last_run"] or now - watch["interval_seconds"]
+    if watch["kind"] == "papers":
+        results = search_papers(
+            watch["query"], as_ylo=time.gmtime(since).tm_year,
+            num_results=settings.watch_fetch_results, sort_by_date=True, fresh=True,
+        )
+    else:
+        # One extra day so items published just before the last run are not missed.
+        results = search_news(
+            watch["query"], when_days=math.ceil((now - since) / 86400) + 1,
+            num_results=settings.watch_fetch_results, sort_by_date=True, fresh=True,
+        )
+    if "error" in results:
+        metrics.incr("watches.run_failed")
+        return {"error": results["error"]}
+    new = store.record_run(watch, results.get("articles", []), now)
+    metrics.incr("watches.run")
+    metrics.incr("watches.new_items", new)
+    return {"new_items": new}
+
+
+class WatchScheduler:
+    """Background thread that re-runs due watches while the SerpApi budget allows."""
+
+    def __init__(self, store: Callable[[], WatchStore], poll_seconds: float, workers: int = 2):
+        self._store = store
+        self.poll_seconds = poll_seconds
+        self._workers = workers
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="watch-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def run_due(self) -> int:
+        """Runs every due watch once; returns how many ran."""
+        store = self._store()
+        due = store.due(time.time())
+        ran = 0
+        with ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="watch") as pool:
+            futures = []
+            for watch in due:
+                if not has_capacity():
+                    # Interactive turns get the remaining budget; try again next poll.
+                    metrics.incr("watches.skipped_quota")
+                    break
+                futures.append(pool.submit(run_watch, store, watch))
+            for future in futures:
+                try:
+                    future.result()
+                    ran += 1
+                except Exception as e:
+                    metrics.incr("watches.run_failed")
+                    print(f"DEBUG: watch run failed: {e}")
+        return ran
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self.run_due()
+            self._stop.wait(self.poll_seconds)
+
+
+_store: Optional[WatchStore] = None
+_store_lock = threading.Lock()
+
+
+def watch_store() -> WatchStore:
+    """The watch store, opened on the first tool call or scheduler run."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = WatchStore(settings.watch_sqlite_path)
+        return _store
+
+
+watch_scheduler = WatchScheduler(watch_store, settings.watch_poll_seconds)
+
+
+def _user_id(tool_context: Optional[ToolContext]) -> str:
+    return tool_context.user_id if tool_context is not None else "default"
+
+
+@profiled
+def save_watch_tool(kind: str, query: str, tool_context: ToolContext) -> dict:
+    """Saves a watch so new papers or news for a query are collected periodically.
+
+    Args:
+        kind: "papers" (Google Scholar) or "news" (Google News).
+        query: The search query to watch.
+
+    Returns:
+        A dictionary with the 'watch' (watch_id, kind, query, interval_seconds).
+        Saving the same query again returns the existing watch.
+    """
+    kind = kind.strip().lower()
+    if kind not in KINDS:
+        return {"error": f"kind must be one of {', '.join(KINDS)}"}
+    if not query.strip():
+        return {"error": "query must not be empty"}
+    store = watch_store()
+    watch = store.add(_user_id(tool_context), kind, query.strip(), settings.watch_interval_seconds)
+    if watch["last_run"] is None:
+        run_watch(store, watch)
+    if settings.watch_scheduler_enabled:
+        watch_scheduler.start()
+    return {"watch": {k: watch[k] for k in ("watch_id", "kind", "query", "interval_seconds")}}
+
+
+@profiled
+def get_watch_updates_tool(tool_context: ToolContext, watch_id: str = "") -> dict:
+    """Returns only the papers or news found since the last check of the user's watches.
+
+    Args:
+        watch_id: One watch to check; empty checks all of the user's watches.
+
+    Returns:
+        A dictionary with a 'watches' list. Each entry has watch_id, kind, query,
+        'new_items' (not shown to the user before) and 'remaining' (more new
+        items left for the next call).
+    """
+    user_id = _user_id(tool_context)
+    store = watch_store()
+    watches = store.list_for_user(user_id)
+    if watch_id:
+        watches = [w for w in watches if w["watch_id"] == watch_id]
+        if not watches:
+            return {"error": f"No watch {watch_id} for this user."}
+    if settings.watch_scheduler_enabled:
+        watch_scheduler.start()
+
+    now = time.time()
+    report = []
+    for watch in watches:
+        # Without a running scheduler (or if it fell behind), refresh inline.
+        if (watch["last_run"] is None or watch["last_run"] + watch["interval_seconds"] <= now) and has_capacity():
+            run_watch(store, watch)
+        items, remaining = store.take_updates(watch["watch_id"], settings.watch_max_items_per_update)
+        report.append({
+            "watch_id": watch["watch_id"],
+            "kind": watch["kind"],
+            "query": watch["query"],
+            "new_items": items,
+            "remaining": remaining,
+        })
+    return {"watches": report}
+
+
+@profiled
+def delete_watch_tool(watch_id: str, tool_context: ToolContext) -> dict:
+    """Stops and removes one of the user's watches.
+
+    Args:
+        watch_id: The watch to remove.
+    """
+    store = watch_store()
+    watch = store.get(watch_id)
+    if watch is None or watch["user_id"] != _user_id(tool_context):
+        return {"error": f"No watch {watch_id} for this user."}
+    store.delete(watch_id)
+    return {"deleted": watch_id}
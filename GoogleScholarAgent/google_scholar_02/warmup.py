@@ -0,0 +1,126 @@
+"""Start-up warm-up for a fresh replica (called from the AdkApp in deploy.py).
+
+Runs, within ``settings.warmup_budget_seconds``:
+    1. imports of the tool modules and their heavy dependencies
+    2. pre-opened pooled connections to SerpApi and scholar.google.com
+    3. the most-read paper, author and news entries of the shared cache tier
+       copied into the in-process LRU
+
+Steps 2 and 3 run in parallel. Whatever is not done when the budget runs
+out keeps going in the background; the replica does not wait for it.
+``warm_up`` returns (and ``readiness`` keeps) a report of every step.
+"""
+
+import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional
+from urllib.parse import urlsplit
+
+from . import metrics
+from .settings import settings
+
+_TOOL_MODULES = (
+    "google_scholar_02.tools.find_papers",
+    "google_scholar_02.tools.find_news",
+    "google_scholar_02.tools.find_author",
+    "google_scholar_02.tools.find_author_details",
+    "google_scholar_02.tools.resolve_author",
+    "google_scholar_02.tools.watches",
+    "google_scholar_02.tools.abstracts",
+    "google_scholar_02.tools.author_metrics",
+    "google_scholar_02.tools.coauthors",
+)
+# Cache namespaces (SerpApi engines) worth preloading: papers and author
+# searches, author profiles, news.
+_PRELOAD_NAMESPACES = ("google_scholar", "google_scholar_author", "google_news")
+
+_report: dict[str, Any] = {"ready": False, "started": False}
+
+
+def _import_modules() -> dict:
+    for name in _TOOL_MODULES:
+        importlib.import_module(name)
+    # The first BeautifulSoup parse pays for building the parser's tables.
+    from bs4 import BeautifulSoup
+    BeautifulSoup("<html><head><meta name='x' content='y'></head></html>", "html.parser")
+    return {"modules": len(_TOOL_MODULES)}
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}/"
+
+
+def _open_connections(deadline: float) -> dict:
+    """HEAD requests on the shared sessions leave keep-alive connections in their pools."""
+    from .tools.find_author_details import scholar_http
+    from .tools.serpapi import http as serpapi_http
+
+    targets = [(serpapi_http, _origin(settings.serpapi_url)), (scholar_http, "https://scholar.google.com/")]
+    jobs = [target for target in targets for _ in range(max(1, settings.warmup_connections))]
+
+    def head(session, url) -> bool:
+        try:
+            session.head(url, timeout=max(0.5, deadline - time.monotonic()), allow_redirects=False)
+            return True
+        except Exception as e:
+            print(f"DEBUG: warm-up connection to {url} failed: {e}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="warmup-conn") as pool:
+        results = list(pool.map(lambda job: head(*job), jobs))
+    # An unreachable upstream leaves the replica serving, but not "ready".
+    return {"ok": all(results), "opened": sum(results), "failed": len(results) - sum(results)}
+
+
+def _preload_cache() -> dict:
+    from .tools.cache import tool_cache
+    return {"entries": tool_cache.preload(_PRELOAD_NAMESPACES, settings.warmup_preload_entries)}
+
+
+def _run_step(name: str, step: Callable[[], dict]) -> dict:
+    start = time.perf_counter()
+    try:
+        result = {"ok": True, **step()}
+    except Exception as e:
+        print(f"DEBUG: warm-up step {name} failed: {e}")
+        result = {"ok": False, "error": str(e)}
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    metrics.observe(f"warmup.{name}", result["seconds"])
+    return result
+
+
+def warm_up(budget_seconds: Optional[float] = None) -> dict:
+    """Warms this replica up within the time budget and reports readiness."""
+    budget = settings.warmup_budget_seconds if budget_seconds is None else budget_seconds
+    start = time.monotonic()
+    deadline = start + budget
+    _report.update(ready=False, started=True)
+    steps = {"imports": _run_step("imports", _import_modules)}
+
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="warmup")
+    futures = {
+        "connections": pool.submit(_run_step, "connections", lambda: _open_connections(deadline)),
+        "cache": pool.submit(_run_step, "cache", _preload_cache),
+    }
+    wait(futures.values(), timeout=max(0.0, deadline - time.monotonic()))
+    pool.shutdown(wait=False)
+    for name, future in futures.items():
+        steps[name] = future.result() if future.done() else {"ok": False, "error": "over budget"}
+
+    seconds = round(time.monotonic() - start, 3)
+    ready = all(step["ok"] for step in steps.values())
+    _report.update(ready=ready, seconds=seconds, budget_seconds=budget, steps=steps)
+    metrics.set_gauge("warmup.ready", 1 if ready else 0)
+    metrics.set_gauge("warmup.seconds", seconds)
+    summary = ", ".join(
+        f"{name} {'ok' if step['ok'] else 'FAILED'} ({step.get('seconds', '-')}s)" for name, step in steps.items()
+    )
+    print(f"Warm-up {'ready' if ready else 'degraded'} after {seconds}s of {budget}s: {summary}")
+    return dict(_report)
+
+
+def readiness() -> dict:
+    """The last warm-up report (``ready`` stays False until a warm-up completed cleanly)."""
+    return dict(_report)
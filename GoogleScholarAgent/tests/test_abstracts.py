@@ -0,0 +1,58 @@
+import time
+
+import pytest
+
+from google_scholar_02.tools import abstracts
+from google_scholar_02.tools.cache import make_key, tool_cache
+from google_scholar_02.tools.records import NA
+
+_ABSTRACT = "We study the effect of a gluten free diet on " + "many patients " * 10
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    tool_cache.clear()
+    yield
+    tool_cache.clear()
+
+
+def _page(abstract):
+    return f'<html><head><meta name="citation_abstract" content="Abstract: {abstract}"></head><body></body></html>'
+
+
+def test_extract_abstract_prefers_citation_abstract():
+    html = (
+        '<head><meta name="description" content="A journal site">'
+        f'<meta name="citation_abstract" content="Abstract: {_ABSTRACT}"></head>'
+    )
+    assert abstracts.extract_abstract(html) == " ".join(_ABSTRACT.split())
+    assert abstracts.extract_abstract('<head><meta name="description" content="Too short"></head>') == NA
+
+
+def test_landing_page():
+    assert abstracts.landing_page("https://arxiv.org/pdf/2101.00001v2.pdf") == "https://arxiv.org/abs/2101.00001v2"
+    assert abstracts.landing_page("https://example.org/paper.pdf") is None
+    assert abstracts.landing_page("https://example.org/paper") == "https://example.org/paper"
+
+
+def test_fetch_running_at_deadline_fills_cache(monkeypatch):
+    def slow_download(url, deadline):
+        time.sleep(0.3)
+        if time.monotonic() >= deadline:
+            raise TimeoutError("past the deadline")
+        return _page(_ABSTRACT)
+
+    monkeypatch.setattr(abstracts, "_download_head", slow_download)
+    link = "https://example.org/slow"
+    articles = [{"title": "Slow", "link": link}]
+
+    abstracts.enrich_abstracts(articles, deadline_seconds=0.05)
+    assert articles[0]["abstract"] == NA
+
+    key = make_key("abstract", {"link": link})
+    deadline = time.monotonic() + 5
+    while tool_cache.peek(key) is None:
+        assert time.monotonic() < deadline, "the late fetch never reached the cache"
+        time.sleep(0.02)
+    abstracts.enrich_abstracts(articles, deadline_seconds=0.05)
+    assert articles[0]["abstract"] == " ".join(_ABSTRACT.split())
@@ -0,0 +1,152 @@
+import asyncio
+import itertools
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from google_scholar_02 import admission
+
+_names = itertools.count()
+
+
+def _tool(body, concurrency=1, queue_depth=0, max_wait=0.2, stateful=False):
+    """An admitted tool with its own gate; ``body(**kwargs)`` runs on the tool executor."""
+    name = f"test_tool_{next(_names)}"
+
+    def tool(**kwargs):
+        return body(**kwargs)
+
+    tool.__name__ = name
+    admission._gates[name] = admission.AdmissionGate(name, concurrency, queue_depth, max_wait)
+    return admission.admitted(tool, stateful=stateful), admission._gates[name]
+
+
+def _blocking():
+    """A tool body that blocks until released, and an event set once it is running."""
+    started, release = threading.Event(), threading.Event()
+
+    def body(**kwargs):
+        started.set()
+        release.wait(5)
+        return {"query": kwargs.get("query"), "slow": True}
+
+    return body, started, release
+
+
+async def _wait_for(condition):
+    for _ in range(500):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("timed out")
+
+
+def test_cancelled_call_keeps_its_slot_until_the_thread_finishes():
+    body, started, release = _blocking()
+    tool, gate = _tool(body)
+
+    async def scenario():
+        task = asyncio.ensure_future(tool(query="a"))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert gate._running == 1
+        assert (await tool(query="b"))["busy"]
+
+        release.set()
+        await _wait_for(lambda: gate._running == 0)
+        assert (await tool(query="c")) == {"query": "c", "slow": True}
+
+    asyncio.run(scenario())
+
+
+def test_shed_call_gets_last_result_for_the_same_arguments():
+    body, started, release = _blocking()
+    tool, _ = _tool(body)
+
+    async def scenario():
+        release.set()
+        assert await tool(query="gluten") == {"query": "gluten", "slow": True}
+        release.clear()
+        started.clear()
+        busy = asyncio.ensure_future(tool(query="other"))
+        await _wait_for(started.is_set)
+
+        degraded = await tool(query="gluten")
+        assert degraded["query"] == "gluten" and degraded["degraded"]["served_from"] == "cache"
+        missing = await tool(query="never run")
+        assert missing["busy"] and "query" not in missing
+
+        release.set()
+        await busy
+
+    asyncio.run(scenario())
+
+
+def test_fallback_is_per_user():
+    body, started, release = _blocking()
+    tool, _ = _tool(body)
+    alice, bob = SimpleNamespace(user_id="alice"), SimpleNamespace(user_id="bob")
+
+    async def scenario():
+        release.set()
+        await tool(query="watches", tool_context=alice)
+        release.clear()
+        started.clear()
+        busy = asyncio.ensure_future(tool(query="other", tool_context=alice))
+        await _wait_for(started.is_set)
+
+        assert "degraded" in await tool(query="watches", tool_context=alice)
+        for_bob = await tool(query="watches", tool_context=bob)
+        assert for_bob["busy"] and "degraded" not in for_bob
+
+        release.set()
+        await busy
+
+    asyncio.run(scenario())
+
+
+def test_stateful_tool_is_never_replayed():
+    body, started, release = _blocking()
+    tool, _ = _tool(body, stateful=True)
+
+    async def scenario():
+        release.set()
+        await tool(query="save")
+        release.clear()
+        started.clear()
+        busy = asyncio.ensure_future(tool(query="other"))
+        await _wait_for(started.is_set)
+
+        shed = await tool(query="save")
+        assert shed["busy"] and shed["not_applied"] and "degraded" not in shed
+
+        release.set()
+        await busy
+
+    asyncio.run(scenario())
+
+
+def test_queue_and_deadline_shedding():
+    body, started, release = _blocking()
+    tool, gate = _tool(body, queue_depth=1, max_wait=0.2)
+    gate._service_seconds = 0.01  # so the queued call is not shed as "overloaded" up front
+
+    async def scenario():
+        busy = asyncio.ensure_future(tool(query="a"))
+        await _wait_for(started.is_set)
+        waiting = asyncio.ensure_future(tool(query="b"))
+        await _wait_for(lambda: len(gate._waiters) == 1)
+
+        full = await tool(query="c")
+        assert full["busy"] and "queue_full" in full["error"]
+        deadline = await waiting
+        assert deadline["busy"] and "deadline" in deadline["error"]
+
+        release.set()
+        await busy
+        await _wait_for(lambda: gate._running == 0)
+
+    asyncio.run(scenario())
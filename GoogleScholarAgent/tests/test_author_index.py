@@ -0,0 +1,63 @@
+import time
+
+from google_scholar_02.settings import settings
+from google_scholar_02.tools.author_index import AuthorIndex, normalize_name
+
+
+def _index_with_search(name, profiles, **kwargs):
+    index = AuthorIndex(**kwargs)
+    index.record_search(name, [author_id for author_id, _, _ in profiles])
+    for author_id, profile_name, affiliations in profiles:
+        index.add(author_id, profile_name, affiliations=affiliations, from_profile=True)
+    return index
+
+
+def test_normalize_name():
+    assert normalize_name("  Jürgen  Schmidhuber ") == "jurgen schmidhuber"
+    assert normalize_name("O'Brien, Łukasz") == "o brien lukasz"
+
+
+def test_recorded_search_answers_locally():
+    index = _index_with_search("Geoffrey Hinton", [("JicYPdAAAAAJ", "Geoffrey Hinton", "University of Toronto")])
+    assert index.lookup("geoffrey  HINTON") == [{
+        "name": "Geoffrey Hinton",
+        "link": "https://scholar.google.com/citations?user=JicYPdAAAAAJ",
+        "author_id": "JicYPdAAAAAJ",
+        "affiliations": "University of Toronto",
+    }]
+
+
+def test_sightings_alone_never_answer():
+    index = AuthorIndex()
+    index.add_from_papers([{"author_names": ["G Hinton"], "author_ids": ["JicYPdAAAAAJ"]}])
+    index.add("JicYPdAAAAAJ", "Geoffrey Hinton", from_profile=True)
+    assert index.lookup("Geoffrey Hinton") is None
+
+
+def test_empty_or_expired_search_goes_upstream(monkeypatch):
+    index = _index_with_search("Jane Doe", [("AAAAAAAAAAAA", "Jane Doe", None)])
+    index.record_search("Nobody Known", [])
+    assert index.lookup("Nobody Known") is None
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + settings.author_index_search_ttl_seconds + 1)
+    assert index.lookup("Jane Doe") is None
+
+
+def test_namesakes_ranked_by_sightings_then_affiliation():
+    index = _index_with_search("J Wang", [
+        ("AAAAAAAAAAAA", "J Wang", None),
+        ("BBBBBBBBBBBB", "J Wang", "MIT"),
+        ("CCCCCCCCCCCC", "J Wang", None),
+    ])
+    assert [a["author_id"] for a in index.lookup("J Wang")] == ["BBBBBBBBBBBB", "AAAAAAAAAAAA", "CCCCCCCCCCCC"]
+
+    index.add_from_papers([{"author_names": ["J Wang", "J Wang"], "author_ids": ["CCCCCCCCCCCC", "CCCCCCCCCCCC"]}])
+    assert [a["author_id"] for a in index.lookup("J Wang")] == ["CCCCCCCCCCCC", "BBBBBBBBBBBB", "AAAAAAAAAAAA"]
+
+
+def test_save_and_reload(tmp_path):
+    path = str(tmp_path / "authors.json.gz")
+    index = _index_with_search("Jane Doe", [("AAAAAAAAAAAA", "Jane Doe", "ETH Zurich")], path=path)
+    index.save()
+    assert AuthorIndex(path).lookup("Jane Doe") == index.lookup("Jane Doe")
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from google_scholar_02.tools import author_metrics
+from google_scholar_02.tools.cache import tool_cache
+
+
+def _author(cited_by, years=None, graph=()):
+    cited_by = np.asarray(cited_by, dtype=np.int64)
+    years = np.zeros(len(cited_by), dtype=np.int64) if years is None else np.asarray(years, dtype=np.int64)
+    return {"name": "A", "table": {}, "graph": list(graph), "cited_by": cited_by, "years": years}
+
+
+@pytest.mark.parametrize("cited_by, h, i10, g, total", [
+    ([10, 8, 5, 4, 3], 4, 1, 5, 30),
+    ([25, 8, 5, 3, 3], 3, 1, 5, 44),
+    ([3, 0, 100, 2, 1, 50], 3, 2, 6, 156),
+    ([1, 1, 1], 1, 0, 1, 3),
+    ([0, 0], 0, 0, 0, 0),
+    ([], 0, 0, 0, 0),
+])
+def test_indices_on_known_vectors(cited_by, h, i10, g, total):
+    (row,) = author_metrics.compute_metrics([_author(cited_by)], current_year=2026)
+    assert (row["h_index"], row["i10_index"], row["g_index"], row["total_citations"]) == (h, i10, g, total)
+    assert row["articles_counted"] == len(cited_by)
+
+
+def test_batch_rows_match_single_author_rows():
+    vectors = [[10, 8, 5, 4, 3], [1, 1, 1], [40, 30, 20, 10, 9, 9, 9, 9, 9, 9, 9, 2]]
+    batch = author_metrics.compute_metrics([_author(v) for v in vectors], current_year=2026)
+    for vector, row in zip(vectors, batch):
+        assert row == author_metrics.compute_metrics([_author(vector)], current_year=2026)[0]
+
+
+def test_trend_and_citations_per_year():
+    rising = [(2020, 10), (2021, 20), (2022, 30), (2023, 40), (2024, 50), (2025, 60), (2026, 5)]
+    falling = [(year, 100 - 10 * (year - 2020)) for year in range(2020, 2026)]
+    up, down = author_metrics.compute_metrics(
+        [_author([5], [2024], rising), _author([5], [2010], falling)], current_year=2026)
+
+    assert up["trend"]["direction"] == "rising"
+    assert up["trend"]["slope_citations_per_year"] == 10.0
+    assert up["trend"]["growth_last_3_years_pct"] == pytest.approx(150 / 60 * 100 - 100, abs=0.1)
+    assert up["citations_per_year"]["2026"] == 5
+    assert up["articles_last_5_years"] == 1
+    assert down["trend"]["direction"] == "declining"
+    assert down["articles_last_5_years"] == 0
+
+
+@pytest.mark.parametrize("author_ids", ["AAAAAAAAAAAA", "AAAAAAAAAAAA, BBBBBBBBBBBB", ["AAAAAAAAAAAA", " "]])
+def test_author_ids_string_is_not_split_into_characters(monkeypatch, author_ids):
+    tool_cache.clear()
+    fetched = []
+
+    def fetch(author_id):
+        fetched.append(author_id)
+        return _author([3, 2, 1])
+
+    monkeypatch.setattr(author_metrics, "fetch_author_columns", fetch)
+    result = author_metrics.author_metrics_tool(author_ids)
+    assert sorted(fetched) == sorted(row["author_id"] for row in result["authors"])
+    assert all(len(author_id) == 12 for author_id in fetched)
+    tool_cache.clear()
+
+
+def test_author_ids_of_the_wrong_type_are_rejected():
+    assert "error" in author_metrics.author_metrics_tool(None)
+    assert "error" in author_metrics.author_metrics_tool([])
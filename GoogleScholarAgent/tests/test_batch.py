@@ -0,0 +1,103 @@
+import json
+import os
+
+import pytest
+
+from google_scholar_02 import batch
+
+
+@pytest.fixture
+def tools(monkeypatch):
+    """Fake tools; queries containing "fail" return an error. Returns the calls made."""
+    calls = []
+
+    def tool(kind):
+        def run(value):
+            calls.append(f"{kind}:{value}")
+            return {"error": "Request error: 429"} if "fail" in value else {"articles": [{"title": value}]}
+        return run
+
+    monkeypatch.setattr(batch, "TOOLS", {kind: tool(kind) for kind in ("papers", "author", "news")})
+    return calls
+
+
+def _run(queries, sink, checkpoint_path, workers=2):
+    checkpoint = batch.Checkpoint(checkpoint_path)
+    try:
+        return batch.run_batch(iter(queries), sink, checkpoint, workers)
+    finally:
+        checkpoint.close()
+
+
+def test_parse_line():
+    assert batch.parse_line('{"kind": "papers", "query": "gluten"}') == ("papers", "gluten")
+    assert batch.parse_line("author\t2EpSYrcAAAAJ\n") == ("author", "2EpSYrcAAAAJ")
+    assert batch.parse_line("  # comment") is None
+    with pytest.raises(ValueError):
+        batch.parse_line("patents\tgluten")
+
+
+def test_jsonl_resume_skips_done_and_retries_errors(tools, tmp_path):
+    output, done = str(tmp_path / "out.jsonl"), str(tmp_path / "out.jsonl.done")
+    queries = [("papers", "gluten"), ("news", "fail once"), ("author", "A1"), ("papers", "gluten")]
+
+    sink = batch.JsonlSink(output)
+    stats = _run(queries, sink, done)
+    sink.close()
+    assert stats == {"done": 3, "skipped": 1, "errors": 1}
+    with open(done, encoding="utf-8") as f:
+        assert sorted(f.read().split("\n")[:-1]) == ["author:A1", "papers:gluten"]
+
+    tools.clear()
+    sink = batch.JsonlSink(output)
+    stats = _run(queries, sink, done)
+    sink.close()
+    assert tools == ["news:fail once"]
+    assert stats == {"done": 1, "skipped": 3, "errors": 1}
+    with open(output, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert [row["key"] for row in rows].count("news:fail once") == 2
+
+
+def test_parquet_resume_after_a_crash_between_flushes(tools, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    directory, done = str(tmp_path / "parts"), str(tmp_path / "parts.done")
+    queries = [("papers", f"q{i}") for i in range(5)]
+
+    sink = batch.ParquetSink(directory, batch_rows=2)
+    _run(queries, sink, done)
+    # Crash: the fifth row is still buffered and the sink is never closed.
+    parts = sorted(os.listdir(directory))
+    assert len(parts) == 2 and all(p.endswith(".parquet") for p in parts)
+    with open(done, encoding="utf-8") as f:
+        checkpointed = f.read().split()
+    assert len(checkpointed) == 4
+    assert sorted(pq.read_table(directory).column("key").to_pylist()) == sorted(checkpointed)
+
+    tools.clear()
+    sink = batch.ParquetSink(directory, batch_rows=2)
+    stats = _run(queries, sink, done)
+    sink.close()
+    assert tools == [key for key in (f"papers:q{i}" for i in range(5)) if key not in checkpointed]
+    assert stats["skipped"] == 4
+    table = pq.read_table(directory)
+    assert sorted(table.column("key").to_pylist()) == [f"papers:q{i}" for i in range(5)]
+    assert json.loads(table.column("result")[0].as_py())["articles"]
+
+
+def test_failed_parquet_write_checkpoints_nothing(tools, tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow.parquet")
+    directory, done = str(tmp_path / "parts"), str(tmp_path / "parts.done")
+    sink = batch.ParquetSink(directory, batch_rows=2)
+
+    def disk_full(table, path, **kwargs):
+        with open(path, "wb") as f:
+            f.write(b"PAR1 truncated")
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(sink._pq, "write_table", disk_full)
+    with pytest.raises(OSError):
+        _run([("papers", "a"), ("papers", "b")], sink, done)
+    assert not any(name.endswith(".parquet") for name in os.listdir(directory))
+    with open(done, encoding="utf-8") as f:
+        assert f.read() == ""
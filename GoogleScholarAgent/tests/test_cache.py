@@ -0,0 +1,154 @@
+import threading
+import time
+
+import pytest
+
+from google_scholar_02.tools.cache import ToolCache, make_key
+from google_scholar_02.tools.cache_backends import CacheBackend
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+def _counting(*values):
+    """A fetch returning ``values`` in turn, with the list of calls made."""
+    calls = []
+
+    def fetch():
+        calls.append(len(calls))
+        return values[min(len(calls), len(values)) - 1]
+
+    return fetch, calls
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_make_key_ignores_api_key_and_order():
+    assert make_key("e", {"q": "x", "num": 5, "api_key": "secret"}) == make_key("e", {"num": 5, "q": "x"})
+    assert make_key("e", {"q": "x"}) != make_key("other", {"q": "x"})
+
+
+def test_miss_then_fresh_hit(clock):
+    cache = ToolCache()
+    fetch, calls = _counting("v1", "v2")
+    assert cache.get_or_fetch("k", fetch, ttl=10, max_stale=100) == "v1"
+    clock[0] += 10
+    assert cache.get_or_fetch("k", fetch, ttl=10, max_stale=100) == "v1"
+    assert len(calls) == 1
+
+
+def test_stale_value_is_served_while_one_refresh_runs(clock):
+    cache = ToolCache()
+    cache.set("k", "old")
+    clock[0] += 50
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch():
+        calls.append(1)
+        release.wait(5)
+        return "new"
+
+    for _ in range(3):
+        assert cache.get_or_fetch("k", slow_fetch, ttl=10, max_stale=100) == "old"
+    release.set()
+    _wait_for(lambda: cache.peek("k") == "new")
+    assert len(calls) == 1  # the stale hits shared one background refresh
+    assert cache.get_or_fetch("k", slow_fetch, ttl=10, max_stale=100) == "new"
+
+
+def test_stale_hit_without_refresh_capacity_serves_stale(clock):
+    cache = ToolCache()
+    cache.set("k", "old")
+    clock[0] += 50
+    fetch, calls = _counting("new")
+    assert cache.get_or_fetch("k", fetch, ttl=10, max_stale=100, can_refresh=lambda: False) == "old"
+    time.sleep(0.05)
+    assert calls == [] and cache.peek("k") == "old"
+
+
+def test_failed_refresh_keeps_stale_value_and_is_retried(clock):
+    cache = ToolCache()
+    cache.set("k", "old")
+    clock[0] += 50
+    attempts = []
+
+    def failing():
+        attempts.append(1)
+        raise RuntimeError("upstream down")
+
+    assert cache.get_or_fetch("k", failing, ttl=10, max_stale=100) == "old"
+    _wait_for(lambda: len(attempts) == 1 and not cache._refreshing)
+    assert cache.get_or_fetch("k", lambda: "new", ttl=10, max_stale=100) == "old"
+    _wait_for(lambda: cache.peek("k") == "new")
+
+
+def test_entry_past_max_stale_is_fetched_synchronously(clock):
+    cache = ToolCache()
+    cache.set("k", "old")
+    clock[0] += 111
+    assert cache.get_or_fetch("k", lambda: "new", ttl=10, max_stale=100) == "new"
+
+
+def test_synchronous_fetch_error_propagates_and_caches_nothing(clock):
+    cache = ToolCache()
+
+    def failing():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_fetch("k", failing, ttl=10, max_stale=100)
+    assert cache.peek("k") is None
+
+
+def test_fresh_skips_a_fresh_entry_and_replaces_it(clock):
+    cache = ToolCache()
+    cache.set("k", "cached")
+    fetch, calls = _counting("live")
+    assert cache.get_or_fetch("k", fetch, ttl=10, max_stale=100, fresh=True) == "live"
+    assert len(calls) == 1
+    assert cache.get_or_fetch("k", fetch, ttl=10, max_stale=100) == "live"
+    assert len(calls) == 1
+
+
+def test_peek_max_age(clock):
+    cache = ToolCache()
+    cache.set("k", "v")
+    clock[0] += 30
+    assert cache.peek("k") == "v"
+    assert cache.peek("k", max_age=60) == "v"
+    assert cache.peek("k", max_age=10) is None
+
+
+def test_local_tier_is_an_lru():
+    cache = ToolCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.peek("a")
+    cache.set("c", 3)
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+
+
+class _BrokenBackend(CacheBackend):
+    def get_many(self, keys):
+        raise ConnectionError("shared tier down")
+
+    def set(self, key, value, stored_at, expire=None):
+        raise ConnectionError("shared tier down")
+
+
+def test_broken_shared_tier_degrades_to_local_cache(clock):
+    cache = ToolCache(shared=_BrokenBackend())
+    fetch, calls = _counting("v")
+    assert cache.get_or_fetch("k", fetch, ttl=10, max_stale=100) == "v"
+    assert cache.get_or_fetch("k", fetch, ttl=10, max_stale=100) == "v"
+    assert len(calls) == 1
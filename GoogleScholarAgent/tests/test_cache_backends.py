@@ -0,0 +1,118 @@
+"""Shared cache tier against a Redis-protocol server.
+
+Uses the server at $REDIS_URL when it is set, otherwise an in-process
+fakeredis server.
+"""
+
+import os
+import time
+
+import pytest
+
+from google_scholar_02.tools.cache import ToolCache, make_key
+from google_scholar_02.tools.cache_backends import RedisBackend
+from google_scholar_02.tools.records import Paper
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    url = os.environ.get("REDIS_URL")
+    if url is None:
+        fakeredis = pytest.importorskip("fakeredis")
+        import redis
+
+        server = fakeredis.FakeServer()
+        monkeypatch.setattr(redis.Redis, "from_url", lambda url, **kwargs: fakeredis.FakeRedis(server=server))
+        url = "redis://fake"
+    backend = RedisBackend(url, prefix=f"test-{os.getpid()}-{time.monotonic_ns()}:")
+    yield backend
+    backend.clear()
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_set_and_get(backend):
+    key = make_key("google_scholar", {"q": "gluten"})
+    papers = [Paper(title="Gluten", link="https://example.org/1", author_ids=("A1", "A2"))]
+    backend.set(key, {"articles": papers}, stored_at=123.0)
+
+    value, stored_at = backend.get(key)
+    assert value == {"articles": papers}
+    assert stored_at == 123.0
+    assert backend.get(make_key("google_scholar", {"q": "other"})) is None
+    assert set(backend.get_many([key, "google_scholar:missing"])) == {key}
+
+
+def test_set_expire_sets_server_ttl(backend):
+    key = make_key("google_news", {"q": "gluten"})
+    backend.set(key, {"articles": []}, stored_at=time.time(), expire=60)
+    ttl = backend._client.ttl(backend._prefix + key)
+    assert 0 < ttl <= 60
+
+    backend.delete(key)
+    assert backend.get(key) is None
+
+
+def test_stale_entry_is_served_then_refreshed(backend):
+    key = make_key("google_scholar", {"q": "stale"})
+    backend.set(key, "old", stored_at=time.time() - 100, expire=1000)
+    # A fresh local tier, as on another replica: the entry comes from Redis.
+    cache = ToolCache(shared=backend)
+
+    assert cache.get_or_fetch(key, lambda: "new", ttl=10, max_stale=1000) == "old"
+    _wait_for(lambda: backend.get(key)[0] == "new")
+    assert ToolCache(shared=backend).get_or_fetch(key, lambda: "newer", ttl=10, max_stale=1000) == "new"
+
+
+def test_entry_past_max_stale_is_fetched_synchronously(backend):
+    key = make_key("google_scholar", {"q": "expired"})
+    backend.set(key, "old", stored_at=time.time() - 100, expire=1000)
+    cache = ToolCache(shared=backend)
+
+    assert cache.get_or_fetch(key, lambda: "new", ttl=10, max_stale=50) == "new"
+    assert backend.get(key)[0] == "new"
+
+
+def test_fresh_entry_does_not_fetch(backend):
+    key = make_key("google_scholar", {"q": "fresh"})
+    backend.set(key, "cached", stored_at=time.time(), expire=1000)
+
+    def fetch():
+        raise AssertionError("fetch must not run for a fresh entry")
+
+    assert ToolCache(shared=backend).get_or_fetch(key, fetch, ttl=10, max_stale=1000) == "cached"
+
+
+def test_hottest_orders_by_reads_and_skips_missing(backend):
+    keys = [make_key("google_scholar", {"q": f"topic {i}"}) for i in range(4)]
+    for key in keys:
+        backend.set(key, key, stored_at=time.time())
+    other = make_key("google_news", {"q": "topic 0"})
+    backend.set(other, other, stored_at=time.time())
+    for key, reads in zip(keys, (1, 5, 3, 0)):
+        for _ in range(reads):
+            backend.get(key)
+    for _ in range(10):
+        backend.get(other)
+    # Read counts outlive their entry; an expired hot key must be skipped.
+    backend.delete(keys[1])
+
+    hottest = backend.hottest("google_scholar", 2)
+    assert list(hottest) == [keys[2], keys[0]]
+    assert hottest[keys[2]][0] == keys[2]
+
+
+def test_preload_copies_hottest_entries_to_local_tier(backend):
+    key = make_key("google_scholar_author", {"author_id": "A1"})
+    backend.set(key, "profile", stored_at=time.time())
+    backend.get(key)
+    cache = ToolCache(shared=backend)
+
+    assert cache.preload(["google_scholar_author"], 10) == 1
+    backend.delete(key)
+    assert cache.peek(key) == "profile"
@@ -0,0 +1,127 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from google_scholar_02.tools.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, SourceSelector
+from google_scholar_02.tools.find_author_details import _is_block_page
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+def _opened(clock, threshold=3, cooldown=60):
+    breaker = CircuitBreaker("test", failure_threshold=threshold, cooldown_seconds=cooldown)
+    for _ in range(threshold):
+        assert breaker.allow()
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, cooldown_seconds=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # resets the count
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = _opened(clock)
+    clock[0] += 59
+    assert not breaker.allow()
+
+    clock[0] += 1
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # only one probe at a time
+
+
+def test_successful_probe_closes(clock):
+    breaker = _opened(clock)
+    clock[0] += 60
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_probe_reopens_for_another_cooldown(clock):
+    breaker = _opened(clock)
+    clock[0] += 60
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock[0] += 59
+    assert not breaker.allow()
+    clock[0] += 1
+    assert breaker.allow()
+
+
+def test_selector_fails_over_in_preference_order():
+    selector = SourceSelector(alpha=0.5, min_success=0.5, max_latency=5.0, explore_interval=0)
+    assert selector.choose(["scrape", "serpapi"]) == "scrape"
+
+    selector.record("scrape", False, 1.0)
+    selector.record("scrape", False, 1.0)
+    assert not selector.is_healthy("scrape")
+    assert selector.choose(["scrape", "serpapi"]) == "serpapi"
+
+    selector.record("scrape", True, 1.0)
+    selector.record("scrape", True, 1.0)
+    assert selector.choose(["scrape", "serpapi"]) == "scrape"
+
+
+def test_selector_treats_slow_sources_as_unhealthy():
+    selector = SourceSelector(alpha=1.0, max_latency=5.0, explore_interval=0)
+    selector.record("scrape", True, 9.0)
+    assert selector.choose(["scrape", "serpapi"]) == "serpapi"
+
+
+def test_selector_picks_best_success_rate_when_all_unhealthy():
+    selector = SourceSelector(alpha=1.0, explore_interval=0)
+    selector.record("scrape", False)
+    selector.record("serpapi", False)
+    selector.record("serpapi", True)
+    selector.record("serpapi", False)
+    selector.record("scrape", True, 20.0)
+    assert selector.choose(["scrape", "serpapi"]) == "scrape"
+    selector.record("scrape", False)
+    assert selector.choose(["serpapi", "scrape"]) == "serpapi"
+
+
+def test_selector_explores_the_first_source_periodically():
+    selector = SourceSelector(alpha=1.0, explore_interval=3)
+    selector.record("scrape", False)
+    assert [selector.choose(["scrape", "serpapi"]) for _ in range(3)] == ["serpapi", "serpapi", "scrape"]
+
+
+def _response(text="", status_code=200, url="https://scholar.google.com/citations?user=A"):
+    return SimpleNamespace(text=text, status_code=status_code, url=url)
+
+
+def test_block_page_detection():
+    assert _is_block_page(_response(status_code=429))
+    assert _is_block_page(_response(url="https://www.google.com/sorry/index?continue=x"))
+    assert _is_block_page(_response('<form id="gs_captcha_f"><div class="g-recaptcha"></div></form>'))
+    assert _is_block_page(_response("Our systems have detected unusual traffic from your computer network."))
+    assert _is_block_page(_response('<form action="/sorry/index" method="post">'))
+
+
+def test_profile_page_loading_recaptcha_is_not_a_block_page():
+    page = (
+        '<html><head><script src="https://www.gstatic.com/recaptcha/releases/x/recaptcha__en.js"></script></head>'
+        '<body><div id="gsc_prf_in">Jane Doe</div><a class="gsc_a_at" href="/citations?view_op=view_citation">'
+        "Paper</a></body></html>"
+    )
+    assert not _is_block_page(_response(page))
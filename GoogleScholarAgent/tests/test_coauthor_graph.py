@@ -0,0 +1,75 @@
+from google_scholar_02.tools.coauthor_graph import CoauthorGraph, byline_key
+
+
+def _paper(title, *author_ids):
+    return {"title": title, "author_names": [f"Author {a}" for a in author_ids], "author_ids": list(author_ids)}
+
+
+def _graph(*papers):
+    graph = CoauthorGraph()
+    graph.add_from_papers(list(papers))
+    return graph
+
+
+def _ids(path):
+    return [entry["author_id"] for entry in path]
+
+
+def test_byline_key():
+    assert byline_key("Geoffrey E. Hinton") == byline_key("GE Hinton") == "g hinton"
+
+
+def test_same_paper_seen_twice_counts_once():
+    graph = _graph(_paper("Deep nets", "A", "B"), _paper("Deep Nets!", "A", "B", "C"), _paper("Other", "A", "B"))
+    assert [(c["author_id"], c["shared_papers"]) for c in graph.top_collaborators("A")] == [("B", 2), ("C", 1)]
+    assert graph.stats() == {"authors": 3, "links": 3, "papers": 2}
+
+
+def test_shortest_path_prefers_fewest_hops_then_strongest_links():
+    graph = _graph(
+        # S - P - T: two hops, one shared paper per link.
+        _paper("p1", "S", "P"), _paper("p2", "P", "T"),
+        # S - Q - T: two hops, three shared papers per link.
+        *[_paper(f"q{i}", "S", "Q") for i in range(3)], *[_paper(f"r{i}", "Q", "T") for i in range(3)],
+        # S - L1 - L2 - T: three hops with strong links.
+        *[_paper(f"s{i}", "S", "L1") for i in range(9)], *[_paper(f"m{i}", "L1", "L2") for i in range(9)],
+        *[_paper(f"t{i}", "L2", "T") for i in range(9)],
+    )
+    path = graph.shortest_path("S", "T", max_hops=6)
+    assert _ids(path) == ["S", "Q", "T"]
+    assert [entry.get("shared_papers") for entry in path] == [None, 3, 3]
+    assert _ids(graph.shortest_path("T", "S", max_hops=6)) == ["T", "Q", "S"]
+
+
+def test_meeting_points_on_both_sides_of_an_uneven_search():
+    # S has many neighbours and T one, so the search grows from T's side;
+    # the chains through X (weak link) and Y (strong) are equally short.
+    graph = _graph(
+        *[_paper(f"fan{i}", "S", f"F{i}") for i in range(5)],
+        _paper("sx", "S", "X"), _paper("xm", "X", "M"),
+        *[_paper(f"sy{i}", "S", "Y") for i in range(4)], *[_paper(f"ym{i}", "Y", "M") for i in range(4)],
+        *[_paper(f"mt{i}", "M", "T") for i in range(4)],
+    )
+    assert _ids(graph.shortest_path("S", "T", max_hops=6)) == ["S", "Y", "M", "T"]
+
+
+def test_paths_skip_name_only_authors_and_respect_max_hops():
+    graph = _graph(_paper("a", "S", "A"), _paper("b", "A", "B"), _paper("c", "B", "T"))
+    # Both S and T co-wrote with a byline-only "J Wang": not a usable link.
+    graph.add_author_articles("S", "Author S", [("w1", "Author S, J Wang")])
+    graph.add_author_articles("T", "Author T", [("w2", "J Wang, Author T")])
+
+    assert _ids(graph.shortest_path("S", "T", max_hops=3)) == ["S", "A", "B", "T"]
+    assert graph.shortest_path("S", "T", max_hops=2) is None
+    assert graph.shortest_path("S", "nobody", max_hops=6) is None
+    assert _ids(graph.shortest_path("S", "S", max_hops=6)) == ["S"]
+
+
+def test_save_and_reload(tmp_path):
+    path = str(tmp_path / "graph.json.gz")
+    graph = CoauthorGraph(path)
+    graph.add_from_papers([_paper("p", "S", "A"), _paper("q", "A", "T")])
+    graph.save()
+    reloaded = CoauthorGraph(path)
+    assert reloaded.stats() == graph.stats()
+    assert _ids(reloaded.shortest_path("S", "T", max_hops=6)) == ["S", "A", "T"]
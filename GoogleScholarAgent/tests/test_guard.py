@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+from google_scholar_02.guard import ToolCallGuard
+
+
+def _call(guard, tool_name, args, invocation_id="turn-1"):
+    """Runs one tool call through the guard; returns (response, ran)."""
+    tool = SimpleNamespace(name=tool_name)
+    context = SimpleNamespace(invocation_id=invocation_id)
+    memoized = guard.before_tool(tool, args, context)
+    if memoized is not None:
+        return memoized, False
+    response = {"args": args}
+    guard.after_tool(tool, args, context, response)
+    return response, True
+
+
+def test_identical_call_is_memoized():
+    guard = ToolCallGuard()
+    first, _ = _call(guard, "find_papers_tool", {"query": "gluten free diet"})
+    second, ran = _call(guard, "find_papers_tool", {"query": "gluten free diet"})
+    assert not ran and second is first
+
+
+def test_reworded_query_is_near_duplicate():
+    guard = ToolCallGuard(similarity_threshold=0.7)
+    first, _ = _call(guard, "find_papers_tool", {"query": "gluten free diet effects"})
+    second, ran = _call(guard, "find_papers_tool", {"query": "effects of gluten free diet"})
+    assert not ran and second is first
+
+
+def test_different_author_id_lists_both_run():
+    guard = ToolCallGuard()
+    _call(guard, "author_metrics_tool", {"author_ids": ["AAAAAAAAAAAA"]})
+    response, ran = _call(guard, "author_metrics_tool", {"author_ids": ["BBBBBBBBBBBB"]})
+    assert ran and response["args"]["author_ids"] == ["BBBBBBBBBBBB"]
+
+
+def test_same_author_id_list_is_memoized():
+    guard = ToolCallGuard()
+    first, _ = _call(guard, "author_metrics_tool", {"author_ids": ["AAAAAAAAAAAA", "BBBBBBBBBBBB"]})
+    second, ran = _call(guard, "author_metrics_tool", {"author_ids": ["AAAAAAAAAAAA", "BBBBBBBBBBBB"]})
+    assert not ran and second is first
+
+
+def test_turns_do_not_share_memo():
+    guard = ToolCallGuard()
+    _call(guard, "find_papers_tool", {"query": "gluten"}, invocation_id="turn-1")
+    _, ran = _call(guard, "find_papers_tool", {"query": "gluten"}, invocation_id="turn-2")
+    assert ran
+
+
+def test_changed_filters_are_not_near_duplicates():
+    guard = ToolCallGuard(similarity_threshold=0.7)
+    base = {"query": "gluten free diet", "year_from": 2000, "num_results": 10}
+    _call(guard, "find_papers_tool", base)
+    for changed in (
+        {"year_from": 2020},
+        {"year_to": 2021},
+        {"num_results": 30},
+        {"sort_by_date": True},
+        {"include_abstracts": True},
+        {"language": "de"},
+    ):
+        _, ran = _call(guard, "find_papers_tool", {**base, **changed})
+        assert ran, changed
+
+
+def test_news_country_is_not_near_duplicate():
+    guard = ToolCallGuard()
+    _call(guard, "find_news_tool", {"query": "gluten", "country": "us"})
+    _, ran = _call(guard, "find_news_tool", {"query": "gluten", "country": "jp"})
+    assert ran
+
+
+def test_distinct_author_ids_are_not_near_duplicates():
+    guard = ToolCallGuard()
+    _call(guard, "find_author_details_tool", {"author_id": "LSsXyncAAAAJ"})
+    _, ran = _call(guard, "find_author_details_tool", {"author_id": "2EpSYrcAAAAJ"})
+    assert ran
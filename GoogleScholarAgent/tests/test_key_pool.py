@@ -0,0 +1,157 @@
+import json
+import time
+
+import pytest
+import requests
+
+from google_scholar_02.tools import serpapi
+from google_scholar_02.tools.serpapi import KeyPool, NoKeyAvailableError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Drives both time.monotonic (cooldowns) and time.time (hourly windows)."""
+
+    class Clock:
+        now = 1_000_000.0
+
+        def advance(self, seconds):
+            self.now += seconds
+
+    clock = Clock()
+    monkeypatch.setattr(time, "monotonic", lambda: clock.now)
+    monkeypatch.setattr(time, "time", lambda: clock.now)
+    return clock
+
+
+def test_unlimited_keys_rotate_by_recent_calls(clock):
+    pool = KeyPool(["key-aaaa", "key-bbbb", "key-cccc"])
+    picked = [pool.acquire().label for _ in range(6)]
+    assert sorted(picked) == ["aaaa", "aaaa", "bbbb", "bbbb", "cccc", "cccc"]
+    assert picked[:3] == ["aaaa", "bbbb", "cccc"]
+
+
+def test_duplicate_and_blank_keys_are_dropped():
+    pool = KeyPool(["k-1234", " k-1234 ", "", "x-1234"])
+    assert len(pool) == 2
+    assert [u["key"] for u in pool.usage()] == ["1234", "1234_1"]
+
+
+def test_key_with_most_quota_left_is_used_first(clock):
+    pool = KeyPool(["key-aaaa", "key-bbbb"])
+    pool._keys[0].searches_left = 1
+    pool._keys[1].searches_left = 3
+    assert [pool.acquire().label for _ in range(4)] == ["bbbb", "bbbb", "aaaa", "bbbb"]
+    with pytest.raises(NoKeyAvailableError):
+        pool.acquire()
+    assert pool.remaining() == 0 and not pool.has_room()
+
+
+def test_hourly_limit_frees_up_after_an_hour(clock):
+    pool = KeyPool(["key-aaaa"], hourly_limit=2)
+    pool.acquire()
+    pool.acquire()
+    assert not pool.has_room()
+    clock.advance(3601)
+    assert pool.remaining() == 2
+    assert pool.acquire().label == "aaaa"
+
+
+def test_429_cools_down_with_doubling_backoff(clock):
+    pool = KeyPool(["key-aaaa", "key-bbbb"], cooldown_seconds=60, max_cooldown_seconds=200)
+    a = pool.acquire()
+    pool.report(a, 429)
+    assert {pool.acquire().label for _ in range(3)} == {"bbbb"}
+
+    clock.advance(61)
+    assert a in pool._available(time.monotonic())
+    pool.report(a, 429)
+    assert pool.usage()[0]["cooling_seconds"] == 120
+    pool.report(a, 429)
+    assert pool.usage()[0]["cooling_seconds"] == 200  # capped at max_cooldown_seconds
+    assert pool.usage()[0]["throttled"] == 3
+
+    clock.advance(201)
+    pool.report(a, 200)
+    pool.report(a, 429)
+    assert pool.usage()[0]["cooling_seconds"] == 60  # a success resets the backoff
+
+
+@pytest.mark.parametrize("status", [401, 403])
+def test_rejected_key_is_taken_out_for_the_max_cooldown(clock, status):
+    pool = KeyPool(["key-aaaa"], cooldown_seconds=60, max_cooldown_seconds=3600)
+    pool.report(pool.acquire(), status)
+    with pytest.raises(NoKeyAvailableError):
+        pool.acquire()
+    clock.advance(3599)
+    assert not pool.has_room()
+    clock.advance(2)
+    assert pool.acquire().label == "aaaa"
+
+
+def test_other_errors_do_not_cool_the_key_down(clock):
+    pool = KeyPool(["key-aaaa"])
+    pool.report(pool.acquire(), 500)
+    assert pool.has_room()
+
+
+def test_no_keys_configured():
+    with pytest.raises(NoKeyAvailableError, match="No SerpApi API key configured"):
+        KeyPool([]).acquire()
+
+
+class _Response:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.headers = {}
+        self.content = json.dumps(body or {}).encode()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} error")
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Answers each SerpApi call with the status configured for its key."""
+
+    class Upstream:
+        statuses: dict = {}
+        keys_used: list = []
+
+        def get(self, url, params, timeout, stream=False):
+            self.keys_used.append(params["api_key"])
+            return _Response(self.statuses.get(params["api_key"], 200), {"ok": params["api_key"]})
+
+    upstream = Upstream()
+    upstream.keys_used = []
+    monkeypatch.setattr(serpapi, "http", upstream)
+    return upstream
+
+
+@pytest.mark.parametrize("status", [401, 403, 429])
+def test_fetch_retries_with_another_key(clock, monkeypatch, upstream, status):
+    pool = KeyPool(["key-aaaa", "key-bbbb"])
+    monkeypatch.setattr(serpapi, "key_pool", pool)
+    upstream.statuses = {"key-aaaa": status}
+    assert serpapi._fetch({"engine": "test"}, timeout=1) == {"ok": "key-bbbb"}
+    assert upstream.keys_used == ["key-aaaa", "key-bbbb"]
+    # The failing key sits out the next calls.
+    serpapi._fetch({"engine": "test"}, timeout=1)
+    assert upstream.keys_used[-1] == "key-bbbb"
+
+
+def test_fetch_raises_when_every_key_fails(clock, monkeypatch, upstream):
+    pool = KeyPool(["key-aaaa", "key-bbbb"])
+    monkeypatch.setattr(serpapi, "key_pool", pool)
+    upstream.statuses = {"key-aaaa": 429, "key-bbbb": 429}
+    with pytest.raises(requests.exceptions.HTTPError):
+        serpapi._fetch({"engine": "test"}, timeout=1)
+    with pytest.raises(NoKeyAvailableError):
+        serpapi._fetch({"engine": "test"}, timeout=1)
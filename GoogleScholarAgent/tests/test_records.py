@@ -0,0 +1,67 @@
+import pytest
+
+from google_scholar_02.tools import records
+from google_scholar_02.tools.cache_backends import decode_entry, encode_entry
+from google_scholar_02.tools.records import NA, AuthorProfile, NewsItem, Paper
+
+_PAPERS = [
+    Paper(title="Gluten", link="https://example.org/1", author_names=("A One", "B Two"), author_ids=("A1", "B2")),
+    Paper(title="Celiac", authors="A One, C Three", year="2020", cited_by=2**40),
+    Paper(title="Wheat", cited_by=-3),
+]
+
+
+def _assert_same(value, expected):
+    assert value == expected
+    assert type(value) is type(expected)
+    if isinstance(expected, dict):
+        for key in expected:
+            _assert_same(value[key], expected[key])
+    elif isinstance(expected, (list, tuple)):
+        for item, expected_item in zip(value, expected):
+            _assert_same(item, expected_item)
+
+
+@pytest.mark.parametrize("value", [
+    _PAPERS,
+    {"articles": _PAPERS, "author": AuthorProfile(author_id="A1", name="A One"), "next": None},
+    {"n": 2**63 - 1, "m": -2**63, "small": 7, "ratio": 0.25, "flags": [True, False, None], "na": NA},
+    {"nested": [{"a": [1, [2**33, 1.5], ("x", 3)]}, {}], "empty": []},
+    [Paper(title="Mixed", cited_by=1), Paper(title="Mixed", cited_by=0.5)],
+])
+def test_pack_round_trip_keeps_types(value):
+    _assert_same(records.unpack(records.pack(value)), value)
+
+
+def test_pack_rejects_unsupported_values_with_value_error():
+    for value in ({1: "int key"}, {"big": 2**64}, {"set": {1}}, {"articles": _PAPERS, "meta": {(1, 2): 3}}):
+        with pytest.raises(ValueError):
+            records.pack(value)
+
+
+def test_record_tuples_of_non_strings_keep_their_elements():
+    value = [Paper(title="Ids", author_ids=(1, 2)), Paper(title="More ids", author_ids=(3,))]
+    _assert_same(records.unpack(records.pack(value)), value)
+
+
+@pytest.mark.parametrize("value, marker", [
+    ({"articles": _PAPERS}, b"R"),
+    ({"author": AuthorProfile(author_id="A1"), "articles": _PAPERS[:1]}, b"R"),
+    ({"articles": [NewsItem(title="News", link="https://example.org/n")]}, b"J"),
+    ({"articles": _PAPERS, "big": 2**70}, b"J"),
+    ({"articles": _PAPERS, "by_year": {2020: 3}}, b"J"),
+    ({"plain": [1, 2.5, "x"]}, b"x"),
+])
+def test_cache_entry_round_trip(value, marker):
+    blob = encode_entry(value, 123.5)
+    assert blob[8:9] == marker
+    decoded, stored_at = decode_entry(blob)
+    assert stored_at == 123.5
+    if "by_year" in value:
+        # The JSON fallback turns int keys into strings, like any JSON cache entry.
+        assert decoded == {**value, "by_year": {"2020": 3}}
+    elif "big" in value:
+        # orjson reads ints beyond 64 bits back as floats; 2**70 is exact either way.
+        assert decoded == value
+    else:
+        _assert_same(decoded, value)
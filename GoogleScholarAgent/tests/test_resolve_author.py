@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from google_scholar_02.settings import settings
+from google_scholar_02.tools import resolve_author
+from google_scholar_02.tools.cache import tool_cache
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    tool_cache.clear()
+    yield
+    tool_cache.clear()
+
+
+def _searches(monkeypatch, results):
+    """Replaces find_author_tool; ``results`` maps a name to its response."""
+    calls = []
+
+    def find_author_tool(name):
+        calls.append(name)
+        return results.get(name, {"Authors": []})
+
+    monkeypatch.setattr(resolve_author, "find_author_tool", find_author_tool)
+    return calls
+
+
+def test_search_error_is_returned_without_fallback(monkeypatch):
+    calls = _searches(monkeypatch, {"Jane Müller": {"error": "Request error: 429"}})
+    result = resolve_author.resolve_author_tool("Jane Müller")
+    assert result == {"Authors": [], "error": "Request error: 429"}
+    assert calls == ["Jane Müller"]
+
+
+def test_variant_error_is_returned_without_fallback(monkeypatch):
+    _searches(monkeypatch, {"Jane Mueller": {"error": "Request error: timeout"}})
+    result = resolve_author.resolve_author_tool("Jane Müller")
+    assert "fallback" not in result
+    assert result["error"] == "Request error: timeout"
+
+
+def test_no_match_falls_back_to_google_search(monkeypatch):
+    _searches(monkeypatch, {})
+    result = resolve_author.resolve_author_tool("Jane Müller")
+    assert result["Authors"] == [] and result["fallback"] == "google_search_agent"
+
+
+def test_single_match_is_memoized_until_ttl(monkeypatch):
+    author = {"name": "Jane Doe", "link": "https://example.org", "author_id": "AAAAAAAAAAAA"}
+    calls = _searches(monkeypatch, {"Jane Doe": {"Authors": [author]}})
+    assert resolve_author.resolve_author_tool("Jane Doe")["source"] == "find_author_tool"
+    assert resolve_author.resolve_author_tool("jane doe") == {"Authors": [author], "source": "memo"}
+    assert calls == ["Jane Doe"]
+
+    ttl = settings.author_index_search_ttl_seconds
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + ttl + 1)
+    assert resolve_author.resolve_author_tool("Jane Doe")["source"] == "find_author_tool"
+    assert calls == ["Jane Doe", "Jane Doe"]
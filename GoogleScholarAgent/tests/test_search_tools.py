@@ -0,0 +1,34 @@
+from google_scholar_02.tools import find_news, find_papers
+
+
+def _fake_news(monkeypatch, count):
+    calls = []
+
+    def serpapi_search(params, parse, fresh=False):
+        calls.append(params)
+        return parse({"news_results": [{"title": f"News {i}", "link": f"https://example.org/{i}"} for i in range(count)]})
+
+    monkeypatch.setattr(find_news, "serpapi_search", serpapi_search)
+    return calls
+
+
+def test_news_defaults_to_ten_results(monkeypatch):
+    _fake_news(monkeypatch, 30)
+    assert len(find_news.find_news_tool("gluten")["articles"]) == 10
+
+
+def test_news_filters_become_query_operators(monkeypatch):
+    calls = _fake_news(monkeypatch, 3)
+    find_news.find_news_tool("gluten", year_from=2020, year_to=2021, sort_by_date=True, country="US")
+    assert calls == [{"engine": "google_news", "q": "gluten after:2020-01-01 before:2022-01-01", "so": 1, "gl": "us"}]
+
+
+def test_invalid_arguments_return_error_dicts(monkeypatch):
+    requests_made = []
+    monkeypatch.setattr(find_papers, "serpapi_search_pages", lambda *args, **kwargs: requests_made.append(args))
+    monkeypatch.setattr(find_news, "serpapi_search", lambda *args, **kwargs: requests_made.append(args))
+    assert "error" in find_papers.find_papers_tool("gluten", num_results="many")
+    assert "error" in find_papers.find_papers_tool("gluten", year_to="soon")
+    assert "error" in find_news.find_news_tool("gluten", num_results="many")
+    assert "error" in find_news.find_news_tool("gluten", year_from="recent")
+    assert requests_made == []
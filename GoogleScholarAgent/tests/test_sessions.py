@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from google_scholar_02.sessions import BoundedSessionService
+
+APP = "app"
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def _event(i, state_delta=None, payload=None):
+    parts = [types.Part(function_response=types.FunctionResponse(name="tool", response=payload))] if payload else [
+        types.Part(text=f"message {i}")
+    ]
+    return Event(
+        author="agent",
+        invocation_id=f"turn-{i}",
+        content=types.Content(role="model", parts=parts),
+        actions=EventActions(state_delta=state_delta or {}),
+    )
+
+
+def _create(service, user_id, session_id, state=None):
+    return _run(service.create_session(app_name=APP, user_id=user_id, session_id=session_id, state=state))
+
+
+def _get(service, user_id, session_id):
+    return _run(service.get_session(app_name=APP, user_id=user_id, session_id=session_id))
+
+
+def test_lru_eviction_drops_the_users_state_with_their_last_session():
+    service = BoundedSessionService(max_sessions=2)
+    _create(service, "u1", "a", {"user:topic": "gluten", "app:model": "m1"})
+    _create(service, "u1", "b")
+    assert _get(service, "u1", "a").state["user:topic"] == "gluten"
+
+    _create(service, "u2", "c")  # evicts u1/b, the least recently used
+    assert _get(service, "u1", "b") is None
+    assert service._scoped_state[(APP, "u1")] == {"topic": "gluten"}  # u1/a is still in memory
+
+    _create(service, "u3", "d")  # evicts u1/a, u1's last session
+    assert _get(service, "u1", "a") is None
+    assert (APP, "u1") not in service._scoped_state
+    assert set(service._user_sessions) == {(APP, "u2"), (APP, "u3")}
+    # App state is shared by every user and is never evicted.
+    assert _get(service, "u3", "d").state["app:model"] == "m1"
+
+    fresh = _create(service, "u1", "e")
+    assert "user:topic" not in fresh.state
+
+
+def test_ttl_eviction_drops_user_state(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    service = BoundedSessionService(ttl_seconds=60)
+    _create(service, "u1", "a", {"user:topic": "gluten"})
+    now[0] += 61
+    assert _get(service, "u1", "a") is None
+    assert service._scoped_state == {} and not service._user_sessions
+
+
+def test_delete_session_drops_user_state():
+    service = BoundedSessionService()
+    _create(service, "u1", "a", {"user:topic": "gluten"})
+    _run(service.delete_session(app_name=APP, user_id="u1", session_id="a"))
+    assert service._scoped_state == {} and not service._user_sessions
+
+
+def test_old_tool_payloads_are_compacted_and_events_capped():
+    service = BoundedSessionService(max_events=5, keep_full_events=2)
+    session = _create(service, "u1", "a")
+    for i in range(8):
+        _run(service.append_event(session, _event(i, {"user:last": i}, payload={"articles": ["x" * 50] * 3})))
+
+    stored = _get(service, "u1", "a")
+    assert [e.invocation_id for e in stored.events] == [f"turn-{i}" for i in range(3, 8)]
+    responses = [e.content.parts[0].function_response.response for e in stored.events]
+    assert all(r.get("_compacted") for r in responses[:-2])
+    assert responses[0]["keys"] == ["articles"] and responses[0]["size"] > 150
+    assert responses[-2:] == [{"articles": ["x" * 50] * 3}] * 2
+    assert stored.state["user:last"] == 7
+
+
+def test_sqlite_keeps_user_state_across_eviction_and_restart(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    service = BoundedSessionService(max_sessions=1, sqlite_path=path)
+    session = _create(service, "u1", "a", {"user:topic": "gluten"})
+    _run(service.append_event(session, _event(1, {"user:year": 2020, "note": "kept"})))
+    _create(service, "u2", "b")  # evicts u1/a from memory
+    assert (APP, "u1") not in service._scoped_state
+
+    reloaded = _get(service, "u1", "a")
+    assert reloaded.state == {"note": "kept", "user:topic": "gluten", "user:year": 2020}
+    assert len(reloaded.events) == 1
+
+    restarted = BoundedSessionService(sqlite_path=path)
+    assert _get(restarted, "u1", "a").state["user:year"] == 2020
+
+
+def test_sqlite_sweep_removes_state_of_users_without_sessions(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    path = str(tmp_path / "sessions.sqlite3")
+    service = BoundedSessionService(ttl_seconds=60, sqlite_path=path)
+    _create(service, "u1", "a", {"user:topic": "gluten", "app:model": "m1"})
+    now[0] += 120
+    _create(service, "u2", "b")  # runs the on-disk sweep
+
+    assert service._store.load_scoped_state(APP, "u1") is None
+    assert service._store.load_scoped_state(APP, "") == {"model": "m1"}
@@ -0,0 +1,118 @@
+import time
+
+import pytest
+
+from google_scholar_02.settings import settings
+from google_scholar_02.tools import watches
+
+
+class _Context:
+    user_id = "u1"
+
+
+def _paper(title):
+    return {"title": title, "link": f"https://example.org/{title.split()[0].lower()}"}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = watches.WatchStore(str(tmp_path / "watches.sqlite3"))
+    monkeypatch.setattr(watches, "watch_store", lambda: store)
+    monkeypatch.setattr(watches, "has_capacity", lambda: True)
+    monkeypatch.setattr(settings, "watch_scheduler_enabled", False)
+    return store
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Replaces search_papers; tests set ``upstream.articles`` before each run."""
+
+    class Upstream:
+        articles: list = []
+        calls: list = []
+
+    def search_papers(query, **params):
+        Upstream.calls.append((query, params))
+        return {"articles": list(Upstream.articles)}
+
+    monkeypatch.setattr(watches, "search_papers", search_papers)
+    Upstream.calls = []
+    return Upstream
+
+
+def test_content_hash_ignores_case_punctuation_and_paper_links():
+    a = {"title": "Attention Is All You Need.", "link": "https://a"}
+    b = {"title": "attention is all  you need", "link": "https://b"}
+    assert watches.content_hash("papers", a) == watches.content_hash("papers", b)
+    assert watches.content_hash("news", a) != watches.content_hash("news", b)
+    assert watches.content_hash("news", {"title": "X", "link": "N/A"}) == watches.content_hash("papers", {"title": "x"})
+
+
+def test_first_run_is_baseline_and_later_runs_store_only_new_items(store, upstream):
+    upstream.articles = [_paper("Alpha result"), _paper("Beta result")]
+    watch = watches.save_watch_tool("papers", "graph neural networks", _Context())["watch"]
+    assert store.take_updates(watch["watch_id"], 10) == ([], 0)
+
+    upstream.articles = [_paper("Alpha result"), _paper("Gamma result"), _paper("Beta result")]
+    assert watches.run_watch(store, store.get(watch["watch_id"])) == {"new_items": 1}
+    assert watches.run_watch(store, store.get(watch["watch_id"])) == {"new_items": 0}
+
+    items, remaining = store.take_updates(watch["watch_id"], 10)
+    assert [item["title"] for item in items] == ["Gamma result"] and remaining == 0
+
+
+def test_run_asks_for_fresh_newest_first_results_since_last_run(store, upstream):
+    watch = store.add("u1", "papers", "llm agents", 3600)
+    watches.run_watch(store, watch)
+    query, params = upstream.calls[0]
+    assert query == "llm agents"
+    assert params["fresh"] is True and params["sort_by_date"] is True
+    assert params["num_results"] == settings.watch_fetch_results
+    assert params["as_ylo"] == time.gmtime(time.time() - 3600).tm_year
+
+
+def test_upstream_error_records_nothing(store, monkeypatch):
+    monkeypatch.setattr(watches, "search_papers", lambda query, **params: {"error": "Request error: 429"})
+    watch = store.add("u1", "papers", "q", 3600)
+    assert watches.run_watch(store, watch) == {"error": "Request error: 429"}
+    assert store.get(watch["watch_id"])["last_run"] is None
+
+
+def test_updates_are_delivered_once_in_pages(store, upstream, monkeypatch):
+    monkeypatch.setattr(settings, "watch_max_items_per_update", 2)
+    watch = store.add("u1", "papers", "q", 3600)
+    watches.run_watch(store, watch)
+    upstream.articles = [_paper(f"Paper{i} title") for i in range(3)]
+    watches.run_watch(store, store.get(watch["watch_id"]))
+
+    first = watches.get_watch_updates_tool(_Context())["watches"][0]
+    assert [item["title"] for item in first["new_items"]] == ["Paper0 title", "Paper1 title"]
+    assert first["remaining"] == 1
+    second = watches.get_watch_updates_tool(_Context(), watch["watch_id"])["watches"][0]
+    assert [item["title"] for item in second["new_items"]] == ["Paper2 title"]
+    assert second["remaining"] == 0
+    third = watches.get_watch_updates_tool(_Context())["watches"][0]
+    assert third["new_items"] == [] and third["remaining"] == 0
+    # Nothing was due, so the checks did not search again.
+    assert len(upstream.calls) == 2
+
+
+def test_due_watch_is_refreshed_inline(store, upstream):
+    watch = store.add("u1", "papers", "q", 3600)
+    watches.run_watch(store, watch)
+    upstream.articles = [_paper("Delta result")]
+    store._conn.execute("UPDATE watches SET last_run = last_run - 7200")
+    report = watches.get_watch_updates_tool(_Context())["watches"][0]
+    assert [item["title"] for item in report["new_items"]] == ["Delta result"]
+
+
+def test_watches_are_private_to_their_user(store, upstream):
+    watch = watches.save_watch_tool("papers", "q", _Context())["watch"]
+
+    class Other:
+        user_id = "u2"
+
+    assert "error" in watches.get_watch_updates_tool(Other(), watch["watch_id"])
+    assert "error" in watches.delete_watch_tool(watch["watch_id"], Other())
+    assert watches.delete_watch_tool(watch["watch_id"], _Context()) == {"deleted": watch["watch_id"]}
+    assert store.get(watch["watch_id"]) is None